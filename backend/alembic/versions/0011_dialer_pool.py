@@ -0,0 +1,57 @@
+"""per-company dialable pool for next-batch
+
+Revision ID: 0011_dialer_pool
+Revises: 0010_call_result_direction
+Create Date: 2026-03-02 10:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0011_dialer_pool"
+down_revision = "0010_call_result_direction"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "dialer_pool",
+        sa.Column(
+            "company_id",
+            sa.Integer(),
+            sa.ForeignKey("companies.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column(
+            "phone_number_id",
+            sa.Integer(),
+            sa.ForeignKey("numbers.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+    )
+    # Backfill: every (company, number) pair that has no call result yet.
+    op.execute(
+        """
+        INSERT INTO dialer_pool (company_id, phone_number_id)
+        SELECT c.id, n.id
+        FROM companies AS c
+        CROSS JOIN numbers AS n
+        WHERE NOT EXISTS (
+            SELECT 1 FROM call_results AS cr
+            WHERE cr.company_id = c.id AND cr.phone_number_id = n.id
+        )
+        """
+    )
+    # Deleting a number cascades into the pool; keep that lookup indexed.
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_dialer_pool_phone_number_id "
+        "ON dialer_pool (phone_number_id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_dialer_pool_phone_number_id")
+    op.drop_table("dialer_pool")
@@ -0,0 +1,38 @@
+"""deferred wallet debit ledger
+
+Revision ID: 0012_wallet_pending_charges
+Revises: 0011_dialer_pool
+Create Date: 2026-03-03 09:30:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0012_wallet_pending_charges"
+down_revision = "0011_dialer_pool"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "wallet_pending_charges",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column(
+            "company_id",
+            sa.Integer(),
+            sa.ForeignKey("companies.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("amount_toman", sa.Integer(), nullable=False),
+        sa.Column("call_count", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+    op.create_index("ix_wallet_pending_charges_company_id", "wallet_pending_charges", ["company_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_wallet_pending_charges_company_id", table_name="wallet_pending_charges")
+    op.drop_table("wallet_pending_charges")
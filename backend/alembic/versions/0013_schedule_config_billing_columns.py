@@ -0,0 +1,34 @@
+"""schedule config billing/toggle columns
+
+Replaces the per-request column checks that used to run inside
+schedule_service.ensure_config.
+
+Revision ID: 0013_schedule_config_billing_columns
+Revises: 0012_wallet_pending_charges
+Create Date: 2026-03-03 11:00:00.000000
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0013_schedule_config_billing_columns"
+down_revision = "0012_wallet_pending_charges"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE schedule_configs ADD COLUMN IF NOT EXISTS enabled BOOLEAN DEFAULT TRUE")
+    op.execute("ALTER TABLE schedule_configs ADD COLUMN IF NOT EXISTS disabled_by_dialer BOOLEAN DEFAULT FALSE")
+    op.execute("ALTER TABLE schedule_configs ADD COLUMN IF NOT EXISTS wallet_balance INTEGER DEFAULT 0")
+    op.execute("ALTER TABLE schedule_configs ADD COLUMN IF NOT EXISTS cost_per_connected INTEGER DEFAULT 150")
+    op.execute("UPDATE schedule_configs SET enabled = TRUE WHERE enabled IS NULL")
+    op.execute("UPDATE schedule_configs SET disabled_by_dialer = FALSE WHERE disabled_by_dialer IS NULL")
+    op.execute("UPDATE schedule_configs SET wallet_balance = 0 WHERE wallet_balance IS NULL")
+    op.execute("UPDATE schedule_configs SET cost_per_connected = 150 WHERE cost_per_connected IS NULL")
+
+
+def downgrade() -> None:
+    # Columns predate this revision on most deployments; keep them.
+    pass
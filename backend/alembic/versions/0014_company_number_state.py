@@ -0,0 +1,91 @@
+"""materialized latest call state per (company, number)
+
+Revision ID: 0014_company_number_state
+Revises: 0013_schedule_config_billing_columns
+Create Date: 2026-03-04 10:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0014_company_number_state"
+down_revision = "0013_schedule_config_billing_columns"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "company_number_state",
+        sa.Column(
+            "company_id",
+            sa.Integer(),
+            sa.ForeignKey("companies.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column(
+            "phone_number_id",
+            sa.Integer(),
+            sa.ForeignKey("numbers.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column(
+            "latest_call_result_id",
+            sa.Integer(),
+            sa.ForeignKey("call_results.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column("status", sa.String(length=32), nullable=True),
+        sa.Column("attempted_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("agent_id", sa.Integer(), sa.ForeignKey("admin_users.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("scenario_id", sa.Integer(), sa.ForeignKey("scenarios.id", ondelete="SET NULL"), nullable=True),
+        sa.Column(
+            "outbound_line_id",
+            sa.Integer(),
+            sa.ForeignKey("outbound_lines.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column("attempt_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    # Backfill from history: latest row (highest id) per pair plus the attempt count.
+    op.execute(
+        """
+        INSERT INTO company_number_state (
+            company_id, phone_number_id, latest_call_result_id, status, attempted_at,
+            agent_id, scenario_id, outbound_line_id, attempt_count
+        )
+        SELECT DISTINCT ON (cr.company_id, cr.phone_number_id)
+            cr.company_id, cr.phone_number_id, cr.id, cr.status, cr.attempted_at,
+            cr.agent_id, cr.scenario_id, cr.outbound_line_id,
+            COUNT(*) OVER (PARTITION BY cr.company_id, cr.phone_number_id)
+        FROM call_results AS cr
+        WHERE cr.company_id IS NOT NULL
+        ORDER BY cr.company_id, cr.phone_number_id, cr.id DESC
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_company_number_state_phone_number_id "
+        "ON company_number_state (phone_number_id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_company_number_state_company_status "
+        "ON company_number_state (company_id, status)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_company_number_state_company_attempted_at "
+        "ON company_number_state (company_id, attempted_at)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_company_number_state_company_agent "
+        "ON company_number_state (company_id, agent_id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_company_number_state_company_agent")
+    op.execute("DROP INDEX IF EXISTS ix_company_number_state_company_attempted_at")
+    op.execute("DROP INDEX IF EXISTS ix_company_number_state_company_status")
+    op.execute("DROP INDEX IF EXISTS ix_company_number_state_phone_number_id")
+    op.drop_table("company_number_state")
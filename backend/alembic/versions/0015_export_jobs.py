@@ -0,0 +1,50 @@
+"""background numbers export jobs
+
+Revision ID: 0015_export_jobs
+Revises: 0014_company_number_state
+Create Date: 2026-03-05 10:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0015_export_jobs"
+down_revision = "0014_company_number_state"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "export_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column(
+            "created_by_user_id",
+            sa.Integer(),
+            sa.ForeignKey("admin_users.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column("status", sa.String(length=16), nullable=False, server_default="PENDING"),
+        sa.Column("format", sa.String(length=8), nullable=False),
+        sa.Column("request", postgresql.JSONB(), nullable=False),
+        sa.Column("total_rows", sa.Integer(), nullable=True),
+        sa.Column("processed_rows", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("file_path", sa.String(length=500), nullable=True),
+        sa.Column("error", sa.String(length=500), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_export_jobs_created_by_user_id ON export_jobs (created_by_user_id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_export_jobs_status ON export_jobs (status)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_export_jobs_created_at ON export_jobs (created_at)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_export_jobs_created_at")
+    op.execute("DROP INDEX IF EXISTS ix_export_jobs_status")
+    op.execute("DROP INDEX IF EXISTS ix_export_jobs_created_by_user_id")
+    op.drop_table("export_jobs")
@@ -0,0 +1,27 @@
+"""partial index for the stale-assignment reaper
+
+Revision ID: 0016_numbers_assigned_at_partial_index
+Revises: 0015_export_jobs
+Create Date: 2026-03-20 10:00:00.000000
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0016_numbers_assigned_at_partial_index"
+down_revision = "0015_export_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Only numbers currently handed out to a dialer; tiny compared to numbers itself.
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_numbers_assigned_at_not_null "
+        "ON numbers (assigned_at) WHERE assigned_at IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_numbers_assigned_at_not_null")
@@ -0,0 +1,66 @@
+"""hourly call statistics rollup
+
+Revision ID: 0017_call_stats_rollup
+Revises: 0016_numbers_assigned_at_partial_index
+Create Date: 2026-03-27 10:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0017_call_stats_rollup"
+down_revision = "0016_numbers_assigned_at_partial_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "call_stats_hourly",
+        sa.Column("company_id", sa.Integer(), nullable=False),
+        sa.Column("bucket", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("scenario_id", sa.Integer(), nullable=False),
+        sa.Column("outbound_line_id", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(length=32), nullable=False),
+        sa.Column("call_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("company_id", "bucket", "scenario_id", "outbound_line_id", "status"),
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_call_stats_hourly_bucket ON call_stats_hourly (bucket)")
+
+    op.create_table(
+        "call_stats_deltas",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("company_id", sa.Integer(), nullable=False),
+        sa.Column("bucket", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("scenario_id", sa.Integer(), nullable=False),
+        sa.Column("outbound_line_id", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(length=32), nullable=False),
+        sa.Column("call_count", sa.Integer(), nullable=False),
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_call_stats_deltas_company_bucket "
+        "ON call_stats_deltas (company_id, bucket)"
+    )
+
+    # Backfill from existing history; writers record deltas from here on.
+    op.execute(
+        """
+        INSERT INTO call_stats_hourly (company_id, bucket, scenario_id, outbound_line_id, status, call_count)
+        SELECT
+            COALESCE(company_id, 0),
+            timezone('Asia/Tehran', date_trunc('hour', timezone('Asia/Tehran', attempted_at))),
+            COALESCE(scenario_id, 0),
+            COALESCE(outbound_line_id, 0),
+            status,
+            count(*)
+        FROM call_results
+        GROUP BY 1, 2, 3, 4, 5
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("call_stats_deltas")
+    op.drop_table("call_stats_hourly")
@@ -0,0 +1,160 @@
+"""range-partition call_results by month
+
+Revision ID: 0018_call_results_partitioning
+Revises: 0017_call_stats_rollup
+Create Date: 2026-04-03 10:00:00.000000
+
+The existing table is not rewritten: it is renamed to call_results_legacy and attached
+as the partition holding everything before the first monthly partition. The expensive
+parts (unique index, range check) are built beforehand without blocking writes, so the
+swap itself only needs brief locks.
+"""
+
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0018_call_results_partitioning"
+down_revision = "0017_call_stats_rollup"
+branch_labels = None
+depends_on = None
+
+TEHRAN_TZ = ZoneInfo("Asia/Tehran")
+PARTITIONS_AHEAD = 3
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _month_start(month: date) -> str:
+    return datetime(month.year, month.month, 1, tzinfo=TEHRAN_TZ).isoformat()
+
+
+def _rows(sql: str) -> list:
+    return op.get_bind().execute(sa.text(sql)).all()
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    if _rows("SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'call_results'::regclass"):
+        return
+
+    current = datetime.now(TEHRAN_TZ).date().replace(day=1)
+    newest = bind.execute(sa.text("SELECT max(attempted_at) FROM call_results")).scalar()
+    if newest is not None:
+        current = max(current, newest.astimezone(TEHRAN_TZ).date().replace(day=1))
+    # Legacy rows (everything up to the end of the current month) stay where they are.
+    legacy_end = _add_months(current, 1)
+
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TABLE call_results DROP CONSTRAINT IF EXISTS call_results_legacy_range")
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS call_results_id_attempted_at_key "
+            "ON call_results (id, attempted_at)"
+        )
+        op.execute(
+            "ALTER TABLE call_results ADD CONSTRAINT call_results_legacy_range "
+            f"CHECK (attempted_at < '{_month_start(legacy_end)}') NOT VALID"
+        )
+        op.execute("ALTER TABLE call_results VALIDATE CONSTRAINT call_results_legacy_range")
+
+    # Fail fast instead of queueing every dialer write behind a long-running reader.
+    op.execute("SET LOCAL lock_timeout = '10s'")
+
+    # A foreign key cannot point at a partitioned table unless it includes attempted_at.
+    for table, name in _rows(
+        "SELECT conrelid::regclass::text, conname FROM pg_constraint "
+        "WHERE confrelid = 'call_results'::regclass AND contype = 'f'"
+    ):
+        op.execute(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"')
+
+    (primary_key,) = _rows(
+        "SELECT conname FROM pg_constraint WHERE conrelid = 'call_results'::regclass AND contype = 'p'"
+    )[0]
+    foreign_keys = _rows(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = 'call_results'::regclass AND contype = 'f'"
+    )
+    indexes = _rows(
+        "SELECT i.relname, pg_get_indexdef(i.oid) FROM pg_index x JOIN pg_class i ON i.oid = x.indexrelid "
+        "WHERE x.indrelid = 'call_results'::regclass AND NOT x.indisunique"
+    )
+    sequence = bind.execute(sa.text("SELECT pg_get_serial_sequence('call_results', 'id')")).scalar()
+
+    op.execute(f'ALTER TABLE call_results DROP CONSTRAINT "{primary_key}"')
+    op.execute(
+        "ALTER TABLE call_results ADD CONSTRAINT call_results_legacy_pkey "
+        "PRIMARY KEY USING INDEX call_results_id_attempted_at_key"
+    )
+    for name, _ in indexes:
+        op.execute(f'ALTER INDEX "{name}" RENAME TO "{name[:56]}_legacy"')
+    op.execute("ALTER TABLE call_results RENAME TO call_results_legacy")
+
+    op.execute(
+        "CREATE TABLE call_results (LIKE call_results_legacy INCLUDING DEFAULTS INCLUDING STORAGE) "
+        "PARTITION BY RANGE (attempted_at)"
+    )
+    op.execute("ALTER TABLE call_results ADD CONSTRAINT call_results_pkey PRIMARY KEY (id, attempted_at)")
+    for name, definition in foreign_keys:
+        op.execute(f'ALTER TABLE call_results ADD CONSTRAINT "{name}" {definition}')
+    # Same definitions as the legacy indexes, so ATTACH adopts them instead of rebuilding.
+    for _, definition in indexes:
+        op.execute(definition)
+    op.execute(
+        "ALTER TABLE call_results ATTACH PARTITION call_results_legacy "
+        f"FOR VALUES FROM (MINVALUE) TO ('{_month_start(legacy_end)}')"
+    )
+    op.execute("ALTER TABLE call_results_legacy DROP CONSTRAINT call_results_legacy_range")
+    if sequence:
+        # Keep the id sequence alive when the legacy partition is detached and dropped.
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY call_results.id")
+
+    op.execute("CREATE TABLE call_results_default PARTITION OF call_results DEFAULT")
+    month = legacy_end
+    while month <= _add_months(current, PARTITIONS_AHEAD):
+        op.execute(
+            f"CREATE TABLE call_results_p{month.year:04d}_{month.month:02d} PARTITION OF call_results "
+            f"FOR VALUES FROM ('{_month_start(month)}') TO ('{_month_start(_add_months(month, 1))}')"
+        )
+        month = _add_months(month, 1)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    if not _rows("SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'call_results'::regclass"):
+        return
+
+    indexes = _rows(
+        "SELECT i.relname FROM pg_index x JOIN pg_class i ON i.oid = x.indexrelid "
+        "WHERE x.indrelid = 'call_results'::regclass AND NOT x.indisunique"
+    )
+    sequence = bind.execute(sa.text("SELECT pg_get_serial_sequence('call_results', 'id')")).scalar()
+
+    op.execute("ALTER TABLE call_results DETACH PARTITION call_results_legacy")
+    op.execute("INSERT INTO call_results_legacy SELECT * FROM call_results")
+    if sequence:
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY call_results_legacy.id")
+    op.execute("DROP TABLE call_results")
+    op.execute("ALTER TABLE call_results_legacy RENAME TO call_results")
+    for (name,) in indexes:
+        op.execute(f'ALTER INDEX IF EXISTS "{name[:56]}_legacy" RENAME TO "{name}"')
+    op.execute("ALTER TABLE call_results DROP CONSTRAINT call_results_legacy_pkey")
+    op.execute("ALTER TABLE call_results ADD CONSTRAINT call_results_pkey PRIMARY KEY (id)")
+    op.execute(
+        "ALTER TABLE dialer_batch_items ADD CONSTRAINT dialer_batch_items_report_call_result_id_fkey "
+        "FOREIGN KEY (report_call_result_id) REFERENCES call_results (id)"
+    )
+    op.execute(
+        "ALTER TABLE company_number_state ADD CONSTRAINT company_number_state_latest_call_result_id_fkey "
+        "FOREIGN KEY (latest_call_result_id) REFERENCES call_results (id) ON DELETE SET NULL"
+    )
@@ -0,0 +1,49 @@
+"""per-company prefetch buffer for next-batch
+
+Revision ID: 0019_dialer_prefetch
+Revises: 0018_call_results_partitioning
+Create Date: 2026-04-08 10:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0019_dialer_prefetch"
+down_revision = "0018_call_results_partitioning"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "dialer_prefetch",
+        sa.Column(
+            "company_id",
+            sa.Integer(),
+            sa.ForeignKey("companies.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column(
+            "phone_number_id",
+            sa.Integer(),
+            sa.ForeignKey("numbers.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("reserved_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_dialer_prefetch_phone_number_id "
+        "ON dialer_prefetch (phone_number_id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_dialer_prefetch_reserved_at "
+        "ON dialer_prefetch (reserved_at)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_dialer_prefetch_reserved_at")
+    op.execute("DROP INDEX IF EXISTS ix_dialer_prefetch_phone_number_id")
+    op.drop_table("dialer_prefetch")
@@ -0,0 +1,25 @@
+"""export job heartbeat for reclaiming jobs of dead workers
+
+Revision ID: 0020_export_job_heartbeat
+Revises: 0019_dialer_prefetch
+Create Date: 2026-04-10 10:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0020_export_job_heartbeat"
+down_revision = "0019_dialer_prefetch"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("export_jobs", sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE export_jobs SET heartbeat_at = started_at WHERE status = 'RUNNING'")
+
+
+def downgrade() -> None:
+    op.drop_column("export_jobs", "heartbeat_at")
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from ..core.db import get_db
-from ..core.security import get_current_active_user
+from ..core.security import get_current_active_user, invalidate_principals
 from ..api.deps import get_superuser
 from ..schemas.company import CompanyCreate, CompanyUpdate, CompanyOut, CompanyDeleteRequest
 from ..models.company import Company
@@ -12,6 +12,7 @@ from ..models.call_result import CallResult
 from ..models.scenario import Scenario
 from ..models.outbound_line import OutboundLine
 from ..models.phone_number import PhoneNumber
+from ..services import call_stats_service, company_registry, dialer_pool_service
 
 router = APIRouter()
 
@@ -51,7 +52,11 @@ def create_company(payload: CompanyCreate, db: Session = Depends(get_db), _: Adm
         settings=payload.settings,
     )
     db.add(company)
+    db.flush()
+    # A new company has called nobody yet: every existing number is dialable for it.
+    dialer_pool_service.seed_company_pool(db, company.id)
     db.commit()
+    company_registry.invalidate()
     db.refresh(company)
     return company
 
@@ -81,6 +86,7 @@ def update_company(
         company.settings = payload.settings
 
     db.commit()
+    company_registry.invalidate()
     db.refresh(company)
     return company
 
@@ -105,6 +111,7 @@ def delete_company(
 
     # 1) Delete company-bound call history and detach shared-number back reference.
     db.query(CallResult).filter(CallResult.company_id == company_id).delete(synchronize_session=False)
+    call_stats_service.clear_company(db, company_id)
     db.query(PhoneNumber).filter(PhoneNumber.last_called_company_id == company_id).update(
         {PhoneNumber.last_called_company_id: None},
         synchronize_session=False,
@@ -135,4 +142,6 @@ def delete_company(
     # 5) Finally delete the company row itself.
     db.delete(company)
     db.commit()
+    company_registry.invalidate()
+    invalidate_principals()
     return {"deleted": True, "id": company_id, "name": company.name}
@@ -7,6 +7,7 @@ from ..core.security import get_current_active_user
 from ..core.config import get_settings
 from ..models.user import UserRole, AdminUser
 from ..models.company import Company
+from ..services import company_registry
 
 settings = get_settings()
 http_bearer = HTTPBearer(auto_error=False)
@@ -32,10 +33,7 @@ def get_dialer_auth(credentials: HTTPAuthorizationCredentials = Depends(http_bea
 
 def get_company(company_name: str, db: Session = Depends(get_db)) -> Company:
     """Resolve company from path parameter or query string."""
-    company = db.query(Company).filter(Company.name == company_name, Company.is_active == True).first()
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
-    return company
+    return company_registry.get_active_company(db, company_name)
 
 
 def get_company_user(
@@ -1,11 +1,11 @@
 import csv
 import io
 from datetime import datetime, date
-from fastapi import APIRouter, Depends, UploadFile, File, Query, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, UploadFile, File, Query, HTTPException, Response
+from fastapi.responses import StreamingResponse, FileResponse
 from sqlalchemy.orm import Session
 
-from ..core.db import get_db
+from ..core.db import get_db, get_read_db
 from ..core.security import get_current_active_user
 from ..models.phone_number import CallStatus, GlobalStatus
 from ..schemas.phone_number import (
@@ -18,14 +18,16 @@ from ..schemas.phone_number import (
     PhoneNumberBulkAction,
     PhoneNumberBulkResult,
     PhoneNumberExportRequest,
+    ExportJobOut,
 )
-from ..services import phone_service
+from ..services import phone_service, export_job_service
 
 router = APIRouter()
 
 
 @router.get("/", response_model=list[PhoneNumberOut])
 def list_numbers(
+    response: Response,
     company: str | None = Query(default=None, description="Company name to filter data"),
     status: CallStatus | None = Query(default=None),
     global_status: GlobalStatus | None = Query(default=None),
@@ -37,12 +39,13 @@ def list_numbers(
     sort_by: str = Query(default="created_at", pattern="^(created_at|last_attempt_at|status|total_attempts)$"),
     sort_order: str = Query(default="desc", pattern="^(asc|desc)$"),
     agent_id: int | None = Query(default=None, description="Admin-only: filter numbers assigned to an agent"),
-    db: Session = Depends(get_db),
+    cursor: str | None = Query(default=None, description="Opaque cursor from X-Next-Cursor; replaces skip"),
+    db: Session = Depends(get_read_db),
     current_user=Depends(get_current_active_user),
 ):
     start = _parse_date_param(start_date, "start_date")
     end = _parse_date_param(end_date, "end_date")
-    numbers = phone_service.list_numbers(
+    numbers, next_cursor = phone_service.list_numbers(
         db,
         current_user=current_user,
         company_name=company,
@@ -56,7 +59,10 @@ def list_numbers(
         sort_by=sort_by,
         sort_order=sort_order,
         agent_id=agent_id,
+        cursor=cursor,
     )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return numbers
 
 
@@ -69,7 +75,7 @@ def numbers_stats(
     start_date: str | None = Query(default=None, description="ISO date (YYYY-MM-DD)"),
     end_date: str | None = Query(default=None, description="ISO date (YYYY-MM-DD)"),
     agent_id: int | None = Query(default=None, description="Admin-only: filter numbers assigned to an agent"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(get_current_active_user),
 ):
     start = _parse_date_param(start_date, "start_date")
@@ -96,26 +102,33 @@ def add_numbers(payload: PhoneNumberCreate, db: Session = Depends(get_db), curre
 
 @router.post("/upload", response_model=PhoneNumberImportResponse)
 def upload_numbers(file: UploadFile = File(...), db: Session = Depends(get_db), current_user=Depends(get_current_active_user)):
-    content = file.file.read()
-    file.file.close()
+    try:
+        result = phone_service.import_numbers(db, _iter_uploaded_numbers(file), current_user=current_user)
+    finally:
+        file.file.close()
+    return PhoneNumberImportResponse(**result)
+
+
+def _iter_uploaded_numbers(file: UploadFile):
+    """Yield first-column values lazily; the upload is never read into memory as a whole."""
     if file.filename.endswith(".csv"):
-        decoded = content.decode("utf-8")
-        reader = csv.reader(io.StringIO(decoded))
-        numbers = [row[0] for row in reader if row]
-    else:
-        try:
-            import openpyxl
-        except ImportError:  # pragma: no cover
-            raise RuntimeError("openpyxl not installed")
-        wb = openpyxl.load_workbook(io.BytesIO(content), read_only=True, data_only=True)
-        sheet = wb.active
-        numbers = []
-        for row in sheet.iter_rows(min_row=1, max_col=1, values_only=True):
+        text = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+        for row in csv.reader(text):
+            if row:
+                yield row[0]
+        return
+    try:
+        import openpyxl
+    except ImportError:  # pragma: no cover
+        raise RuntimeError("openpyxl not installed")
+    wb = openpyxl.load_workbook(file.file, read_only=True, data_only=True)
+    try:
+        for row in wb.active.iter_rows(min_row=1, max_col=1, values_only=True):
             val = row[0]
             if val:
-                numbers.append(str(val))
-    result = phone_service.add_numbers(db, PhoneNumberCreate(phone_numbers=numbers), current_user=current_user)
-    return PhoneNumberImportResponse(**result)
+                yield str(val)
+    finally:
+        wb.close()
 
 
 @router.put("/{number_id}/status", response_model=PhoneNumberOut)
@@ -156,7 +169,7 @@ def reset_number(
 def number_history(
     number_id: int,
     company: str | None = Query(default=None, description="Company slug"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(get_current_active_user),
 ):
     return phone_service.list_number_history(
@@ -173,17 +186,41 @@ def bulk_numbers_action(payload: PhoneNumberBulkAction, db: Session = Depends(ge
 
 
 @router.post("/export")
-def export_numbers(payload: PhoneNumberExportRequest, db: Session = Depends(get_db), current_user=Depends(get_current_active_user)):
+def export_numbers(payload: PhoneNumberExportRequest, db: Session = Depends(get_read_db), current_user=Depends(get_current_active_user)):
     stream = phone_service.export_numbers(db, payload, current_user=current_user)
-    filename = "numbers_export.xlsx"
+    filename = f"numbers_export.{payload.format}"
     headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
     return StreamingResponse(
         stream,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        media_type=phone_service.EXPORT_MEDIA_TYPES[payload.format],
         headers=headers,
     )
 
 
+@router.post("/export-jobs", response_model=ExportJobOut, status_code=202)
+def create_export_job(
+    payload: PhoneNumberExportRequest,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_active_user),
+):
+    return export_job_service.create_job(db, payload, current_user=current_user)
+
+
+@router.get("/export-jobs/{job_id}", response_model=ExportJobOut)
+def get_export_job(job_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_active_user)):
+    return export_job_service.get_job(db, job_id, current_user=current_user)
+
+
+@router.get("/export-jobs/{job_id}/download")
+def download_export_job(job_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_active_user)):
+    job, path = export_job_service.get_job_file(db, job_id, current_user=current_user)
+    return FileResponse(
+        path,
+        media_type=phone_service.EXPORT_MEDIA_TYPES[job.format],
+        filename=f"numbers_export.{job.format}",
+    )
+
+
 def _parse_date_param(value: str | None, field: str) -> date | None:
     if not value:
         return None
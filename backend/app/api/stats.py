@@ -2,10 +2,9 @@ from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
 
 from ..api.deps import get_active_admin, get_current_active_user
-from ..core.db import get_db
+from ..core.db import get_read_db
 from ..schemas.stats import NumbersSummary, AttemptTrendResponse, AttemptSummary, CostSummary
-from ..services import stats_service
-from ..models.company import Company
+from ..services import company_registry, stats_service
 from ..models.user import AdminUser
 
 router = APIRouter(dependencies=[Depends(get_active_admin)])
@@ -15,16 +14,13 @@ router = APIRouter(dependencies=[Depends(get_active_admin)])
 def get_numbers_summary(
     company: str | None = Query(default=None, description="Company slug to filter by"),
     user: AdminUser = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     company_id = None
     if company:
-        company_obj = db.query(Company).filter(Company.name == company, Company.is_active == True).first()
-        if not company_obj:
-            raise HTTPException(status_code=404, detail="Company not found")
-        if not user.is_superuser and user.company_id != company_obj.id:
+        company_id = company_registry.active_id(db, company)
+        if not user.is_superuser and user.company_id != company_id:
             raise HTTPException(status_code=403, detail="Access denied to this company")
-        company_id = company_obj.id
     elif user.company_id:
         company_id = user.company_id
     return stats_service.numbers_summary(db, company_id=company_id)
@@ -36,16 +32,13 @@ def get_attempt_trend(
     granularity: str = Query(default="day", pattern="^(day|hour)$"),
     company: str | None = Query(default=None, description="Company slug to filter by"),
     user: AdminUser = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     company_id = None
     if company:
-        company_obj = db.query(Company).filter(Company.name == company, Company.is_active == True).first()
-        if not company_obj:
-            raise HTTPException(status_code=404, detail="Company not found")
-        if not user.is_superuser and user.company_id != company_obj.id:
+        company_id = company_registry.active_id(db, company)
+        if not user.is_superuser and user.company_id != company_id:
             raise HTTPException(status_code=403, detail="Access denied to this company")
-        company_id = company_obj.id
 
     return stats_service.attempt_trend(db, span=span, granularity=granularity, company_id=company_id)
 
@@ -54,7 +47,7 @@ def get_attempt_trend(
 def get_attempts_summary(
     days: int | None = Query(default=None, ge=1, le=365, description="Optional: limit to last N days (Tehran)"),
     hours: int | None = Query(default=None, ge=1, le=720, description="Optional: limit to last N hours (Tehran)"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     return stats_service.attempt_summary(db, days=days, hours=hours)
 
@@ -63,18 +56,16 @@ def get_attempts_summary(
 def get_costs(
     company: str = Query(..., description="Company slug"),
     user: AdminUser = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get cost summary for a company"""
-    company_obj = db.query(Company).filter(Company.name == company, Company.is_active == True).first()
-    if not company_obj:
-        raise HTTPException(status_code=404, detail="Company not found")
+    company_id = company_registry.active_id(db, company)
 
     # Verify user has access to this company
-    if not user.is_superuser and user.company_id != company_obj.id:
+    if not user.is_superuser and user.company_id != company_id:
         raise HTTPException(status_code=403, detail="Access denied to this company")
 
-    return stats_service.cost_summary(db, company_obj.id)
+    return stats_service.cost_summary(db, company_id)
 
 
 @router.get("/dashboard-stats")
@@ -83,15 +74,13 @@ def get_dashboard_stats(
     group_by: str = Query("scenario", pattern="^(scenario|line)$", description="Group by scenario or line"),
     time_filter: str = Query("today", pattern="^(1h|today|yesterday|7d|30d)$", description="Time filter"),
     user: AdminUser = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Get dashboard statistics grouped by scenario or outbound line"""
-    company_obj = db.query(Company).filter(Company.name == company, Company.is_active == True).first()
-    if not company_obj:
-        raise HTTPException(status_code=404, detail="Company not found")
+    company_id = company_registry.active_id(db, company)
 
     # Verify user has access to this company
-    if not user.is_superuser and user.company_id != company_obj.id:
+    if not user.is_superuser and user.company_id != company_id:
         raise HTTPException(status_code=403, detail="Access denied to this company")
 
-    return stats_service.dashboard_stats(db, company_obj.id, group_by, time_filter)
+    return stats_service.dashboard_stats(db, company_id, group_by, time_filter)
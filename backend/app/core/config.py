@@ -7,16 +7,58 @@ class Settings(BaseSettings):
 
     app_name: str = "Salehi Dialer Panel"
     database_url: str = Field(..., alias="DATABASE_URL")
+    # Heavy admin/report reads (stats, exports) get their own pool; point it at a replica if you have one.
+    database_replica_url: str = Field("", alias="DATABASE_REPLICA_URL")
+    # With a replica: read on the primary instead while replay lag exceeds this (0 = never check).
+    replica_max_lag_seconds: float = Field(0, alias="REPLICA_MAX_LAG_SECONDS")
+    replica_lag_check_seconds: float = Field(5, alias="REPLICA_LAG_CHECK_SECONDS")
+    db_pool_size: int = Field(5, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(10, alias="DB_MAX_OVERFLOW")
+    db_pool_timeout_seconds: float = Field(30, alias="DB_POOL_TIMEOUT_SECONDS")
+    db_pool_recycle_seconds: int = Field(1800, alias="DB_POOL_RECYCLE_SECONDS")
+    db_statement_timeout_ms: int = Field(0, alias="DB_STATEMENT_TIMEOUT_MS")  # 0 = server default
+    dialer_db_pool_size: int = Field(10, alias="DIALER_DB_POOL_SIZE")
+    dialer_db_max_overflow: int = Field(10, alias="DIALER_DB_MAX_OVERFLOW")
+    dialer_db_statement_timeout_ms: int = Field(0, alias="DIALER_DB_STATEMENT_TIMEOUT_MS")
+    reports_db_pool_size: int = Field(3, alias="REPORTS_DB_POOL_SIZE")
+    reports_db_max_overflow: int = Field(2, alias="REPORTS_DB_MAX_OVERFLOW")
+    reports_db_statement_timeout_ms: int = Field(0, alias="REPORTS_DB_STATEMENT_TIMEOUT_MS")
     secret_key: str = Field(..., alias="SECRET_KEY")
     access_token_expire_minutes: int = Field(1440, alias="ACCESS_TOKEN_EXPIRE_MINUTES")  # default: 1 day
+    company_cache_ttl_seconds: float = Field(30, alias="COMPANY_CACHE_TTL_SECONDS")
+    auth_cache_ttl_seconds: float = Field(30, alias="AUTH_CACHE_TTL_SECONDS")  # 0 = load the user every request
     algorithm: str = "HS256"
     dialer_token: str = Field(..., alias="DIALER_TOKEN")
     default_batch_size: int = Field(100, alias="DEFAULT_BATCH_SIZE")
     max_batch_size: int = Field(40, alias="MAX_BATCH_SIZE")
+    # next-batch?wait=N long-poll: cap (keep below the proxy read timeout) and wake-up probe period
+    next_batch_max_wait_seconds: int = Field(50, alias="NEXT_BATCH_MAX_WAIT_SECONDS")
+    next_batch_wait_poll_seconds: float = Field(5, alias="NEXT_BATCH_WAIT_POLL_SECONDS")
     timezone: str = Field("Asia/Tehran", alias="TIMEZONE")
     skip_holidays_default: bool = Field(True, alias="SKIP_HOLIDAYS")
     assignment_timeout_minutes: int = Field(1440, alias="ASSIGNMENT_TIMEOUT_MINUTES")
+    stale_assignment_sweep_seconds: int = Field(60, alias="STALE_ASSIGNMENT_SWEEP_SECONDS")
+    # Numbers kept pre-selected per callable company for next-batch (0 = off, select on request)
+    dialer_prefetch_watermark: int = Field(0, alias="DIALER_PREFETCH_WATERMARK")
+    dialer_prefetch_refill_seconds: int = Field(2, alias="DIALER_PREFETCH_REFILL_SECONDS")
+    call_results_partitions_ahead: int = Field(3, alias="CALL_RESULTS_PARTITIONS_AHEAD")
+    call_stats_fold_seconds: int = Field(30, alias="CALL_STATS_FOLD_SECONDS")
     call_cooldown_days: int = Field(3, alias="CALL_COOLDOWN_DAYS")
+    max_report_batch_size: int = Field(1000, alias="MAX_REPORT_BATCH_SIZE")
+    import_chunk_size: int = Field(5000, alias="IMPORT_CHUNK_SIZE")
+    export_chunk_size: int = Field(5000, alias="EXPORT_CHUNK_SIZE")
+    export_jobs_dir: str = Field("", alias="EXPORT_JOBS_DIR")  # empty = <system tmp>/callcenter_exports
+    export_job_poll_seconds: int = Field(2, alias="EXPORT_JOB_POLL_SECONDS")
+    export_job_retention_hours: int = Field(24, alias="EXPORT_JOB_RETENTION_HOURS")
+    export_job_stall_minutes: int = Field(15, alias="EXPORT_JOB_STALL_MINUTES")
+    # per-request SQL counters -> Server-Timing header + one "request ..." log line
+    request_instrumentation: bool = Field(True, alias="REQUEST_INSTRUMENTATION")
+    slow_query_ms: float = Field(200, alias="SLOW_QUERY_MS")
+    slow_query_sample_rate: float = Field(1.0, alias="SLOW_QUERY_SAMPLE_RATE", ge=0, le=1)
+    metrics_enabled: bool = Field(True, alias="METRICS_ENABLED")
+    # immediate: lock schedule_configs per billable call; deferred: append to wallet_pending_charges
+    wallet_billing_mode: str = Field("immediate", alias="WALLET_BILLING_MODE", pattern="^(immediate|deferred)$")
+    wallet_settle_interval_seconds: int = Field(5, alias="WALLET_SETTLE_INTERVAL_SECONDS")
     # Legacy single-profile bank config (kept as fallback)
     bank_sms_sender: str = Field("30008528", alias="BANK_SMS_SENDER")
     manager_alert_numbers: str = Field("", alias="MANAGER_ALERT_NUMBERS")
@@ -1,11 +1,100 @@
+import logging
+import time
+
 from sqlalchemy import create_engine, text, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from .config import get_settings
+from .metrics import timed_pool_class
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def _async_url(url: str):
+    """DATABASE_URL with its driver swapped for the asyncio one (psycopg2 -> asyncpg)."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    return parsed.set(drivername=f"{backend}+{_ASYNC_DRIVERS[backend]}")
+
+
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _engine_options(
+    url: str,
+    pool_name: str,
+    pool_size: int,
+    max_overflow: int,
+    statement_timeout_ms: int,
+    is_async: bool = False,
+) -> dict:
+    """Pool sizing/timeouts from Settings; SQLite (tests, local dev) keeps SQLAlchemy defaults."""
+    options = {"pool_pre_ping": True}
+    if _is_sqlite(url):
+        return options
+    options.update(
+        # Same QueuePool as the default, plus a checkout-wait histogram (per pool) for /metrics.
+        poolclass=timed_pool_class(AsyncAdaptedQueuePool if is_async else QueuePool, pool_name),
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+    )
+    if statement_timeout_ms > 0:
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(statement_timeout_ms)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={statement_timeout_ms}"}
+    return options
+
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
+# Three pools so one kind of traffic cannot starve another of connections:
+#   engine         - admin panel (sync routes), periodic jobs, migrations helpers below
+#   async_engine   - dialer routes, natively on the event loop
+#   reports_engine - read-only reporting (stats, listing, history, export); DATABASE_REPLICA_URL when set
+engine = create_engine(
+    settings.database_url,
+    **_engine_options(
+        settings.database_url,
+        "primary",
+        settings.db_pool_size,
+        settings.db_max_overflow,
+        settings.db_statement_timeout_ms,
+    ),
+)
+async_engine = create_async_engine(
+    _async_url(settings.database_url),
+    **_engine_options(
+        settings.database_url,
+        "dialer",
+        settings.dialer_db_pool_size,
+        settings.dialer_db_max_overflow,
+        settings.dialer_db_statement_timeout_ms,
+        is_async=True,
+    ),
+)
+_reports_url = settings.database_replica_url or settings.database_url
+if _is_sqlite(_reports_url) and not settings.database_replica_url:
+    # A second in-memory SQLite engine would be a different, empty database.
+    reports_engine = engine
+else:
+    reports_engine = create_engine(
+        _reports_url,
+        **_engine_options(
+            _reports_url,
+            "reports",
+            settings.reports_db_pool_size,
+            settings.reports_db_max_overflow,
+            settings.reports_db_statement_timeout_ms,
+        ),
+    )
 
 def _ensure_callstatus_enum():
     # Ensure enum includes new statuses (PostgreSQL only)
@@ -185,12 +274,54 @@ def _ensure_call_result_columns():
         pass
 
 
+def _ensure_schedule_config_columns():
+    """Billing/toggle columns on schedule_configs and scenarios (see migration 0013).
+
+    Runs once per process at import instead of on every ensure_config call.
+    """
+    try:
+        with engine.begin() as conn:
+            inspector = inspect(conn)
+            columns = {col["name"] for col in inspector.get_columns("schedule_configs")}
+            if "enabled" not in columns:
+                conn.execute(text("ALTER TABLE schedule_configs ADD COLUMN IF NOT EXISTS enabled BOOLEAN DEFAULT TRUE"))
+            if "disabled_by_dialer" not in columns:
+                conn.execute(text("ALTER TABLE schedule_configs ADD COLUMN IF NOT EXISTS disabled_by_dialer BOOLEAN DEFAULT FALSE"))
+            if "wallet_balance" not in columns:
+                conn.execute(text("ALTER TABLE schedule_configs ADD COLUMN IF NOT EXISTS wallet_balance INTEGER DEFAULT 0"))
+            if "cost_per_connected" not in columns:
+                conn.execute(text("ALTER TABLE schedule_configs ADD COLUMN IF NOT EXISTS cost_per_connected INTEGER DEFAULT 150"))
+
+            scenario_columns = {col["name"] for col in inspector.get_columns("scenarios")}
+            if "cost_per_connected" not in scenario_columns:
+                conn.execute(text("ALTER TABLE scenarios ADD COLUMN IF NOT EXISTS cost_per_connected INTEGER"))
+    except Exception:
+        # Ignore if not PostgreSQL, tables not created yet, or already updated
+        pass
+
+
 _ensure_callstatus_enum()
 _ensure_admin_columns()
 _ensure_phone_columns()
 _ensure_call_result_columns()
+_ensure_schedule_config_columns()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=Session)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, class_=AsyncSession)
+# Read sessions run READ ONLY transactions on PostgreSQL, so a write slipping into a
+# reporting path fails loudly instead of landing on (or being rejected by) a replica.
+ReportsSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=reports_engine.execution_options(postgresql_readonly=True),
+    class_=Session,
+)
+_PrimaryReadSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=engine.execution_options(postgresql_readonly=True),
+    class_=Session,
+)
 Base = declarative_base()
 
 
@@ -200,3 +331,54 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+_REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+_replica_state = {"checked_at": float("-inf"), "lagging": False}
+
+
+def replica_is_lagging() -> bool:
+    """True while the replica is further behind than REPLICA_MAX_LAG_SECONDS or unreachable.
+
+    Probed at most once per REPLICA_LAG_CHECK_SECONDS per process.
+    """
+    if not settings.database_replica_url or settings.replica_max_lag_seconds <= 0:
+        return False
+    now = time.monotonic()
+    if now - _replica_state["checked_at"] < settings.replica_lag_check_seconds:
+        return _replica_state["lagging"]
+    try:
+        with reports_engine.connect() as conn:
+            lag = float(conn.execute(_REPLICA_LAG_SQL).scalar() or 0)
+        lagging = lag > settings.replica_max_lag_seconds
+        if lagging:
+            logger.warning("replica_lagging lag_seconds=%.1f; reading from primary", lag)
+    except Exception:
+        logger.warning("replica_unreachable; reading from primary", exc_info=True)
+        lagging = True
+    _replica_state.update(checked_at=now, lagging=lagging)
+    return lagging
+
+
+def read_session() -> Session:
+    """Session for read-only work: the replica (or the reports pool on the primary when none
+    is configured), falling back to the primary while the replica lags."""
+    if replica_is_lagging():
+        return _PrimaryReadSessionLocal()
+    return ReportsSessionLocal()
+
+
+def get_read_db():
+    db = read_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,127 @@
+import logging
+import random
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger(f"{__name__}.slow_query")
+
+settings = get_settings()
+
+_MAX_LOGGED_SQL = 1000
+
+
+@dataclass
+class RequestStats:
+    query_count: int = 0
+    db_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: str | None = None
+
+    def add(self, statement: str, elapsed: float) -> None:
+        self.query_count += 1
+        self.db_seconds += elapsed
+        if elapsed > self.slowest_seconds:
+            self.slowest_seconds = elapsed
+            self.slowest_statement = statement
+
+
+# Set by the middleware for the duration of one request. Sync endpoints run in a
+# threadpool with a copy of the context, so they see (and mutate) the same object.
+_current: ContextVar[RequestStats | None] = ContextVar("request_sql_stats", default=None)
+
+
+def current_stats() -> RequestStats | None:
+    return _current.get()
+
+
+def _short_sql(statement: str) -> str:
+    flat = " ".join(statement.split())
+    return flat if len(flat) <= _MAX_LOGGED_SQL else flat[:_MAX_LOGGED_SQL] + "..."
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_started_at
+    stats = _current.get()
+    if stats is not None:
+        stats.add(statement, elapsed)
+    if elapsed * 1000 >= settings.slow_query_ms and random.random() < settings.slow_query_sample_rate:
+        # Parameters are left out on purpose: they carry phone numbers and tokens.
+        slow_query_logger.warning(
+            "slow_query duration_ms=%.1f executemany=%s sql=%s",
+            elapsed * 1000,
+            executemany,
+            _short_sql(statement),
+        )
+
+
+def install_sql_hooks(engine: Engine) -> None:
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _server_timing(stats: RequestStats, total_seconds: float) -> str:
+    return (
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.query_count} queries", '
+        f"db-slowest;dur={stats.slowest_seconds * 1000:.1f}, "
+        f"total;dur={total_seconds * 1000:.1f}"
+    )
+
+
+class RequestInstrumentationMiddleware:
+    """Pure ASGI middleware: per-request SQL count/time in Server-Timing and the request log.
+
+    The header reflects work done before the response starts; queries issued while a
+    streaming body is sent are still included in the log line written at the end.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", _server_timing(stats, time.perf_counter() - started).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            total = time.perf_counter() - started
+            logger.info(
+                "request method=%s path=%s status=%s duration_ms=%.1f db_queries=%d db_ms=%.1f slowest_ms=%.1f slowest_sql=%s",
+                scope["method"],
+                scope["path"],
+                status_code,
+                total * 1000,
+                stats.query_count,
+                stats.db_seconds * 1000,
+                stats.slowest_seconds * 1000,
+                _short_sql(stats.slowest_statement)[:200] if stats.slowest_statement else "-",
+            )
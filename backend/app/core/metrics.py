@@ -0,0 +1,108 @@
+"""Prometheus metrics shared by every worker.
+
+Under gunicorn set PROMETHEUS_MULTIPROC_DIR to an empty, writable directory before
+the workers start: prometheus_client then keeps each worker's samples in mmap'ed
+files there and /metrics aggregates them. Without it the default in-process
+registry is used (single-process uvicorn, tests).
+"""
+
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from sqlalchemy.pool import Pool
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+DIALER_BATCHES = Counter("dialer_batches_served_total", "next-batch responses that handed out numbers", ["company"])
+DIALER_NUMBERS_REQUESTED = Counter("dialer_numbers_requested_total", "Batch sizes requested by dialers", ["company"])
+DIALER_NUMBERS_RETURNED = Counter("dialer_numbers_returned_total", "Numbers actually handed out", ["company"])
+DIALER_NUMBERS_PREFETCHED = Counter(
+    "dialer_numbers_prefetched_total",
+    "Numbers handed out from the prefetch buffer (no candidate query)",
+    ["company"],
+)
+DIALER_REPORTS = Counter("dialer_reports_total", "Call results ingested", ["company", "status"])
+WALLET_CHARGES = Counter("wallet_charges_total", "Billable calls charged to a wallet", ["company_id", "mode"])
+WALLET_CHARGED_TOMAN = Counter("wallet_charged_toman_total", "Amount charged to wallets", ["company_id", "mode"])
+STALE_ASSIGNMENTS_UNLOCKED = Counter(
+    "dialer_stale_assignments_unlocked_total",
+    "Assignments released by the stale-assignment reaper (unlock_stale_assignments)",
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled DB connection (includes opening a new one)",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5, 30),
+)
+
+
+class _TimedCheckout:
+    metrics_pool = "default"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(self.metrics_pool).observe(time.perf_counter() - started)
+
+
+def timed_pool_class(base: type[Pool], name: str) -> type[Pool]:
+    """`base` (QueuePool / AsyncAdaptedQueuePool) recording checkout wait under pool=`name`.
+
+    The label lives on the class so it survives Pool.recreate() (engine.dispose()).
+    """
+    return type(f"Timed{base.__name__}", (_TimedCheckout, base), {"metrics_pool": name})
+
+
+def render_latest() -> tuple[bytes, str]:
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware observing request latency per route template (not raw path)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status_code),
+            ).observe(time.perf_counter() - started)
@@ -1,3 +1,4 @@
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
@@ -5,7 +6,8 @@ from jose import jwt, JWTError
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
 
 from .config import get_settings
 from .db import get_db
@@ -19,6 +21,11 @@ pwd_context = CryptContext(
 )
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# token subject (username) -> (expires_at, detached AdminUser snapshot). Per process:
+# writes call invalidate_principals() locally, other workers pick them up within
+# AUTH_CACHE_TTL_SECONDS.
+_principal_cache: dict[str, tuple[float, AdminUser]] = {}
+
 
 class TokenData:
     username: Optional[str] = None
@@ -40,6 +47,31 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+def invalidate_principals() -> None:
+    """Drop cached principals; call after any write to admin_users (incl. bulk ones)."""
+    _principal_cache.clear()
+
+
+def _snapshot(user: AdminUser) -> AdminUser:
+    copy = AdminUser(**{attr.key: getattr(user, attr.key) for attr in inspect(AdminUser).column_attrs})
+    make_transient_to_detached(copy)
+    return copy
+
+
+def _load_principal(db: Session, username: str) -> AdminUser | None:
+    ttl = settings.auth_cache_ttl_seconds
+    if ttl > 0:
+        cached = _principal_cache.get(username)
+        if cached and cached[0] > time.monotonic():
+            # Per-request copy attached to this session without a SELECT, so handlers
+            # can still lazy-load and modify it as before.
+            return db.merge(cached[1], load=False)
+    user = db.query(AdminUser).filter(AdminUser.username == username).first()
+    if user is not None and ttl > 0:
+        _principal_cache[username] = (time.monotonic() + ttl, _snapshot(user))
+    return user
+
+
 def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> AdminUser:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -53,7 +85,7 @@ def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = db.query(AdminUser).filter(AdminUser.username == username).first()
+    user = _load_principal(db, username)
     if user is None:
         raise credentials_exception
     return user
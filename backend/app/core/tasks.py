@@ -0,0 +1,45 @@
+import asyncio
+import logging
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from .db import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# (name, interval_seconds, job) — each job gets its own session and runs in a worker thread
+_periodic_jobs: list[tuple[str, float, Callable[[Session], object]]] = []
+
+
+def register_periodic(name: str, interval_seconds: float, job: Callable[[Session], object]) -> None:
+    _periodic_jobs.append((name, interval_seconds, job))
+
+
+def start_periodic_jobs() -> list[asyncio.Task]:
+    return [asyncio.create_task(_run_forever(name, interval, job)) for name, interval, job in _periodic_jobs]
+
+
+async def stop_periodic_jobs(running: list[asyncio.Task]) -> None:
+    for task in running:
+        task.cancel()
+    await asyncio.gather(*running, return_exceptions=True)
+
+
+async def _run_forever(name: str, interval_seconds: float, job: Callable[[Session], object]) -> None:
+    while True:
+        try:
+            result = await asyncio.to_thread(_run_once, job)
+            if result:
+                logger.info("periodic_job name=%s result=%s", name, result)
+        except Exception:
+            logger.exception("periodic_job_failed name=%s", name)
+        await asyncio.sleep(interval_seconds)
+
+
+def _run_once(job: Callable[[Session], object]):
+    db = SessionLocal()
+    try:
+        return job(db)
+    finally:
+        db.close()
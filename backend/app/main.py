@@ -1,8 +1,20 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
-from .core.db import Base, engine
+from .core.db import Base, engine, async_engine, reports_engine
 from .core.config import get_settings
+from .core import tasks
+from .core import metrics
+from .core.instrumentation import RequestInstrumentationMiddleware, install_sql_hooks
+from .services import (
+    schedule_service,
+    export_job_service,
+    dialer_service,
+    call_stats_service,
+    call_partition_service,
+)
 from .api import (
     auth,
     admins,
@@ -21,7 +33,51 @@ settings = get_settings()
 
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Salehi Dialer Admin Panel - Multi-Company")
+if settings.wallet_billing_mode == "deferred":
+    tasks.register_periodic(
+        "wallet_settle",
+        settings.wallet_settle_interval_seconds,
+        schedule_service.settle_pending_charges,
+    )
+
+tasks.register_periodic(
+    "stale_assignments",
+    settings.stale_assignment_sweep_seconds,
+    dialer_service.unlock_stale_assignments,
+)
+if settings.dialer_prefetch_watermark > 0:
+    tasks.register_periodic(
+        "dialer_prefetch",
+        settings.dialer_prefetch_refill_seconds,
+        dialer_service.refill_prefetch,
+    )
+tasks.register_periodic(
+    "call_stats_rollup",
+    settings.call_stats_fold_seconds,
+    call_stats_service.fold_deltas,
+)
+tasks.register_periodic(
+    "call_results_partitions",
+    call_partition_service.CHECK_INTERVAL_SECONDS,
+    call_partition_service.ensure_partitions,
+)
+tasks.register_periodic("export_jobs", settings.export_job_poll_seconds, export_job_service.run_pending_jobs)
+tasks.register_periodic(
+    "export_job_sweep",
+    export_job_service.SWEEP_INTERVAL_SECONDS,
+    export_job_service.sweep_expired_jobs,
+)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    running = tasks.start_periodic_jobs()
+    yield
+    await tasks.stop_periodic_jobs(running)
+    await async_engine.dispose()
+
+
+app = FastAPI(title="Salehi Dialer Admin Panel - Multi-Company", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -29,8 +85,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing"],
 )
 
+if settings.request_instrumentation:
+    install_sql_hooks(engine)
+    install_sql_hooks(async_engine.sync_engine)
+    install_sql_hooks(reports_engine)
+    app.add_middleware(RequestInstrumentationMiddleware)
+if settings.metrics_enabled:
+    app.add_middleware(metrics.MetricsMiddleware)
+
 # Auth routes (no company scope)
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 
@@ -54,3 +119,11 @@ app.include_router(sms_webhook.router, tags=["sms-webhook"])
 @app.get("/health")
 def health():
     return {"status": "ok"}
+
+
+if settings.metrics_enabled:
+
+    @app.get("/metrics", include_in_schema=False)
+    def prometheus_metrics():
+        body, content_type = metrics.render_latest()
+        return Response(content=body, media_type=content_type)
@@ -4,10 +4,15 @@ from .schedule import ScheduleConfig, ScheduleWindow
 from .call_result import CallResult
 from .dialer_batch import DialerBatch
 from .dialer_batch_item import DialerBatchItem
+from .dialer_pool import DialerPoolEntry
+from .dialer_prefetch import DialerPrefetchEntry
+from .company_number_state import CompanyNumberState
+from .call_stats import CallStatsHourly, CallStatsDelta
 from .company import Company
 from .scenario import Scenario
 from .outbound_line import OutboundLine
-from .wallet import WalletTransaction, BankIncomingSms
+from .wallet import WalletTransaction, BankIncomingSms, WalletPendingCharge
+from .export_job import ExportJob, ExportJobStatus
 
 __all__ = [
     "AdminUser",
@@ -21,9 +26,17 @@ __all__ = [
     "CallResult",
     "DialerBatch",
     "DialerBatchItem",
+    "DialerPoolEntry",
+    "DialerPrefetchEntry",
+    "CompanyNumberState",
+    "CallStatsHourly",
+    "CallStatsDelta",
     "Company",
     "Scenario",
     "OutboundLine",
     "WalletTransaction",
     "BankIncomingSms",
+    "WalletPendingCharge",
+    "ExportJob",
+    "ExportJobStatus",
 ]
@@ -13,6 +13,13 @@ class CallDirection(str, Enum):
 
 
 class CallResult(Base):
+    """One dialer/admin call outcome.
+
+    On PostgreSQL the table is range-partitioned by `attempted_at` per Tehran month
+    (migration 0018, partitions created by `call_partition_service`); the database key is
+    (id, attempted_at). Filter on `attempted_at` wherever possible so queries prune.
+    """
+
     __tablename__ = "call_results"  # Renamed from call_attempts
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -0,0 +1,42 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..core.db import Base
+
+
+class CallStatsHourly(Base):
+    """Call result counts per (company, Tehran hour, scenario, outbound line, status).
+
+    Dashboard statistics read this instead of scanning call_results. `bucket` is the
+    start of the Tehran-local hour (stored as timestamptz). 0 stands for "none" in
+    company_id / scenario_id / outbound_line_id so the key can be the primary key.
+    """
+
+    __tablename__ = "call_stats_hourly"
+    __table_args__ = (Index("ix_call_stats_hourly_bucket", "bucket"),)
+
+    company_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    scenario_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    outbound_line_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    status: Mapped[str] = mapped_column(String(32), primary_key=True)
+    call_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class CallStatsDelta(Base):
+    """Pending +/- change to call_stats_hourly (same key), appended by every path that
+    writes, edits or deletes call results and folded in by the call_stats_rollup job.
+    Readers add pending deltas on top of the rollup, so statistics are never stale."""
+
+    __tablename__ = "call_stats_deltas"
+    __table_args__ = (Index("ix_call_stats_deltas_company_bucket", "company_id", "bucket"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    company_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    scenario_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    outbound_line_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    status: Mapped[str] = mapped_column(String(32), nullable=False)
+    call_count: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -0,0 +1,46 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..core.db import Base
+
+
+class CompanyNumberState(Base):
+    """Latest call outcome of one number for one company, kept in step with call_results.
+
+    A row exists once the company has at least one call result for the number; no row
+    means the number is still IN_QUEUE for that company.
+    """
+
+    __tablename__ = "company_number_state"
+    __table_args__ = (
+        Index("ix_company_number_state_company_status", "company_id", "status"),
+        Index("ix_company_number_state_company_attempted_at", "company_id", "attempted_at"),
+        Index("ix_company_number_state_company_agent", "company_id", "agent_id"),
+    )
+
+    company_id: Mapped[int] = mapped_column(ForeignKey("companies.id", ondelete="CASCADE"), primary_key=True)
+    phone_number_id: Mapped[int] = mapped_column(
+        ForeignKey("numbers.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+    # Plain column (call_results is partitioned); paired with attempted_at it is the
+    # full (id, attempted_at) key of the latest call, which lets lookups prune partitions.
+    latest_call_result_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    status: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    attempted_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    agent_id: Mapped[int | None] = mapped_column(
+        ForeignKey("admin_users.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    scenario_id: Mapped[int | None] = mapped_column(
+        ForeignKey("scenarios.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    outbound_line_id: Mapped[int | None] = mapped_column(
+        ForeignKey("outbound_lines.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    attempt_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
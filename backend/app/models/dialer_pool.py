@@ -0,0 +1,18 @@
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..core.db import Base
+
+
+class DialerPoolEntry(Base):
+    """A number this company has never called yet (candidate for next-batch)."""
+
+    __tablename__ = "dialer_pool"
+
+    # Composite PK doubles as the (company_id, phone_number_id) index scanned backwards by next-batch.
+    company_id: Mapped[int] = mapped_column(ForeignKey("companies.id", ondelete="CASCADE"), primary_key=True)
+    phone_number_id: Mapped[int] = mapped_column(
+        ForeignKey("numbers.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..core.db import Base
+
+
+class DialerPrefetchEntry(Base):
+    """A number pre-selected for a company's next batch by the dialer_prefetch job.
+
+    The number itself is reserved (numbers.assigned_at set, assigned_batch_id NULL), so
+    no other company's selection picks it up; reserved_at mirrors that assigned_at.
+    """
+
+    __tablename__ = "dialer_prefetch"
+    __table_args__ = (Index("ix_dialer_prefetch_reserved_at", "reserved_at"),)
+
+    # Composite PK doubles as the (company_id, phone_number_id) index next-batch takes from.
+    company_id: Mapped[int] = mapped_column(ForeignKey("companies.id", ondelete="CASCADE"), primary_key=True)
+    phone_number_id: Mapped[int] = mapped_column(
+        ForeignKey("numbers.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+    reserved_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
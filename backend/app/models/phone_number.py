@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from sqlalchemy import String, Integer, DateTime, Enum as PgEnum, func, ForeignKey
+from sqlalchemy import String, Integer, DateTime, Enum as PgEnum, func, ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ..core.db import Base
@@ -30,6 +30,10 @@ class GlobalStatus(str, Enum):
 
 class PhoneNumber(Base):
     __tablename__ = "numbers"  # Renamed from phone_numbers
+    __table_args__ = (
+        # Only in-flight assignments are indexed; the stale-assignment reaper range-scans it.
+        Index("ix_numbers_assigned_at_not_null", "assigned_at", postgresql_where=text("assigned_at IS NOT NULL")),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     phone_number: Mapped[str] = mapped_column(String(32), unique=True, index=True, nullable=False)
@@ -48,3 +48,15 @@ class WalletTransaction(Base):
     company = relationship("Company")
     created_by = relationship("AdminUser")
     bank_sms = relationship("BankIncomingSms")
+
+
+class WalletPendingCharge(Base):
+    """Connected-call debit not yet folded into schedule_configs.wallet_balance (deferred billing)."""
+
+    __tablename__ = "wallet_pending_charges"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    company_id: Mapped[int] = mapped_column(ForeignKey("companies.id", ondelete="CASCADE"), index=True, nullable=False)
+    amount_toman: Mapped[int] = mapped_column(Integer, nullable=False)
+    call_count: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
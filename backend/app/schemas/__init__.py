@@ -2,7 +2,14 @@ from .auth import Token, LoginRequest
 from .user import AdminUserCreate, AdminUserUpdate, AdminUserOut
 from .phone_number import PhoneNumberCreate, PhoneNumberOut, PhoneNumberStatusUpdate, PhoneNumberImportResponse
 from .schedule import ScheduleInterval, ScheduleConfigOut, ScheduleConfigUpdate
-from .dialer import NextBatchResponse, DialerReport, DialerBatchOut, ScenarioSimple
+from .dialer import (
+    NextBatchResponse,
+    DialerReport,
+    DialerBatchOut,
+    ScenarioSimple,
+    DialerReportItemResult,
+    DialerReportBatchResult,
+)
 from .company import CompanyCreate, CompanyUpdate, CompanyOut, CompanyDeleteRequest
 from .scenario import ScenarioCreate, ScenarioUpdate, ScenarioOut, RegisterScenariosRequest
 from .outbound_line import (
@@ -37,6 +44,8 @@ __all__ = [
     "DialerReport",
     "DialerBatchOut",
     "ScenarioSimple",
+    "DialerReportItemResult",
+    "DialerReportBatchResult",
     "CompanyCreate",
     "CompanyUpdate",
     "CompanyOut",
@@ -63,3 +63,18 @@ class DialerReport(BaseModel):
     agent_phone: str | None = Field(default=None, description="Phone of the agent who handled the call")
     user_message: str | None = Field(default=None, description="Customer message/comment to store with the attempt")
     batch_id: str | None = Field(default=None, description="Batch ID that dialer believes this report belongs to")
+
+
+class DialerReportItemResult(BaseModel):
+    index: int = Field(..., description="Position of the report in the submitted array")
+    ok: bool
+    id: int | None = None
+    global_status: str | None = None
+    phone_number: str | None = None
+    error: str | None = None
+
+
+class DialerReportBatchResult(BaseModel):
+    accepted: int
+    rejected: int
+    results: list[DialerReportItemResult]
@@ -1,6 +1,7 @@
 from datetime import datetime
 from pydantic import BaseModel, Field
 from ..models.phone_number import CallStatus, GlobalStatus
+from ..models.export_job import ExportJobStatus
 
 
 class PhoneNumberCreate(BaseModel):
@@ -104,3 +105,19 @@ class PhoneNumberExportRequest(BaseModel):
     start_date: str | None = None
     end_date: str | None = None
     company_name: str | None = None
+    format: str = Field(default="xlsx", pattern="^(xlsx|csv)$")
+
+
+class ExportJobOut(BaseModel):
+    id: int
+    status: ExportJobStatus
+    format: str
+    total_rows: int | None = None
+    processed_rows: int = 0
+    error: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
@@ -5,7 +5,7 @@ from fastapi import HTTPException, status
 from ..models.user import AdminUser, UserRole
 from ..schemas.auth import LoginRequest
 from ..schemas.user import AdminUserCreate, AdminUserUpdate, AdminSelfUpdate
-from ..core.security import verify_password, get_password_hash, create_access_token
+from ..core.security import verify_password, get_password_hash, create_access_token, invalidate_principals
 from ..core.config import get_settings
 from .phone_service import normalize_phone
 
@@ -59,6 +59,7 @@ def create_admin_user(db: Session, data: AdminUserCreate) -> AdminUser:
     )
     db.add(user)
     db.commit()
+    invalidate_principals()
     db.refresh(user)
     return user
 
@@ -129,6 +130,7 @@ def update_admin_user(db: Session, user_id: int, data: AdminUserUpdate) -> Admin
     if data.agent_type is not None:
         user.agent_type = data.agent_type
     db.commit()
+    invalidate_principals()
     db.refresh(user)
     return user
 
@@ -149,6 +151,7 @@ def delete_admin_user(db: Session, user_id: int) -> None:
             raise HTTPException(status_code=400, detail="At least one active admin is required")
     db.delete(user)
     db.commit()
+    invalidate_principals()
 
 
 def list_active_agents(db: Session) -> list[AdminUser]:
@@ -192,5 +195,6 @@ def update_self(db: Session, user_id: int, data: AdminSelfUpdate) -> AdminUser:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Phone number already in use")
         user.phone_number = normalized_phone
     db.commit()
+    invalidate_principals()
     db.refresh(user)
     return user
@@ -0,0 +1,109 @@
+import logging
+import re
+from datetime import date, datetime
+
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from ..core.config import get_settings
+from .schedule_service import TEHRAN_TZ
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# On PostgreSQL call_results is range-partitioned by attempted_at, one partition per
+# Tehran calendar month (migration 0018; rows older than the migration live in
+# call_results_legacy, out-of-range rows in call_results_default). This job keeps the
+# next CALL_RESULTS_PARTITIONS_AHEAD months created before any row needs them.
+
+CHECK_INTERVAL_SECONDS = 3600
+_LOCK_KEY = 0x63727074  # pg advisory lock: one partition creator at a time across workers
+# CREATE ... PARTITION OF takes ACCESS EXCLUSIVE on call_results: give up rather than queue
+# every dialer insert behind a long stats/export read; the next hourly run retries.
+LOCK_TIMEOUT = "5s"
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_start(month: date) -> datetime:
+    """First instant of a Tehran calendar month (partition bounds use Tehran months)."""
+    return datetime(month.year, month.month, 1, tzinfo=TEHRAN_TZ)
+
+
+def partition_name(month: date) -> str:
+    return f"call_results_p{month.year:04d}_{month.month:02d}"
+
+
+def _is_partitioned(db: Session) -> bool:
+    return bool(
+        db.execute(
+            text(
+                "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('call_results')"
+            )
+        ).scalar()
+    )
+
+
+def _existing_partitions(db: Session) -> set[str]:
+    rows = db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass('call_results')"
+        )
+    ).scalars()
+    return set(rows)
+
+
+def _legacy_end(db: Session) -> date | None:
+    """First Tehran month not covered by call_results_legacy (None if there is none)."""
+    bound = db.execute(
+        text(
+            "SELECT pg_get_expr(c.relpartbound, c.oid) FROM pg_class c "
+            "WHERE c.oid = to_regclass('call_results_legacy') AND c.relispartition"
+        )
+    ).scalar()
+    match = re.search(r"TO \('([^']+)'\)", bound or "")
+    if not match:
+        return None
+    return datetime.fromisoformat(match.group(1)).astimezone(TEHRAN_TZ).date().replace(day=1)
+
+
+def ensure_partitions(db: Session, today: date | None = None) -> int:
+    """Periodic job: create missing monthly partitions. Returns how many were created."""
+    if db.get_bind().dialect.name != "postgresql" or not _is_partitioned(db):
+        return 0
+    if not db.execute(select(func.pg_try_advisory_xact_lock(_LOCK_KEY))).scalar():
+        return 0
+    current = (today or datetime.now(TEHRAN_TZ).date()).replace(day=1)
+    last = _add_months(current, settings.call_results_partitions_ahead)
+    month = max(current, _legacy_end(db) or current)
+    existing = _existing_partitions(db)
+    created = 0
+    while month <= last:
+        name = partition_name(month)
+        next_month = _add_months(month, 1)
+        if name in existing:
+            month = next_month
+            continue
+        try:
+            with db.begin_nested():
+                db.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+                db.execute(
+                    text(
+                        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF call_results "
+                        f"FOR VALUES FROM ('{month_start(month).isoformat()}') "
+                        f"TO ('{month_start(next_month).isoformat()}')"
+                    )
+                )
+            created += 1
+        except DBAPIError:
+            # Lock timeout (retried next run), or rows for that month already sit in
+            # call_results_default: move them out by hand (see README).
+            logger.exception("call_results_partition_failed name=%s", name)
+        month = next_month
+    db.commit()
+    return created
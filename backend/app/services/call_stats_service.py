@@ -0,0 +1,291 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Sequence
+
+from sqlalchemy import DateTime, delete, func, insert, literal, select, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.functions import FunctionElement
+
+from ..models.call_result import CallResult
+from ..models.call_stats import CallStatsDelta, CallStatsHourly
+from .schedule_service import TEHRAN_TZ
+
+# call_stats_hourly holds call_results counted per (company, Tehran hour, scenario, line,
+# status). Writers never touch it directly: they append +/- rows to call_stats_deltas
+# (report paths, status edits, history deletes), the periodic fold_deltas job moves
+# those into the rollup, and readers add the still-pending deltas on top. Every path that
+# inserts, edits or deletes call results must record its delta here.
+
+FOLD_BATCH_SIZE = 20_000
+_FOLD_LOCK_KEY = 0x63616C6C  # pg advisory lock: one folder at a time across workers
+_ONE_HOUR = timedelta(hours=1)
+
+
+class tehran_hour(FunctionElement):
+    """Start of the Tehran-local hour containing a timestamptz, as timestamptz."""
+
+    type = DateTime(timezone=True)
+    inherit_cache = True
+    name = "tehran_hour"
+
+
+class tehran_day(FunctionElement):
+    """Start of the Tehran-local day containing a timestamptz, as timestamptz."""
+
+    type = DateTime(timezone=True)
+    inherit_cache = True
+    name = "tehran_day"
+
+
+def _pg_trunc(unit: str):
+    def compile_(element, compiler, **kw):
+        tz = str(TEHRAN_TZ)
+        arg = compiler.process(element.clauses, **kw)
+        return f"timezone('{tz}', date_trunc('{unit}', timezone('{tz}', {arg})))"
+    return compile_
+
+
+def _fixed_offset_trunc(fmt: str):
+    # Non-PostgreSQL (SQLite dev/tests): Tehran has had a fixed offset since 2022.
+    def compile_(element, compiler, **kw):
+        minutes = int(datetime.now(TEHRAN_TZ).utcoffset().total_seconds() // 60)
+        arg = compiler.process(element.clauses, **kw)
+        return (
+            f"strftime('%Y-%m-%d %H:%M:%S.000000', "
+            f"strftime('{fmt}', {arg}, '{minutes:+d} minutes'), '{-minutes:+d} minutes')"
+        )
+    return compile_
+
+
+compiles(tehran_hour, "postgresql")(_pg_trunc("hour"))
+compiles(tehran_day, "postgresql")(_pg_trunc("day"))
+compiles(tehran_hour)(_fixed_offset_trunc("%Y-%m-%d %H:00:00"))
+compiles(tehran_day)(_fixed_offset_trunc("%Y-%m-%d 00:00:00"))
+
+
+def _aware(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def hour_bucket(value: datetime) -> datetime:
+    """Python twin of tehran_hour()."""
+    local = _aware(value).astimezone(TEHRAN_TZ)
+    return local.replace(minute=0, second=0, microsecond=0).astimezone(timezone.utc)
+
+
+def _status_value(status) -> str:
+    return getattr(status, "value", status)
+
+
+def _key(call: CallResult, status=None) -> tuple:
+    return (
+        call.company_id or 0,
+        hour_bucket(call.attempted_at),
+        call.scenario_id or 0,
+        call.outbound_line_id or 0,
+        _status_value(status if status is not None else call.status),
+    )
+
+
+def _append(db: Session, deltas: dict[tuple, int]) -> None:
+    rows = [
+        {
+            "company_id": company_id,
+            "bucket": bucket,
+            "scenario_id": scenario_id,
+            "outbound_line_id": outbound_line_id,
+            "status": status,
+            "call_count": count,
+        }
+        for (company_id, bucket, scenario_id, outbound_line_id, status), count in deltas.items()
+        if count
+    ]
+    if rows:
+        db.execute(insert(CallStatsDelta).values(rows))
+
+
+def record_calls(db: Session, call_results: Iterable[CallResult]) -> None:
+    """Count new call results (ORM objects with their final scenario/line/status)."""
+    deltas: dict[tuple, int] = defaultdict(int)
+    for call in call_results:
+        deltas[_key(call)] += 1
+    _append(db, deltas)
+
+
+def record_status_change(db: Session, call: CallResult, old_status) -> None:
+    """One call result's status was edited in place."""
+    deltas: dict[tuple, int] = defaultdict(int)
+    deltas[_key(call, old_status)] -= 1
+    deltas[_key(call)] += 1
+    _append(db, deltas)
+
+
+def record_matching(db: Session, sign: int, *criteria) -> None:
+    """Append one grouped delta per key for the call results matching `criteria`.
+
+    Call with sign=-1 right before matching rows are deleted or edited, and with
+    sign=+1 right after rows are inserted or edited.
+    """
+    company = func.coalesce(CallResult.company_id, 0)
+    bucket = tehran_hour(CallResult.attempted_at)
+    scenario = func.coalesce(CallResult.scenario_id, 0)
+    line = func.coalesce(CallResult.outbound_line_id, 0)
+    grouped = (
+        select(company, bucket, scenario, line, CallResult.status, literal(sign) * func.count())
+        .where(*criteria)
+        .group_by(company, bucket, scenario, line, CallResult.status)
+    )
+    db.execute(
+        insert(CallStatsDelta).from_select(
+            ["company_id", "bucket", "scenario_id", "outbound_line_id", "status", "call_count"],
+            grouped,
+        )
+    )
+
+
+def clear_company(db: Session, company_id: int) -> None:
+    """The company's call history is being deleted outright."""
+    db.execute(delete(CallStatsDelta).where(CallStatsDelta.company_id == company_id))
+    db.execute(delete(CallStatsHourly).where(CallStatsHourly.company_id == company_id))
+
+
+def fold_deltas(db: Session) -> int:
+    """Periodic job: move pending deltas into call_stats_hourly. Returns rows folded."""
+    folded = 0
+    is_postgres = db.get_bind().dialect.name == "postgresql"
+    while True:
+        if is_postgres and not db.execute(select(func.pg_try_advisory_xact_lock(_FOLD_LOCK_KEY))).scalar():
+            return folded
+        batch = select(CallStatsDelta.id).order_by(CallStatsDelta.id).limit(FOLD_BATCH_SIZE)
+        claimed = db.execute(
+            delete(CallStatsDelta)
+            .where(CallStatsDelta.id.in_(batch.scalar_subquery()))
+            .returning(
+                CallStatsDelta.company_id,
+                CallStatsDelta.bucket,
+                CallStatsDelta.scenario_id,
+                CallStatsDelta.outbound_line_id,
+                CallStatsDelta.status,
+                CallStatsDelta.call_count,
+            )
+        ).all()
+        if not claimed:
+            db.commit()
+            return folded
+        totals: dict[tuple, int] = defaultdict(int)
+        for company_id, bucket, scenario_id, outbound_line_id, status, count in claimed:
+            totals[(company_id, _aware(bucket), scenario_id, outbound_line_id, status)] += count
+        stmt = pg_insert(CallStatsHourly).values([
+            {
+                "company_id": key[0],
+                "bucket": key[1],
+                "scenario_id": key[2],
+                "outbound_line_id": key[3],
+                "status": key[4],
+                "call_count": count,
+            }
+            # Sorted so concurrent upserts always lock rollup rows in the same order.
+            for key, count in sorted(totals.items())
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                CallStatsHourly.company_id,
+                CallStatsHourly.bucket,
+                CallStatsHourly.scenario_id,
+                CallStatsHourly.outbound_line_id,
+                CallStatsHourly.status,
+            ],
+            set_={"call_count": CallStatsHourly.call_count + stmt.excluded.call_count},
+        )
+        db.execute(stmt)
+        db.commit()
+        folded += len(claimed)
+
+
+def _key_columns(model, keys: Sequence[str]) -> list:
+    if model is CallResult:
+        columns = {
+            "status": CallResult.status,
+            "scenario_id": func.coalesce(CallResult.scenario_id, 0),
+            "outbound_line_id": func.coalesce(CallResult.outbound_line_id, 0),
+            "hour": tehran_hour(CallResult.attempted_at),
+            "day": tehran_day(CallResult.attempted_at),
+        }
+    else:
+        columns = {
+            "status": model.status,
+            "scenario_id": model.scenario_id,
+            "outbound_line_id": model.outbound_line_id,
+            "hour": model.bucket,
+            "day": tehran_day(model.bucket),
+        }
+    return [columns[key] for key in keys]
+
+
+def _grouped(model, keys, company_id, start, end):
+    columns = _key_columns(model, keys)
+    if model is CallResult:
+        total, time_col, company_col = func.count(CallResult.id), CallResult.attempted_at, CallResult.company_id
+    else:
+        total, time_col, company_col = func.sum(model.call_count), model.bucket, model.company_id
+    query = select(*columns, total)
+    if company_id is not None:
+        query = query.where(company_col == company_id)
+    if start is not None:
+        query = query.where(time_col >= start)
+    if end is not None:
+        query = query.where(time_col < end)
+    if columns:
+        query = query.group_by(*columns)
+    return query
+
+
+def call_counts(
+    db: Session,
+    keys: Sequence[str],
+    start: datetime | None,
+    end: datetime | None = None,
+    company_id: int | None = None,
+) -> dict[tuple, int]:
+    """Number of call results attempted in [start, end), grouped by `keys`.
+
+    Keys: "status", "scenario_id", "outbound_line_id" (0 = none), "hour", "day" (Tehran
+    bucket starts, UTC-aware). Whole hours come from the rollup plus pending deltas;
+    only the unaligned edges of the window (at most an hour each) touch call_results.
+    """
+    edges: list[tuple[datetime | None, datetime | None]] = []
+    lo, hi = start, end
+    if start is not None:
+        lo = hour_bucket(start)
+        if lo != _aware(start):
+            lo += _ONE_HOUR
+    if end is not None:
+        hi = hour_bucket(end)
+    if lo is not None and hi is not None and lo >= hi:
+        edges.append((start, end))
+        lo = hi = None
+        rolled = False
+    else:
+        rolled = True
+        if start is not None and lo != _aware(start):
+            edges.append((start, lo))
+        if end is not None and hi != _aware(end):
+            edges.append((hi, end))
+
+    parts = []
+    if rolled:
+        parts.append(_grouped(CallStatsHourly, keys, company_id, lo, hi))
+        parts.append(_grouped(CallStatsDelta, keys, company_id, lo, hi))
+    for edge_start, edge_end in edges:
+        parts.append(_grouped(CallResult, keys, company_id, edge_start, edge_end))
+
+    # One statement, hence one snapshot: a fold_deltas commit between separate reads of
+    # the rollup and the deltas would drop the folded rows from both.
+    counts: dict[tuple, int] = defaultdict(int)
+    query = parts[0] if len(parts) == 1 else union_all(*parts)
+    for *values, total in db.execute(query):
+        key = tuple(_aware(v) if isinstance(v, datetime) else v for v in values)
+        counts[key] += int(total or 0)
+    return {key: total for key, total in counts.items() if total}
@@ -0,0 +1,76 @@
+import time
+from typing import NamedTuple
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from ..core.config import get_settings
+from ..models.company import Company
+
+settings = get_settings()
+
+# Company slug -> (id, active) for every company, loaded in one query and shared by the
+# dialer, stats and admin routers. Per process: companies.py calls invalidate() after
+# create/update/delete, other workers reload within COMPANY_CACHE_TTL_SECONDS.
+
+# An unknown slug triggers a reload at most this often, so a dialer polling with a wrong
+# slug cannot turn every request into a full companies scan.
+MISS_RELOAD_SECONDS = 2
+
+
+class CompanyRef(NamedTuple):
+    id: int
+    name: str
+    is_active: bool
+
+
+_state: dict = {"by_name": {}, "loaded_at": float("-inf")}
+
+
+def invalidate() -> None:
+    _state["loaded_at"] = float("-inf")
+
+
+def _reload(db: Session) -> dict[str, CompanyRef]:
+    by_name = {
+        name: CompanyRef(company_id, name, bool(is_active))
+        for company_id, name, is_active in db.execute(select(Company.id, Company.name, Company.is_active))
+    }
+    # Swap in one assignment so concurrent readers see either the old or the new map.
+    _state.update(by_name=by_name, loaded_at=time.monotonic())
+    return by_name
+
+
+def lookup(db: Session, name: str) -> CompanyRef | None:
+    """Resolve a company slug (active or not) without touching the DB while fresh."""
+    by_name = _state["by_name"]
+    age = time.monotonic() - _state["loaded_at"]
+    if age >= settings.company_cache_ttl_seconds or (name not in by_name and age >= MISS_RELOAD_SECONDS):
+        # A miss may be a company created on another worker; reload before giving up.
+        by_name = _reload(db)
+    return by_name.get(name)
+
+
+def _active(db: Session, name: str) -> CompanyRef:
+    ref = lookup(db, name)
+    if ref is None or not ref.is_active:
+        raise HTTPException(status_code=404, detail="Company not found")
+    return ref
+
+
+def active_id(db: Session, name: str) -> int:
+    """Id of an active company, 404 otherwise."""
+    return _active(db, name).id
+
+
+def attach(db: Session, ref: CompanyRef) -> Company:
+    """Company bound to `db` without a SELECT (id/name/is_active set, other columns lazy)."""
+    company = Company(id=ref.id, name=ref.name, is_active=ref.is_active)
+    make_transient_to_detached(company)
+    return db.merge(company, load=False)
+
+
+def get_active_company(db: Session, name: str) -> Company:
+    """Active Company bound to `db`, 404 otherwise."""
+    return attach(db, _active(db, name))
@@ -0,0 +1,68 @@
+from typing import Iterable
+
+from sqlalchemy import select, literal, true
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+
+from ..models.call_result import CallResult
+from ..models.company import Company
+from ..models.dialer_pool import DialerPoolEntry
+from ..models.phone_number import PhoneNumber
+
+# A dialer_pool row (company_id, phone_number_id) means "this company has never called
+# this number". next-batch walks the pool instead of anti-joining numbers against
+# call_results, so every path that creates or deletes call results must keep it in sync.
+
+
+def add_numbers_to_pool(db: Session, number_ids: Iterable[int]) -> None:
+    """New numbers become dialable for every company."""
+    ids = list(number_ids)
+    if not ids:
+        return
+    every_company = (
+        select(Company.id, PhoneNumber.id)
+        .select_from(PhoneNumber)
+        .join(Company, true())
+        .where(PhoneNumber.id.in_(ids))
+    )
+    stmt = insert(DialerPoolEntry).from_select(
+        ["company_id", "phone_number_id"],
+        every_company,
+    ).on_conflict_do_nothing()
+    db.execute(stmt)
+
+
+def restore_to_pool(db: Session, company_id: int, number_ids_select) -> None:
+    """Put numbers back into one company's pool (after their call history was reset).
+
+    `number_ids_select` is any selectable yielding a single id column.
+    """
+    stmt = insert(DialerPoolEntry).from_select(
+        ["company_id", "phone_number_id"],
+        select(literal(company_id), number_ids_select.c.id),
+    ).on_conflict_do_nothing()
+    db.execute(stmt)
+
+
+def remove_from_pool(db: Session, company_id: int, number_ids) -> None:
+    """Numbers that now have a call result for this company are no longer candidates.
+
+    `number_ids` may be a list of ids or a select of ids.
+    """
+    db.query(DialerPoolEntry).filter(
+        DialerPoolEntry.company_id == company_id,
+        DialerPoolEntry.phone_number_id.in_(number_ids),
+    ).delete(synchronize_session=False)
+
+
+def seed_company_pool(db: Session, company_id: int) -> None:
+    """Fill a (new) company's pool with every number it has not called yet."""
+    never_called = ~select(CallResult.id).where(
+        CallResult.phone_number_id == PhoneNumber.id,
+        CallResult.company_id == company_id,
+    ).exists()
+    stmt = insert(DialerPoolEntry).from_select(
+        ["company_id", "phone_number_id"],
+        select(literal(company_id), PhoneNumber.id).where(never_called),
+    ).on_conflict_do_nothing()
+    db.execute(stmt)
@@ -0,0 +1,124 @@
+from datetime import datetime
+from typing import Iterable
+
+from sqlalchemy import delete, exists, func, insert, or_, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from ..models.dialer_pool import DialerPoolEntry
+from ..models.dialer_prefetch import DialerPrefetchEntry
+from ..models.phone_number import PhoneNumber, GlobalStatus
+
+# Per-company buffer of pre-selected numbers, kept at DIALER_PREFETCH_WATERMARK by the
+# "dialer_prefetch" job so next-batch can hand numbers out without running the candidate
+# query. A buffered number is reserved like an assigned one (assigned_at set, batch id
+# NULL), so the stale-assignment reaper expires the reservation and its buffer row
+# together after ASSIGNMENT_TIMEOUT_MINUTES.
+
+
+def buffered_counts(db: Session) -> dict[int, int]:
+    """Buffered numbers per company."""
+    return dict(
+        db.execute(
+            select(DialerPrefetchEntry.company_id, func.count()).group_by(DialerPrefetchEntry.company_id)
+        ).all()
+    )
+
+
+def add(db: Session, company_id: int, number_ids: Iterable[int], reserved_at: datetime) -> None:
+    """Buffer numbers the caller has just reserved for this company."""
+    rows = [
+        {"company_id": company_id, "phone_number_id": number_id, "reserved_at": reserved_at}
+        for number_id in number_ids
+    ]
+    if rows:
+        db.execute(insert(DialerPrefetchEntry).values(rows))
+
+
+def take(
+    db: Session,
+    company_id: int,
+    limit: int,
+    batch_id: str,
+    assigned_at: datetime,
+    cooldown_cutoff: datetime,
+) -> list[Row]:
+    """
+    Move up to `limit` buffered numbers into batch `batch_id`. Returns (id, phone_number)
+    rows, newest number first. Numbers that stopped being candidates while buffered
+    (called, complained, reaped) are dropped from the buffer instead of handed out.
+    """
+    if limit <= 0:
+        return []
+    picked = (
+        select(DialerPrefetchEntry.phone_number_id)
+        .where(DialerPrefetchEntry.company_id == company_id)
+        .order_by(DialerPrefetchEntry.phone_number_id.desc())
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .cte("picked")
+        .prefix_with("MATERIALIZED")
+    )
+    number_ids = db.execute(
+        delete(DialerPrefetchEntry)
+        .where(
+            DialerPrefetchEntry.company_id == company_id,
+            DialerPrefetchEntry.phone_number_id.in_(select(picked.c.phone_number_id)),
+        )
+        .returning(DialerPrefetchEntry.phone_number_id)
+    ).scalars().all()
+    if not number_ids:
+        return []
+
+    rows = db.execute(
+        update(PhoneNumber)
+        .where(
+            PhoneNumber.id.in_(number_ids),
+            # Still our reservation: not reaped, not assigned to a batch since.
+            PhoneNumber.assigned_at.is_not(None),
+            PhoneNumber.assigned_batch_id.is_(None),
+            # Same rules as the candidate query, re-checked at hand-out time.
+            PhoneNumber.global_status == GlobalStatus.ACTIVE,
+            or_(PhoneNumber.last_called_at.is_(None), PhoneNumber.last_called_at < cooldown_cutoff),
+            exists().where(
+                DialerPoolEntry.company_id == company_id,
+                DialerPoolEntry.phone_number_id == PhoneNumber.id,
+            ),
+        )
+        .values(assigned_at=assigned_at, assigned_batch_id=batch_id)
+        .returning(PhoneNumber.id, PhoneNumber.phone_number)
+        .execution_options(synchronize_session=False)
+    ).all()
+    _unreserve(db, set(number_ids) - {row.id for row in rows})
+    return sorted(rows, key=lambda row: row.id, reverse=True)
+
+
+def release(db: Session, company_id: int) -> int:
+    """Empty a company's buffer (not callable any more) and free its reservations."""
+    number_ids = db.execute(
+        delete(DialerPrefetchEntry)
+        .where(DialerPrefetchEntry.company_id == company_id)
+        .returning(DialerPrefetchEntry.phone_number_id)
+    ).scalars().all()
+    _unreserve(db, number_ids)
+    return len(number_ids)
+
+
+def expire(db: Session, cutoff: datetime) -> None:
+    """Drop buffer rows whose reservation the stale-assignment reaper frees."""
+    db.execute(delete(DialerPrefetchEntry).where(DialerPrefetchEntry.reserved_at <= cutoff))
+
+
+def _unreserve(db: Session, number_ids) -> None:
+    if not number_ids:
+        return
+    db.execute(
+        update(PhoneNumber)
+        .where(
+            PhoneNumber.id.in_(list(number_ids)),
+            PhoneNumber.assigned_at.is_not(None),
+            PhoneNumber.assigned_batch_id.is_(None),
+        )
+        .values(assigned_at=None)
+        .execution_options(synchronize_session=False)
+    )
@@ -1,29 +1,54 @@
 from datetime import datetime, timezone, timedelta
 from uuid import uuid4
+import asyncio
 import logging
 
 from fastapi import HTTPException
-from sqlalchemy import select, or_
+from sqlalchemy import select, or_, func, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
 from ..core.config import get_settings
+from ..core import metrics
 from ..models.phone_number import PhoneNumber, CallStatus, GlobalStatus
 from ..models.dialer_batch import DialerBatch
 from ..models.call_result import CallResult, CallDirection
 from ..models.dialer_batch_item import DialerBatchItem
+from ..models.dialer_pool import DialerPoolEntry
 from ..models.user import AdminUser, UserRole, AgentType
 from ..models.company import Company
 from ..models.scenario import Scenario
 from ..models.outbound_line import OutboundLine
+from ..models.schedule import ScheduleConfig
 from ..schemas.dialer import DialerReport
-from .schedule_service import is_call_allowed, ensure_config, TEHRAN_TZ, charge_for_connected_call
+from ..schemas.outbound_line import RegisterOutboundLinesRequest
+from ..schemas.scenario import RegisterScenariosRequest
+from .schedule_service import (
+    check_call_window,
+    ensure_config,
+    TEHRAN_TZ,
+    charge_for_connected_call,
+    apply_connected_charges,
+    next_window_start,
+)
 from .phone_service import normalize_phone, _sync_global_status_from_call_status
+from . import (
+    call_stats_service,
+    company_registry,
+    dialer_pool_service,
+    dialer_prefetch_service,
+    number_state_service,
+    schedule_watcher,
+)
 from . import auth_service
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+_PREFETCH_LOCK_KEY = 0x70726674  # pg advisory lock: one prefetch refill at a time across workers
+
 # CRITICAL: Only these 6 statuses are billable (use bot, charge customer)
 BILLABLE_STATUSES = {
     CallStatus.CONNECTED,
@@ -46,12 +71,11 @@ def fetch_next_batch(
     """
     Fetch next batch for a company with:
     1. Global cooldown: no number called by ANY company in last N days
-    2. Company dedup: no number called by THIS company ever
+    2. Company dedup: no number called by THIS company ever (dialer_pool membership)
     3. Global status: exclude COMPLAINED and POWER_OFF
     """
-    config = ensure_config(db, company_id=company.id)
     now = datetime.now(TEHRAN_TZ)
-    allowed, reason, retry_after = is_call_allowed(now, db, company_id=company.id)
+    allowed, reason, retry_after, schedule_version = check_call_window(now, db, company_id=company.id)
 
     active_outbound_lines = db.query(OutboundLine).filter(
         OutboundLine.company_id == company.id,
@@ -67,7 +91,7 @@ def fetch_next_batch(
             "call_allowed": False,
             "timezone": settings.timezone,
             "server_time": now,
-            "schedule_version": config.version,
+            "schedule_version": schedule_version,
             "reason": reason,
             "retry_after_seconds": retry_after,
             "active_scenarios": [
@@ -97,53 +121,43 @@ def fetch_next_batch(
     if settings.max_batch_size > 0:
         requested_size = min(requested_size, settings.max_batch_size)
 
-    unlock_stale_assignments(db)
-
+    batch_id = uuid4().hex
+    now_utc = datetime.now(timezone.utc)
     # Calculate cooldown cutoff
-    cooldown_cutoff = datetime.now(timezone.utc) - timedelta(days=settings.call_cooldown_days)
+    cooldown_cutoff = now_utc - timedelta(days=settings.call_cooldown_days)
 
-    # OPTIMIZED: Use NOT EXISTS instead of NOT IN for better performance
-    # NOT EXISTS works with FOR UPDATE (unlike LEFT JOIN)
-    stmt = (
-        select(PhoneNumber)
-        .where(
-            # Global status must be ACTIVE
-            PhoneNumber.global_status == GlobalStatus.ACTIVE,
-            # Number not assigned to any batch currently
-            PhoneNumber.assigned_at.is_(None),
-            # Never called by this company - use NOT EXISTS with indexed lookup
-            ~select(CallResult.id)
-            .where(
-                CallResult.phone_number_id == PhoneNumber.id,
-                CallResult.company_id == company.id
-            )
-            .exists(),
-            # Global 3-day cooldown (across all companies)
-            or_(
-                PhoneNumber.last_called_at.is_(None),
-                PhoneNumber.last_called_at < cooldown_cutoff
-            ),
+    # Serve from the prefetch buffer first; the candidate query only tops up a short buffer.
+    prefetched = []
+    if settings.dialer_prefetch_watermark > 0:
+        prefetched = dialer_prefetch_service.take(
+            db, company.id, requested_size, batch_id, now_utc, cooldown_cutoff
         )
-        # Newer inserts should be sent first, so sort by descending primary key.
-        .order_by(PhoneNumber.id.desc())
-        .limit(requested_size)
-        .with_for_update(skip_locked=True)
-    )
-
-    numbers = db.execute(stmt).scalars().all()
-    batch_id = uuid4().hex
-    now_utc = datetime.now(timezone.utc)
 
-    for num in numbers:
-        num.assigned_at = now_utc
-        num.assigned_batch_id = batch_id
-        db.add(
-            DialerBatchItem(
-                batch_id=batch_id,
-                company_id=company.id,
-                phone_number_id=num.id,
-                assigned_at=now_utc,
-            )
+    # Lock + assign in one UPDATE ... RETURNING instead of an UPDATE per loaded number.
+    selected = []
+    if requested_size > len(prefetched):
+        selected = _reserve_candidates(
+            db,
+            company.id,
+            requested_size - len(prefetched),
+            cooldown_cutoff,
+            now_utc,
+            batch_id=batch_id,
+        )
+    # RETURNING order is unspecified; keep the pool's newest-first order.
+    numbers = [*prefetched, *sorted(selected, key=lambda num: num.id, reverse=True)]
+
+    if numbers:
+        db.execute(
+            insert(DialerBatchItem).values([
+                {
+                    "batch_id": batch_id,
+                    "company_id": company.id,
+                    "phone_number_id": num.id,
+                    "assigned_at": now_utc,
+                }
+                for num in numbers
+            ])
         )
 
     db.add(
@@ -154,6 +168,11 @@ def fetch_next_batch(
         )
     )
     db.commit()
+    metrics.DIALER_NUMBERS_REQUESTED.labels(company.name).inc(requested_size)
+    metrics.DIALER_NUMBERS_PREFETCHED.labels(company.name).inc(len(prefetched))
+    metrics.DIALER_NUMBERS_RETURNED.labels(company.name).inc(len(numbers))
+    if numbers:
+        metrics.DIALER_BATCHES.labels(company.name).inc()
 
     # Get split agent lists
     inbound_agents = db.query(AdminUser).filter(
@@ -174,7 +193,7 @@ def fetch_next_batch(
         "call_allowed": True,
         "timezone": settings.timezone,
         "server_time": now,
-        "schedule_version": config.version,
+        "schedule_version": schedule_version,
         "active_scenarios": [
             {"id": s.id, "name": s.name, "display_name": s.display_name}
             for s in active_scenarios
@@ -211,6 +230,95 @@ def fetch_next_batch(
     }
 
 
+def _candidate_numbers_stmt(company_id: int, limit: int, cooldown_cutoff: datetime):
+    """
+    Candidate selection driven by the per-company dialer_pool: a backward range scan
+    on its (company_id, phone_number_id) primary key instead of an anti-join of all
+    numbers against call_results.
+    """
+    return (
+        select(PhoneNumber.id)
+        .join(DialerPoolEntry, DialerPoolEntry.phone_number_id == PhoneNumber.id)
+        .where(
+            # Never called by this company
+            DialerPoolEntry.company_id == company_id,
+            # Global status must be ACTIVE
+            PhoneNumber.global_status == GlobalStatus.ACTIVE,
+            # Number not assigned to any batch currently
+            PhoneNumber.assigned_at.is_(None),
+            # Global 3-day cooldown (across all companies)
+            or_(
+                PhoneNumber.last_called_at.is_(None),
+                PhoneNumber.last_called_at < cooldown_cutoff
+            ),
+        )
+        # Newer inserts should be sent first, so sort by descending primary key.
+        .order_by(DialerPoolEntry.phone_number_id.desc())
+        .limit(limit)
+        .with_for_update(of=PhoneNumber, skip_locked=True)
+    )
+
+
+def _reserve_candidates(
+    db: Session,
+    company_id: int,
+    limit: int,
+    cooldown_cutoff: datetime,
+    assigned_at: datetime,
+    batch_id: str | None = None,
+):
+    """
+    Lock up to `limit` candidates and mark them assigned in one UPDATE ... RETURNING
+    (id, phone_number). With batch_id=None the numbers are only reserved (prefetch).
+    """
+    # MATERIALIZED CTE: the locking LIMIT runs exactly once, so at most `limit` rows are
+    # assigned (an IN (subquery) may be re-evaluated by the planner).
+    candidates = _candidate_numbers_stmt(company_id, limit, cooldown_cutoff).cte("candidates").prefix_with(
+        "MATERIALIZED"
+    )
+    return db.execute(
+        update(PhoneNumber)
+        .where(PhoneNumber.id.in_(select(candidates.c.id)))
+        .values(assigned_at=assigned_at, assigned_batch_id=batch_id)
+        .returning(PhoneNumber.id, PhoneNumber.phone_number)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+
+def refill_prefetch(db: Session) -> int:
+    """
+    Periodic "dialer_prefetch" job: top every callable company's buffer up to
+    DIALER_PREFETCH_WATERMARK and release the buffers of companies that can no longer
+    call. Returns how many numbers were reserved.
+    """
+    # Window checks first: the insufficient-funds path commits, which would release the
+    # xact-scoped lock below and let a second worker refill the same buffers.
+    active_ids = db.execute(select(Company.id).where(Company.is_active == True)).scalars().all()
+    allowed_ids = {company_id for company_id in active_ids if check_call_window(None, db, company_id=company_id)[0]}
+    if db.get_bind().dialect.name == "postgresql" and not db.execute(
+        select(func.pg_try_advisory_xact_lock(_PREFETCH_LOCK_KEY))
+    ).scalar():
+        return 0
+    now_utc = datetime.now(timezone.utc)
+    cooldown_cutoff = now_utc - timedelta(days=settings.call_cooldown_days)
+    buffered = dialer_prefetch_service.buffered_counts(db)
+
+    reserved = 0
+    for company_id in sorted(allowed_ids | buffered.keys()):
+        if company_id not in allowed_ids:
+            if buffered.get(company_id):
+                dialer_prefetch_service.release(db, company_id)
+            continue
+        missing = settings.dialer_prefetch_watermark - buffered.get(company_id, 0)
+        if missing <= 0:
+            continue
+        rows = _reserve_candidates(db, company_id, missing, cooldown_cutoff, now_utc)
+        dialer_prefetch_service.add(db, company_id, [row.id for row in rows], now_utc)
+        reserved += len(rows)
+    db.commit()
+    return reserved
+
+
 def report_result(db: Session, report: DialerReport, company: Company):
     """
     Process call result:
@@ -220,19 +328,7 @@ def report_result(db: Session, report: DialerReport, company: Company):
     4. Charge billing if status is billable
     """
     normalized_phone = normalize_phone(report.phone_number) if report.phone_number else None
-    logger.warning(
-        "dialer_report_result company=%s phone=%s number_id=%s batch_id=%s status=%s scenario_id=%s outbound_line_id=%s agent_id=%s agent_phone=%s attempted_at=%s",
-        report.company,
-        report.phone_number,
-        report.number_id,
-        report.batch_id,
-        report.status.value,
-        report.scenario_id,
-        report.outbound_line_id,
-        report.agent_id,
-        report.agent_phone,
-        report.attempted_at.isoformat(),
-    )
+    _log_report(report)
     if not normalized_phone and report.number_id is None:
         raise HTTPException(status_code=400, detail="phone_number or number_id is required")
 
@@ -260,6 +356,8 @@ def report_result(db: Session, report: DialerReport, company: Company):
                 global_status=GlobalStatus.ACTIVE,
             )
             db.add(number)
+            db.flush()
+            dialer_pool_service.add_numbers_to_pool(db, [number.id])
             db.commit()
             db.refresh(number)
         except IntegrityError:
@@ -312,6 +410,8 @@ def report_result(db: Session, report: DialerReport, company: Company):
     )
     db.add(call_result)
     db.flush()
+    number_state_service.record_calls(db, [call_result])
+    dialer_pool_service.remove_from_pool(db, company.id, [number.id])
 
     now_utc = datetime.now(timezone.utc)
     batch_item = None
@@ -382,8 +482,10 @@ def report_result(db: Session, report: DialerReport, company: Company):
     batch_item.report_scenario_id = resolved_scenario_id
     batch_item.report_outbound_line_id = report.outbound_line_id
     batch_item.report_reason = report.reason
+    call_stats_service.record_calls(db, [call_result])
 
     db.commit()
+    metrics.DIALER_REPORTS.labels(company.name, report.status.value).inc()
 
     # Charge billing only for billable statuses
     if report.status in BILLABLE_STATUSES:
@@ -397,23 +499,450 @@ def report_result(db: Session, report: DialerReport, company: Company):
     }
 
 
+def report_results(db: Session, reports: list[DialerReport]) -> dict:
+    """
+    Bulk variant of report_result for dialer servers that buffer results.
+
+    Companies, numbers, agents, batch items and fallback scenarios are resolved with
+    one set-based query each; all writes (call results, batch traces, pool pruning,
+    wallet charges) land in a single transaction. Invalid reports are rejected
+    individually and do not abort the rest of the array.
+    """
+    results: list[dict | None] = [None] * len(reports)
+
+    def reject(index: int, error: str) -> None:
+        results[index] = {"index": index, "ok": False, "error": error}
+
+    # 1) Companies
+    companies = {}
+    for name in {r.company for r in reports}:
+        ref = company_registry.lookup(db, name)
+        if ref and ref.is_active:
+            companies[name] = company_registry.attach(db, ref)
+
+    pending: list[tuple[int, DialerReport, Company, str | None]] = []
+    for index, report in enumerate(reports):
+        _log_report(report)
+        company = companies.get(report.company)
+        if not company:
+            reject(index, "Company not found")
+            continue
+        normalized_phone = normalize_phone(report.phone_number) if report.phone_number else None
+        if not normalized_phone and report.number_id is None:
+            reject(index, "phone_number or number_id is required")
+            continue
+        pending.append((index, report, company, normalized_phone))
+
+    # 2) Numbers: one locking lookup by id or phone, auto-create the unknown phones, lock those too.
+    wanted_ids = {r.number_id for _, r, _, _ in pending if r.number_id is not None}
+    wanted_phones = {phone for _, _, _, phone in pending if phone}
+    by_id: dict[int, PhoneNumber] = {}
+    by_phone: dict[str, PhoneNumber] = {}
+
+    def load_numbers(ids: set[int], phones: set[str]) -> None:
+        if not ids and not phones:
+            return
+        rows = (
+            db.query(PhoneNumber)
+            .filter(or_(PhoneNumber.id.in_(ids), PhoneNumber.phone_number.in_(phones)))
+            .order_by(PhoneNumber.id)
+            .with_for_update()
+            .all()
+        )
+        for row in rows:
+            by_id[row.id] = row
+            by_phone[row.phone_number] = row
+
+    def match_number(report: DialerReport, phone: str | None) -> PhoneNumber | None:
+        number = by_id.get(report.number_id) if report.number_id is not None else None
+        if number and phone and number.phone_number != phone:
+            number = None
+        if not number and phone:
+            number = by_phone.get(phone)
+        return number
+
+    load_numbers(wanted_ids, wanted_phones)
+    missing_phones = sorted({phone for _, r, _, phone in pending if phone and not match_number(r, phone)})
+    if missing_phones:
+        created_ids = db.execute(
+            insert(PhoneNumber)
+            .values([{"phone_number": phone, "global_status": GlobalStatus.ACTIVE} for phone in missing_phones])
+            .on_conflict_do_nothing(index_elements=[PhoneNumber.phone_number])
+            .returning(PhoneNumber.id)
+        ).scalars().all()
+        dialer_pool_service.add_numbers_to_pool(db, created_ids)
+        load_numbers(set(), set(missing_phones))
+
+    resolved: list[tuple[int, DialerReport, Company, PhoneNumber]] = []
+    for index, report, company, phone in pending:
+        number = match_number(report, phone)
+        if not number:
+            reject(index, "Number not found")
+            continue
+        resolved.append((index, report, company, number))
+
+    # 3) Agents
+    agent_ids = {r.agent_id for _, r, _, _ in resolved if r.agent_id is not None}
+    agent_phones = {normalize_phone(r.agent_phone) for _, r, _, _ in resolved if r.agent_phone} - {None}
+    agents_by_id: dict[int, AdminUser] = {}
+    agents_by_phone: dict[tuple[int | None, str], AdminUser] = {}
+    if agent_ids or agent_phones:
+        for agent in db.query(AdminUser).filter(
+            or_(AdminUser.id.in_(agent_ids), AdminUser.phone_number.in_(agent_phones))
+        ).all():
+            agents_by_id[agent.id] = agent
+            if agent.phone_number:
+                agents_by_phone[(agent.company_id, agent.phone_number)] = agent
+
+    # 4) Batch items and previous scenarios for every (company, number) pair touched
+    number_ids = {number.id for _, _, _, number in resolved}
+    company_ids = {company.id for _, _, company, _ in resolved}
+    items_by_pair: dict[tuple[int, int], list[DialerBatchItem]] = {}
+    last_scenario: dict[tuple[int, int], int] = {}
+    if number_ids:
+        for item in (
+            db.query(DialerBatchItem)
+            .filter(
+                DialerBatchItem.company_id.in_(company_ids),
+                DialerBatchItem.phone_number_id.in_(number_ids),
+            )
+            .order_by(DialerBatchItem.id.desc())
+            .all()
+        ):
+            items_by_pair.setdefault((item.company_id, item.phone_number_id), []).append(item)
+
+        latest_with_scenario = (
+            select(func.max(CallResult.id))
+            .where(
+                CallResult.company_id.in_(company_ids),
+                CallResult.phone_number_id.in_(number_ids),
+                CallResult.scenario_id.is_not(None),
+            )
+            .group_by(CallResult.company_id, CallResult.phone_number_id)
+        )
+        for company_id, number_id, scenario_id in db.execute(
+            select(CallResult.company_id, CallResult.phone_number_id, CallResult.scenario_id)
+            .where(CallResult.id.in_(latest_with_scenario))
+        ).all():
+            last_scenario[(company_id, number_id)] = scenario_id
+
+    # 5) Apply each report in submission order
+    now_utc = datetime.now(timezone.utc)
+    configs: dict[int, ScheduleConfig] = {}
+    billable_by_company: dict[int, list[int | None]] = {}
+    called_by_company: dict[int, list[int]] = {}
+    written: list[tuple[int, PhoneNumber, CallResult, DialerBatchItem, DialerReport]] = []
+
+    for index, report, company, number in resolved:
+        agent = agents_by_id.get(report.agent_id) if report.agent_id is not None else None
+        if agent and agent.company_id != company.id:
+            agent = None
+        normalized_agent_phone = normalize_phone(report.agent_phone) if report.agent_phone else None
+        if not agent and normalized_agent_phone:
+            agent = agents_by_phone.get((company.id, normalized_agent_phone))
+        if agent and agent.role != UserRole.AGENT:
+            agent = None
+        if agent and not agent.is_active:
+            reject(index, "Agent is inactive")
+            continue
+
+        if report.call_allowed is not None:
+            config = configs.get(company.id)
+            if config is None:
+                config = configs[company.id] = ensure_config(db, company_id=company.id)
+            if config.enabled != report.call_allowed:
+                config.enabled = report.call_allowed
+                config.version += 1
+            config.disabled_by_dialer = not report.call_allowed
+
+        assigned_batch_snapshot = number.assigned_batch_id
+        number.last_called_at = report.attempted_at
+        number.last_called_company_id = company.id
+        number.assigned_at = None
+        number.assigned_batch_id = None
+        _sync_global_status_from_call_status(number, report.status)
+
+        pair = (company.id, number.id)
+        candidates = items_by_pair.get(pair, [])
+        batch_item = (
+            next((i for i in candidates if report.batch_id and i.batch_id == report.batch_id), None)
+            or next((i for i in candidates if assigned_batch_snapshot and i.batch_id == assigned_batch_snapshot), None)
+            or (candidates[0] if candidates else None)
+        )
+        if not batch_item:
+            batch_item = DialerBatchItem(
+                batch_id=report.batch_id or assigned_batch_snapshot or f"unknown-{uuid4().hex[:12]}",
+                company_id=company.id,
+                phone_number_id=number.id,
+                assigned_at=report.attempted_at,
+            )
+            db.add(batch_item)
+            items_by_pair[pair] = [batch_item] + candidates
+
+        resolved_scenario_id = report.scenario_id
+        if resolved_scenario_id is None:
+            resolved_scenario_id = batch_item.report_scenario_id
+        if resolved_scenario_id is None:
+            resolved_scenario_id = last_scenario.get(pair)
+        if resolved_scenario_id is not None:
+            last_scenario[pair] = resolved_scenario_id
+
+        call_result = CallResult(
+            phone_number_id=number.id,
+            company_id=company.id,
+            scenario_id=resolved_scenario_id,
+            outbound_line_id=report.outbound_line_id,
+            call_direction=CallDirection.INBOUND if report.number_id is None else CallDirection.OUTBOUND,
+            status=report.status.value,
+            reason=report.reason,
+            attempted_at=report.attempted_at,
+            agent_id=agent.id if agent else None,
+            user_message=report.user_message,
+        )
+        db.add(call_result)
+
+        batch_item.reported_at = now_utc
+        batch_item.report_batch_id = report.batch_id
+        batch_item.report_attempted_at = report.attempted_at
+        batch_item.report_status = report.status.value
+        batch_item.report_scenario_id = resolved_scenario_id
+        batch_item.report_outbound_line_id = report.outbound_line_id
+        batch_item.report_reason = report.reason
+
+        called_by_company.setdefault(company.id, []).append(number.id)
+        if report.status in BILLABLE_STATUSES:
+            billable_by_company.setdefault(company.id, []).append(resolved_scenario_id)
+        written.append((index, number, call_result, batch_item, report))
+
+    # 6) One flush for all inserts, then link traces, prune pools and charge wallets
+    db.flush()
+    for _, _, call_result, batch_item, _ in written:
+        batch_item.report_call_result_id = call_result.id
+    number_state_service.record_calls(db, [call_result for _, _, call_result, _, _ in written])
+    call_stats_service.record_calls(db, [call_result for _, _, call_result, _, _ in written])
+    for company_id, ids in called_by_company.items():
+        dialer_pool_service.remove_from_pool(db, company_id, ids)
+    for company_id, scenario_ids in billable_by_company.items():
+        apply_connected_charges(db, company_id=company_id, scenario_ids=scenario_ids)
+    db.commit()
+
+    for _, _, _, _, report in written:
+        metrics.DIALER_REPORTS.labels(report.company, report.status.value).inc()
+    for index, number, _, _, _ in written:
+        results[index] = {
+            "index": index,
+            "ok": True,
+            "id": number.id,
+            "global_status": number.global_status.value,
+            "phone_number": number.phone_number,
+        }
+    accepted = sum(1 for r in results if r and r["ok"])
+    return {
+        "accepted": accepted,
+        "rejected": len(reports) - accepted,
+        "results": results,
+    }
+
+
+def register_scenarios(db: Session, company: Company, payload: RegisterScenariosRequest) -> dict:
+    """Dialer app registers available scenarios on startup"""
+    cfg = ensure_config(db, company_id=company.id)
+    default_cost = cfg.cost_per_connected or 0
+
+    incoming = {item.name: item for item in payload.scenarios}
+    existing_rows = db.query(Scenario).filter(Scenario.company_id == company.id).all()
+    existing_by_name = {row.name: row for row in existing_rows}
+
+    created = 0
+    updated = 0
+    deactivated = 0
+
+    for name, item in incoming.items():
+        existing = existing_by_name.get(name)
+        if existing:
+            if existing.display_name != item.display_name:
+                existing.display_name = item.display_name
+                updated += 1
+            if existing.cost_per_connected is None:
+                existing.cost_per_connected = default_cost
+        else:
+            db.add(Scenario(
+                company_id=company.id,
+                name=name,
+                display_name=item.display_name,
+                cost_per_connected=default_cost,
+                is_active=True,
+            ))
+            created += 1
+
+    incoming_names = set(incoming.keys())
+    for row in existing_rows:
+        if row.name not in incoming_names and row.is_active:
+            row.is_active = False
+            deactivated += 1
+
+    # Dialer registration is authoritative for existence; panel controls active toggle afterward.
+    db.commit()
+    return {
+        "registered": len(incoming),
+        "created": created,
+        "updated": updated,
+        "deactivated": deactivated,
+    }
+
+
+def _default_outbound_line_display_name(phone_number: str) -> str:
+    return f"Line {phone_number}"
+
+
+def register_outbound_lines(db: Session, company: Company, payload: RegisterOutboundLinesRequest) -> dict:
+    """Dialer app registers available outbound lines on startup."""
+    incoming = {item.phone_number: item for item in payload.outbound_lines}
+    existing_rows = db.query(OutboundLine).filter(OutboundLine.company_id == company.id).all()
+    existing_by_phone = {row.phone_number: row for row in existing_rows}
+
+    created = 0
+    updated = 0
+    deactivated = 0
+
+    for phone, item in incoming.items():
+        existing = existing_by_phone.get(phone)
+        if existing:
+            # Display names are panel-owned and must not be overwritten by dialer registration.
+            pass
+        else:
+            db.add(OutboundLine(
+                company_id=company.id,
+                phone_number=phone,
+                display_name=_default_outbound_line_display_name(phone),
+                is_active=True,
+            ))
+            created += 1
+
+    # Dialer registration updates/creates known lines only.
+    # Active/inactive state is controlled from panel and must remain untouched here.
+    db.commit()
+    return {
+        "registered": len(incoming),
+        "created": created,
+        "updated": updated,
+        "deactivated": deactivated,
+    }
+
+
+# --- asyncio entry points for api/dialer.py ------------------------------------------
+# The dialer routes run on the event loop with an AsyncSession (asyncpg). The service
+# logic above is shared with the sync code paths through AsyncSession.run_sync: it runs
+# in a greenlet on the loop and every DB round trip is awaited, so no threadpool worker
+# is held while Postgres works.
+
+
+async def get_active_company(db: AsyncSession, name: str) -> Company:
+    return await db.run_sync(company_registry.get_active_company, name)
+
+
+async def fetch_next_batch_async(
+    db: AsyncSession,
+    company: Company,
+    size: int | None = None,
+    active_lines_count: int | None = None,
+) -> dict:
+    return await db.run_sync(fetch_next_batch, company, size, active_lines_count)
+
+
+async def wait_for_next_batch(
+    db: AsyncSession,
+    company_name: str,
+    size: int | None = None,
+    active_lines_count: int | None = None,
+    wait_seconds: float = 0,
+) -> dict:
+    """
+    Long-poll variant of next-batch: while calling is not allowed, hold the request for
+    up to `wait_seconds` and answer as soon as the company becomes callable. Wakes on a
+    schedule_configs.version change (enabled flip, wallet top-up, window edit), seen
+    through the shared per-company schedule_watcher, or when the next window opens. No
+    DB connection is held while waiting; every answer is a fresh fetch_next_batch.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait_seconds
+    while True:
+        company = await get_active_company(db, company_name)
+        company_id = company.id
+        result = await fetch_next_batch_async(db, company, size, active_lines_count)
+        if result["call_allowed"]:
+            return result
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            # The dialer long-polls again right away; the 300/900s hint would make it
+            # sleep past the moment the company becomes callable.
+            result["retry_after_seconds"] = 0
+            return result
+        window_start = await db.run_sync(next_window_start, company_id)
+        await db.close()
+        if window_start is not None:
+            remaining = min(remaining, max((window_start - datetime.now(TEHRAN_TZ)).total_seconds(), 0))
+        await schedule_watcher.wait_for_change(db.bind, company_id, result["schedule_version"], remaining)
+
+
+async def report_result_async(db: AsyncSession, report: DialerReport, company: Company) -> dict:
+    return await db.run_sync(report_result, report, company)
+
+
+async def report_results_async(db: AsyncSession, reports: list[DialerReport]) -> dict:
+    return await db.run_sync(report_results, reports)
+
+
+async def register_scenarios_async(db: AsyncSession, company: Company, payload: RegisterScenariosRequest) -> dict:
+    return await db.run_sync(register_scenarios, company, payload)
+
+
+async def register_outbound_lines_async(
+    db: AsyncSession,
+    company: Company,
+    payload: RegisterOutboundLinesRequest,
+) -> dict:
+    return await db.run_sync(register_outbound_lines, company, payload)
+
+
 def unlock_stale_assignments(db: Session) -> int:
-    """Unlock numbers that have been assigned for too long"""
+    """
+    Unlock numbers that have been assigned for too long. Runs as the periodic
+    "stale_assignments" job (not on next-batch): one set-based UPDATE over the
+    partial ix_numbers_assigned_at_not_null index. Returns the number of rows freed.
+    """
     cutoff = datetime.now(timezone.utc) - timedelta(minutes=settings.assignment_timeout_minutes)
-    stale = (
-        db.query(PhoneNumber)
-        .filter(
+    # Prefetch reservations expire on the same clock as batch assignments.
+    dialer_prefetch_service.expire(db, cutoff)
+    freed = db.execute(
+        update(PhoneNumber)
+        .where(
             PhoneNumber.assigned_at.is_not(None),
             PhoneNumber.assigned_at <= cutoff,
         )
-        .all()
+        .values(assigned_at=None, assigned_batch_id=None)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    if freed:
+        metrics.STALE_ASSIGNMENTS_UNLOCKED.inc(freed)
+    return freed
+
+
+def _log_report(report: DialerReport) -> None:
+    logger.warning(
+        "dialer_report_result company=%s phone=%s number_id=%s batch_id=%s status=%s scenario_id=%s outbound_line_id=%s agent_id=%s agent_phone=%s attempted_at=%s",
+        report.company,
+        report.phone_number,
+        report.number_id,
+        report.batch_id,
+        report.status.value,
+        report.scenario_id,
+        report.outbound_line_id,
+        report.agent_id,
+        report.agent_phone,
+        report.attempted_at.isoformat(),
     )
-    for num in stale:
-        num.assigned_at = None
-        num.assigned_batch_id = None
-    if stale:
-        db.commit()
-    return len(stale)
 
 
 def _resolve_agent(db: Session, report: DialerReport, company: Company) -> AdminUser | None:
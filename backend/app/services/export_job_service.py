@@ -0,0 +1,165 @@
+import logging
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, or_, update
+from sqlalchemy.orm import Session
+
+from ..core.config import get_settings
+from ..core.db import read_session
+from ..models.export_job import ExportJob, ExportJobStatus
+from ..models.user import AdminUser
+from ..schemas.phone_number import PhoneNumberExportRequest
+from . import phone_service
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# How often the retention sweep runs; retention itself is EXPORT_JOB_RETENTION_HOURS.
+SWEEP_INTERVAL_SECONDS = 600
+
+
+def exports_dir() -> str:
+    path = settings.export_jobs_dir or os.path.join(tempfile.gettempdir(), "callcenter_exports")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def create_job(db: Session, payload: PhoneNumberExportRequest, current_user: AdminUser) -> ExportJob:
+    """Queue an export. The request is validated now so bad filters fail fast with 4xx."""
+    phone_service._export_query(db, payload, current_user)
+    job = ExportJob(
+        created_by_user_id=current_user.id,
+        status=ExportJobStatus.PENDING,
+        format=payload.format,
+        request=payload.model_dump(mode="json"),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def get_job(db: Session, job_id: int, current_user: AdminUser) -> ExportJob:
+    job = db.get(ExportJob, job_id)
+    if not job or (not current_user.is_superuser and job.created_by_user_id != current_user.id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export job not found")
+    return job
+
+
+def get_job_file(db: Session, job_id: int, current_user: AdminUser) -> tuple[ExportJob, str]:
+    job = get_job(db, job_id, current_user)
+    if job.status != ExportJobStatus.DONE:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Export is not finished yet")
+    if not job.file_path or not os.path.exists(job.file_path):
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Export file has expired")
+    return job, job.file_path
+
+
+def run_pending_jobs(db: Session) -> int:
+    """Claim and run queued exports one at a time; returns how many were processed.
+
+    SKIP LOCKED lets every API worker run this loop without two of them picking the
+    same job.
+    """
+    processed = 0
+    while True:
+        job = (
+            db.query(ExportJob)
+            .filter(ExportJob.status == ExportJobStatus.PENDING)
+            .order_by(ExportJob.id)
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+        if not job:
+            return processed
+        job.status = ExportJobStatus.RUNNING
+        job.started_at = job.heartbeat_at = datetime.now(timezone.utc)
+        db.commit()
+        _run_job(db, job)
+        processed += 1
+
+
+def _run_job(db: Session, job: ExportJob) -> None:
+    final_path = os.path.join(exports_dir(), f"numbers_export_{job.id}.{job.format}")
+    part_path = _part_path(job.id, job.format)
+    # The export streams through a server-side cursor on its own session, so progress
+    # can be committed on `db` without closing that cursor. With a replica configured the
+    # rows are read there; job bookkeeping always stays on the primary.
+    reader = read_session() if settings.database_replica_url else Session(bind=db.get_bind())
+    try:
+        user = reader.get(AdminUser, job.created_by_user_id) if job.created_by_user_id else None
+        if not user:
+            raise RuntimeError("Requesting user no longer exists")
+        payload = PhoneNumberExportRequest(**job.request)
+        job.total_rows = phone_service.count_export_rows(reader, payload, user)
+        job.heartbeat_at = datetime.now(timezone.utc)
+        db.commit()
+
+        def report(rows: int) -> None:
+            job.processed_rows = rows
+            job.heartbeat_at = datetime.now(timezone.utc)
+            db.commit()
+
+        with open(part_path, "wb") as out:
+            phone_service.write_export(reader, payload, user, out, on_progress=report)
+        os.replace(part_path, final_path)
+        job.file_path = final_path
+        job.status = ExportJobStatus.DONE
+    except Exception as exc:
+        logger.exception("export_job_failed id=%s", job.id)
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        db.rollback()
+        job.status = ExportJobStatus.FAILED
+        job.error = str(getattr(exc, "detail", exc))[:500]
+    finally:
+        reader.close()
+    job.finished_at = datetime.now(timezone.utc)
+    db.commit()
+
+
+def _part_path(job_id: int, fmt: str) -> str:
+    return os.path.join(exports_dir(), f"numbers_export_{job_id}.{fmt}.part")
+
+
+def fail_stalled_jobs(db: Session) -> int:
+    """Mark RUNNING jobs FAILED when their worker stopped reporting progress (restart,
+    OOM, deploy) for EXPORT_JOB_STALL_MINUTES, so pollers get an answer."""
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(minutes=settings.export_job_stall_minutes)
+    stalled = db.execute(
+        update(ExportJob)
+        .where(
+            ExportJob.status == ExportJobStatus.RUNNING,
+            or_(
+                ExportJob.heartbeat_at < cutoff,
+                ExportJob.heartbeat_at.is_(None) & (func.coalesce(ExportJob.started_at, ExportJob.created_at) < cutoff),
+            ),
+        )
+        .values(status=ExportJobStatus.FAILED, error="Export worker stopped; please retry", finished_at=now)
+        .returning(ExportJob.id, ExportJob.format)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.commit()
+    for job_id, fmt in stalled:
+        logger.warning("export_job_stalled id=%s", job_id)
+        if os.path.exists(_part_path(job_id, fmt)):
+            os.remove(_part_path(job_id, fmt))
+    return len(stalled)
+
+
+def sweep_expired_jobs(db: Session) -> int:
+    """Fail stalled jobs, then delete jobs (and their files) older than the retention window."""
+    stalled = fail_stalled_jobs(db)
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.export_job_retention_hours)
+    expired = db.query(ExportJob).filter(ExportJob.created_at < cutoff).all()
+    for job in expired:
+        if job.file_path and os.path.exists(job.file_path):
+            os.remove(job.file_path)
+        db.delete(job)
+    if expired:
+        db.commit()
+    return stalled + len(expired)
@@ -0,0 +1,173 @@
+from typing import Iterable
+
+from sqlalchemy import select, delete, and_, literal
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+
+from ..models.call_result import CallResult
+from ..models.company_number_state import CompanyNumberState
+from ..models.phone_number import PhoneNumber
+
+# company_number_state mirrors "latest call_result per (company, number)" so the Numbers
+# screen can filter, sort and count with indexed lookups instead of max(id)/row_number()
+# scans over call_results. Every path that writes or deletes call results keeps it in sync.
+
+
+def _status_value(status) -> str | None:
+    return getattr(status, "value", status)
+
+
+def record_calls(db: Session, call_results: Iterable[CallResult]) -> None:
+    """Fold newly flushed call results into the state (newest id wins, counts accumulate)."""
+    latest: dict[tuple[int, int], CallResult] = {}
+    counts: dict[tuple[int, int], int] = {}
+    for call in call_results:
+        if call.company_id is None:
+            continue
+        key = (call.company_id, call.phone_number_id)
+        counts[key] = counts.get(key, 0) + 1
+        if key not in latest or call.id > latest[key].id:
+            latest[key] = call
+    if not latest:
+        return
+
+    stmt = insert(CompanyNumberState).values([
+        {
+            "company_id": company_id,
+            "phone_number_id": number_id,
+            "latest_call_result_id": call.id,
+            "status": _status_value(call.status),
+            "attempted_at": call.attempted_at,
+            "agent_id": call.agent_id,
+            "scenario_id": call.scenario_id,
+            "outbound_line_id": call.outbound_line_id,
+            "attempt_count": counts[(company_id, number_id)],
+        }
+        for (company_id, number_id), call in latest.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CompanyNumberState.company_id, CompanyNumberState.phone_number_id],
+        set_={
+            "latest_call_result_id": stmt.excluded.latest_call_result_id,
+            "status": stmt.excluded.status,
+            "attempted_at": stmt.excluded.attempted_at,
+            "agent_id": stmt.excluded.agent_id,
+            "scenario_id": stmt.excluded.scenario_id,
+            "outbound_line_id": stmt.excluded.outbound_line_id,
+            "attempt_count": CompanyNumberState.attempt_count + stmt.excluded.attempt_count,
+        },
+    )
+    db.execute(stmt)
+
+
+def record_inserted_calls(db: Session, company_id: int, number_ids_select) -> None:
+    """Create state rows for numbers whose first call result was just bulk-inserted.
+
+    `number_ids_select` is any selectable yielding a single id column; numbers that
+    already have a state row are left alone.
+    """
+    has_state = (
+        select(CompanyNumberState.phone_number_id)
+        .where(
+            CompanyNumberState.company_id == company_id,
+            CompanyNumberState.phone_number_id == CallResult.phone_number_id,
+        )
+        .exists()
+    )
+    first_calls = (
+        select(
+            CallResult.company_id,
+            CallResult.phone_number_id,
+            CallResult.id,
+            CallResult.status,
+            CallResult.attempted_at,
+            CallResult.agent_id,
+            CallResult.scenario_id,
+            CallResult.outbound_line_id,
+            literal(1),
+        )
+        .where(
+            CallResult.company_id == company_id,
+            CallResult.phone_number_id.in_(select(number_ids_select.c.id)),
+            ~has_state,
+        )
+    )
+    stmt = insert(CompanyNumberState).from_select(
+        [
+            "company_id",
+            "phone_number_id",
+            "latest_call_result_id",
+            "status",
+            "attempted_at",
+            "agent_id",
+            "scenario_id",
+            "outbound_line_id",
+            "attempt_count",
+        ],
+        first_calls,
+    ).on_conflict_do_nothing()
+    db.execute(stmt)
+
+
+def set_status(db: Session, company_id: int, number_ids, status) -> None:
+    """Mirror an in-place status edit of the latest call result.
+
+    `number_ids` may be a list of ids or a select of ids.
+    """
+    db.query(CompanyNumberState).filter(
+        CompanyNumberState.company_id == company_id,
+        CompanyNumberState.phone_number_id.in_(number_ids),
+    ).update({CompanyNumberState.status: _status_value(status)}, synchronize_session=False)
+
+
+def clear(db: Session, company_id: int, number_ids) -> None:
+    """Drop state after the company's call history for these numbers was deleted."""
+    db.query(CompanyNumberState).filter(
+        CompanyNumberState.company_id == company_id,
+        CompanyNumberState.phone_number_id.in_(number_ids),
+    ).delete(synchronize_session=False)
+
+
+def clear_with_history(db: Session, company_id: int, number_ids_select) -> None:
+    """Delete the company's state rows and call history for the selected numbers.
+
+    Both deletes run as one statement so a selectable that filters on the state itself
+    (latest status/agent) is evaluated once, before either table changes.
+    """
+    cleared = (
+        delete(CompanyNumberState)
+        .where(
+            CompanyNumberState.company_id == company_id,
+            CompanyNumberState.phone_number_id.in_(select(number_ids_select.c.id)),
+        )
+        .returning(CompanyNumberState.phone_number_id)
+        .cte("cleared_state")
+    )
+    db.execute(
+        delete(CallResult).where(
+            CallResult.company_id == company_id,
+            CallResult.phone_number_id.in_(select(cleared.c.phone_number_id)),
+        )
+    )
+
+
+def latest_call_key():
+    """(id, attempted_at) of each state's latest call result: the full call_results key,
+    so lookups through it hit one partition's primary key."""
+    return select(CompanyNumberState.latest_call_result_id, CompanyNumberState.attempted_at)
+
+
+def is_latest_call(call=CallResult):
+    """Join condition matching a call result (or an alias of it) to the state's latest call."""
+    return and_(
+        call.id == CompanyNumberState.latest_call_result_id,
+        call.attempted_at == CompanyNumberState.attempted_at,
+    )
+
+
+def for_company(company_id: int):
+    """Join condition matching a PhoneNumber row to its state for one company."""
+    return and_(
+        CompanyNumberState.phone_number_id == PhoneNumber.id,
+        CompanyNumberState.company_id == company_id,
+    )
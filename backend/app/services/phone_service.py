@@ -1,19 +1,24 @@
+import base64
+import csv
 import io
+import json
+import tempfile
 from datetime import datetime, timezone, date
+from itertools import islice
 import re
-from typing import Iterable, Sequence
+from typing import BinaryIO, Callable, Iterable, Iterator, Sequence
 from zoneinfo import ZoneInfo
 
 from fastapi import HTTPException, status
-from sqlalchemy import select, func, or_, literal
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select, func, or_, and_, literal, tuple_
+from sqlalchemy.orm import Session, aliased, joinedload
 from sqlalchemy.dialects.postgresql import insert
 
 from ..models.phone_number import PhoneNumber, CallStatus, GlobalStatus
 from ..models.call_result import CallResult
 from ..models.dialer_batch_item import DialerBatchItem
 from ..models.user import AdminUser, UserRole
-from ..models.company import Company
+from ..models.company_number_state import CompanyNumberState
 from ..core.config import get_settings
 from ..schemas.phone_number import (
     PhoneNumberCreate,
@@ -22,6 +27,7 @@ from ..schemas.phone_number import (
     PhoneNumberBulkResult,
     PhoneNumberExportRequest,
 )
+from . import call_stats_service, company_registry, dialer_pool_service, number_state_service
 from openpyxl import Workbook
 
 PHONE_PATTERN = re.compile(r"^09\d{9}$")
@@ -57,12 +63,12 @@ def _resolve_company_id(db: Session, current_user: AdminUser, company_name: str
     """Return the target company_id based on user context and optional company_name override."""
     target = current_user.company_id
     if company_name:
-        company_obj = db.query(Company).filter(Company.name == company_name).first()
-        if not company_obj:
+        company_ref = company_registry.lookup(db, company_name)
+        if not company_ref:
             raise HTTPException(status_code=404, detail="Company not found")
-        if not current_user.is_superuser and current_user.company_id != company_obj.id:
+        if not current_user.is_superuser and current_user.company_id != company_ref.id:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied to this company")
-        target = company_obj.id
+        target = company_ref.id
     elif not current_user.is_superuser and current_user.company_id is None:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is not assigned to a company")
     return target
@@ -76,15 +82,17 @@ def _effective_agent_filter(current_user: AdminUser, requested_agent_id: int | N
 
 
 def _latest_status_for_company(db: Session, number_id: int, company_id: int) -> CallStatus:
-    latest_call = (
-        db.query(CallResult)
-        .filter(CallResult.phone_number_id == number_id, CallResult.company_id == company_id)
-        .order_by(CallResult.id.desc())
-        .first()
+    latest_status = (
+        db.query(CompanyNumberState.status)
+        .filter(
+            CompanyNumberState.phone_number_id == number_id,
+            CompanyNumberState.company_id == company_id,
+        )
+        .scalar()
     )
-    if not latest_call or not latest_call.status:
+    if not latest_status:
         return CallStatus.IN_QUEUE
-    return CallStatus(latest_call.status)
+    return CallStatus(latest_status)
 
 
 def _ensure_mutable_for_user(db: Session, number_id: int, company_id: int, current_user: AdminUser) -> None:
@@ -113,37 +121,90 @@ def normalize_phone(raw: str) -> str | None:
     return digits
 
 
+_BATCH_SEPARATOR = "\x1f"
+# translate() table deleting every ASCII non-digit except the batch separator
+_STRIP_ASCII_NON_DIGITS = {c: None for c in range(128) if not chr(c).isdigit() and chr(c) != _BATCH_SEPARATOR}
+
+
+def normalize_phones(raw_numbers: Iterable[str]) -> tuple[list[str], list[str]]:
+    """Batch form of normalize_phone for imports.
+
+    Returns (valid, invalid): unique normalized numbers in first-seen order and the raw
+    values that failed. ASCII values are stripped with a single str.translate over the
+    whole batch joined together, then prefixes and lengths are checked with plain
+    slicing; other values (Persian digits etc.) go through normalize_phone. Results are
+    identical to calling normalize_phone on every value.
+    """
+    raws = list(raw_numbers)
+    normalized: list[str | None] = [None] * len(raws)
+
+    fast = [i for i, raw in enumerate(raws) if raw.isascii() and _BATCH_SEPARATOR not in raw]
+    if fast:
+        stripped = _BATCH_SEPARATOR.join([raws[i] for i in fast]).translate(_STRIP_ASCII_NON_DIGITS)
+        for i, digits in zip(fast, stripped.split(_BATCH_SEPARATOR)):
+            if digits[:4] == "0098":
+                digits = "0" + digits[4:]
+            elif digits[:2] == "98":
+                digits = "0" + digits[2:]
+            elif len(digits) == 10 and digits[0] == "9":
+                digits = "0" + digits
+            if len(digits) == 11 and digits[:2] == "09":
+                normalized[i] = digits
+    if len(fast) != len(raws):
+        fast_set = set(fast)
+        for i, raw in enumerate(raws):
+            if i not in fast_set:
+                normalized[i] = normalize_phone(raw)
+
+    valid = list(dict.fromkeys(n for n in normalized if n is not None))
+    invalid = [raw for raw, n in zip(raws, normalized) if n is None]
+    return valid, invalid
+
+
 def add_numbers(db: Session, payload: PhoneNumberCreate, current_user: AdminUser):
+    return import_numbers(db, payload.phone_numbers, current_user)
+
+
+def _insert_numbers(db: Session, numbers: list[str]) -> int:
+    stmt = (
+        insert(PhoneNumber)
+        .values([{"phone_number": n} for n in numbers])
+        .on_conflict_do_nothing(index_elements=[PhoneNumber.phone_number])
+        .returning(PhoneNumber.id)
+    )
+    inserted_ids = db.execute(stmt).scalars().all()
+    dialer_pool_service.add_numbers_to_pool(db, inserted_ids)
+    return len(inserted_ids)
+
+
+def import_numbers(db: Session, raw_numbers: Iterable[str], current_user: AdminUser):
+    """Normalize and insert numbers from any (lazy) iterable in bounded chunks.
+
+    Each chunk of IMPORT_CHUNK_SIZE rows is normalized in one normalize_phones call and
+    written with one INSERT ... ON CONFLICT DO NOTHING and one commit, so memory and
+    statement size stay constant however large the upload is. A number repeated in a
+    later chunk is counted as a duplicate.
+    """
     _require_admin(current_user)
-    normalized = [normalize_phone(p) for p in payload.phone_numbers]
-    invalid_numbers = [p for p, norm in zip(payload.phone_numbers, normalized) if norm is None]
-
-    seen: set[str] = set()
-    unique_valid: list[str] = []
-    for norm in normalized:
-        if not norm:
-            continue
-        if norm in seen:
-            continue
-        seen.add(norm)
-        unique_valid.append(norm)
-
-    inserted = 0
-    if unique_valid:
-        stmt = (
-            insert(PhoneNumber)
-            .values([{"phone_number": n} for n in unique_valid])
-            .on_conflict_do_nothing(index_elements=[PhoneNumber.phone_number])
-        )
-        result = db.execute(stmt)
-        inserted = result.rowcount or 0
-        db.commit()
+    rows = iter(raw_numbers)
+    inserted = duplicates = invalid = 0
+    invalid_samples: list[str] = []
+
+    while chunk := list(islice(rows, settings.import_chunk_size)):
+        valid, rejected = normalize_phones(chunk)
+        invalid += len(rejected)
+        invalid_samples.extend(rejected[: 5 - len(invalid_samples)])
+        if valid:
+            added = _insert_numbers(db, valid)
+            db.commit()
+            inserted += added
+            duplicates += len(valid) - added
 
     return {
         "inserted": inserted,
-        "duplicates": len(unique_valid) - inserted,
-        "invalid": len(invalid_numbers),
-        "invalid_samples": invalid_numbers[:5],
+        "duplicates": duplicates,
+        "invalid": invalid,
+        "invalid_samples": invalid_samples,
     }
 
 
@@ -155,17 +216,17 @@ def _apply_latest_call_filters(
     agent_id: int | None,
     db: Session,
 ):
-    """Apply latest-call-based filters (status and agent) in one set-based join."""
+    """Apply latest-call-based filters (status and agent) against company_number_state."""
     if not target_company_id:
         return query
 
     if status == CallStatus.IN_QUEUE:
-        # IN_QUEUE = no call record for this company yet
+        # IN_QUEUE = no call record (hence no state row) for this company yet
         query = query.filter(
-            ~db.query(CallResult.id).filter(
-                CallResult.phone_number_id == PhoneNumber.id,
-                CallResult.company_id == target_company_id,
-            ).correlate(PhoneNumber).exists()
+            ~db.query(CompanyNumberState.phone_number_id)
+            .filter(number_state_service.for_company(target_company_id))
+            .correlate(PhoneNumber)
+            .exists()
         )
         # A latest assigned agent cannot exist when there are no call rows.
         if agent_id is not None:
@@ -175,23 +236,12 @@ def _apply_latest_call_filters(
     if status is None and agent_id is None:
         return query
 
-    latest_per_number_subq = (
-        db.query(
-            CallResult.phone_number_id.label("phone_number_id"),
-            func.max(CallResult.id).label("latest_id"),
-        )
-        .filter(CallResult.company_id == target_company_id)
-        .group_by(CallResult.phone_number_id)
-        .subquery()
-    )
-    query = query.join(latest_per_number_subq, latest_per_number_subq.c.phone_number_id == PhoneNumber.id).join(
-        CallResult, CallResult.id == latest_per_number_subq.c.latest_id
-    )
+    matching = select(CompanyNumberState.phone_number_id).where(CompanyNumberState.company_id == target_company_id)
     if status is not None:
-        query = query.filter(CallResult.status == status.value)
+        matching = matching.where(CompanyNumberState.status == status.value)
     if agent_id is not None:
-        query = query.filter(CallResult.agent_id == agent_id)
-    return query
+        matching = matching.where(CompanyNumberState.agent_id == agent_id)
+    return query.filter(PhoneNumber.id.in_(matching))
 
 
 def _local_date_start_utc(value: date) -> datetime:
@@ -234,6 +284,57 @@ def _apply_date_filter(
     return query
 
 
+def _apply_sort_column(query, sort_by: str, target_company_id: int | None, state_joined: bool = False):
+    """Return (query, column) to order by; company-scoped keys come from company_number_state."""
+    if target_company_id and sort_by in {"last_attempt_at", "total_attempts", "status"}:
+        if not state_joined:
+            query = query.outerjoin(CompanyNumberState, number_state_service.for_company(target_company_id))
+        if sort_by == "last_attempt_at":
+            return query, CompanyNumberState.attempted_at
+        if sort_by == "total_attempts":
+            return query, func.coalesce(CompanyNumberState.attempt_count, 0)
+        return query, CompanyNumberState.status
+    sort_map = {"created_at": PhoneNumber.id, "id": PhoneNumber.id, "last_called_at": PhoneNumber.last_called_at}
+    return query, sort_map.get(sort_by, PhoneNumber.id)
+
+
+def _encode_cursor(sort_by: str, sort_order: str, value, last_id: int) -> str:
+    """Opaque keyset cursor: the sort key and id of the last row on the page."""
+    if isinstance(value, datetime):
+        value = {"dt": value.isoformat()}
+    payload = {"s": sort_by, "o": sort_order, "v": value, "id": last_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort_by: str, sort_order: str) -> tuple[object, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        value = payload["v"]
+        last_id = int(payload["id"])
+        if isinstance(value, dict):
+            value = datetime.fromisoformat(value["dt"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    if payload.get("s") != sort_by or payload.get("o") != sort_order:
+        # The cursor belongs to a different ordering; the client must restart from page one.
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor does not match sort")
+    return value, last_id
+
+
+def _keyset_after(column, value, last_id: int, descending: bool):
+    """Rows strictly after (value, last_id) in `column <dir> NULLS LAST, id <dir>` order."""
+    id_after = PhoneNumber.id < last_id if descending else PhoneNumber.id > last_id
+    if column is PhoneNumber.id:
+        return id_after
+    if value is None:
+        # Already inside the trailing NULL block: only the id tiebreaker is left.
+        return and_(column.is_(None), id_after)
+    value_after = column < value if descending else column > value
+    return or_(value_after, and_(column == value, id_after), column.is_(None))
+
+
 def list_numbers(
     db: Session,
     current_user: AdminUser,
@@ -248,7 +349,13 @@ def list_numbers(
     sort_by: str = "created_at",
     sort_order: str = "desc",
     agent_id: int | None = None,
+    cursor: str | None = None,
 ):
+    """Return one page of numbers and the cursor for the next page (None on the last page).
+
+    With `cursor` the page starts right after the row the cursor was issued for, so deep
+    pages cost the same as the first one; without it `skip` is honoured as before.
+    """
     target_company_id = _resolve_company_id(db, current_user, company_name)
 
     numbers = db.query(PhoneNumber)
@@ -270,59 +377,34 @@ def list_numbers(
         db=db,
     )
 
-    # Build sort column — last_attempt_at and status live in call_results
-    if sort_by == "last_attempt_at" and target_company_id:
-        column = (
-            select(func.max(CallResult.attempted_at))
-            .where(
-                CallResult.phone_number_id == PhoneNumber.id,
-                CallResult.company_id == target_company_id,
-            )
-            .correlate(PhoneNumber)
-            .scalar_subquery()
-        )
-    elif sort_by == "total_attempts" and target_company_id:
-        column = (
-            select(func.count(CallResult.id))
-            .where(
-                CallResult.phone_number_id == PhoneNumber.id,
-                CallResult.company_id == target_company_id,
-            )
-            .correlate(PhoneNumber)
-            .scalar_subquery()
-        )
-    elif sort_by == "status" and target_company_id:
-        column = (
-            select(CallResult.status)
-            .where(
-                CallResult.phone_number_id == PhoneNumber.id,
-                CallResult.company_id == target_company_id,
-                CallResult.id == (
-                    select(func.max(CallResult.id))
-                    .where(
-                        CallResult.phone_number_id == PhoneNumber.id,
-                        CallResult.company_id == target_company_id,
-                    )
-                    .correlate(PhoneNumber)
-                    .scalar_subquery()
-                ),
-            )
-            .correlate(PhoneNumber)
-            .scalar_subquery()
-        )
+    numbers, column = _apply_sort_column(numbers, sort_by, target_company_id)
+
+    descending = sort_order == "desc"
+    if cursor:
+        value, last_id = _decode_cursor(cursor, sort_by, sort_order)
+        numbers = numbers.filter(_keyset_after(column, value, last_id, descending))
+    elif skip:
+        numbers = numbers.offset(skip)
+
+    # id breaks ties so the order is total and a cursor never skips or repeats rows
+    if descending:
+        numbers = numbers.order_by(column.desc().nulls_last(), PhoneNumber.id.desc())
     else:
-        sort_map = {"created_at": PhoneNumber.id, "id": PhoneNumber.id, "last_called_at": PhoneNumber.last_called_at}
-        column = sort_map.get(sort_by, PhoneNumber.id)
+        numbers = numbers.order_by(column.asc().nulls_last(), PhoneNumber.id.asc())
 
-    numbers = numbers.order_by(column.desc().nulls_last() if sort_order == "desc" else column.asc().nulls_last())
+    rows = numbers.add_columns(column.label("sort_key")).limit(limit).all()
+    number_list = [row[0] for row in rows]
 
-    number_list = numbers.offset(skip).limit(limit).all()
+    next_cursor = None
+    if rows and len(rows) == limit:
+        last_number, last_value = rows[-1]
+        next_cursor = _encode_cursor(sort_by, sort_order, last_value, last_number.id)
 
     # For each number, enrich with company-specific call data
     if target_company_id and number_list:
         _enrich_with_call_data(db, number_list, target_company_id)
 
-    return number_list
+    return number_list, next_cursor
 
 
 def list_number_history(
@@ -505,14 +587,22 @@ def update_number_status(db: Session, number_id: int, data: PhoneNumberStatusUpd
             .first()
         )
         if latest_call:
+            old_status = latest_call.status
             latest_call.status = data.status
+            call_stats_service.record_status_change(db, latest_call, old_status)
+            number_state_service.set_status(db, target_company_id, [number_id], data.status)
         else:
-            db.add(CallResult(
+            call_result = CallResult(
                 phone_number_id=number_id,
                 company_id=target_company_id,
                 status=data.status,
                 attempted_at=datetime.now(timezone.utc),
-            ))
+            )
+            db.add(call_result)
+            db.flush()
+            number_state_service.record_calls(db, [call_result])
+            call_stats_service.record_calls(db, [call_result])
+            dialer_pool_service.remove_from_pool(db, target_company_id, [number_id])
         db.commit()
 
     # Refresh virtual fields
@@ -553,6 +643,7 @@ def delete_number(db: Session, number_id: int, current_user: AdminUser, company_
     db.query(DialerBatchItem).filter(
         DialerBatchItem.phone_number_id == number_id
     ).delete(synchronize_session=False)
+    call_stats_service.record_matching(db, -1, CallResult.phone_number_id == number_id)
     db.query(CallResult).filter(CallResult.phone_number_id == number_id).delete(synchronize_session=False)
     db.delete(number)
     db.commit()
@@ -584,10 +675,18 @@ def reset_number(db: Session, number_id: int, current_user: AdminUser, company_n
             {DialerBatchItem.report_call_result_id: None},
             synchronize_session=False,
         )
-        db.query(CallResult).filter(
+        history = (
             CallResult.phone_number_id == number_id,
             CallResult.company_id == target_company_id,
-        ).delete(synchronize_session=False)
+        )
+        call_stats_service.record_matching(db, -1, *history)
+        db.query(CallResult).filter(*history).delete(synchronize_session=False)
+        dialer_pool_service.restore_to_pool(
+            db,
+            target_company_id,
+            select(PhoneNumber.id.label("id")).where(PhoneNumber.id == number_id).subquery(),
+        )
+        number_state_service.clear(db, target_company_id, [number_id])
 
     number.assigned_at = None
     number.assigned_batch_id = None
@@ -629,23 +728,13 @@ def _build_query(
         query = query.filter(PhoneNumber.global_status == filter_global_status)
     if require_mutable and target_company_id and not current_user.is_superuser:
         # For non-superusers, bulk actions can only touch mutable statuses.
-        latest_id_subq = (
-            db.query(func.max(CallResult.id))
-            .filter(
-                CallResult.phone_number_id == PhoneNumber.id,
-                CallResult.company_id == target_company_id,
-            )
-            .correlate(PhoneNumber)
-            .scalar_subquery()
-        )
-        has_any_call = db.query(CallResult.id).filter(
-            CallResult.phone_number_id == PhoneNumber.id,
-            CallResult.company_id == target_company_id,
+        has_any_call = db.query(CompanyNumberState.phone_number_id).filter(
+            number_state_service.for_company(target_company_id)
         ).correlate(PhoneNumber).exists()
         mutable_real_statuses = [s.value for s in MUTABLE_STATUSES if s != CallStatus.IN_QUEUE]
-        has_mutable_latest = db.query(CallResult.id).filter(
-            CallResult.id == latest_id_subq,
-            CallResult.status.in_(mutable_real_statuses),
+        has_mutable_latest = db.query(CompanyNumberState.phone_number_id).filter(
+            number_state_service.for_company(target_company_id),
+            CompanyNumberState.status.in_(mutable_real_statuses),
         ).correlate(PhoneNumber).exists()
         # IN_QUEUE means no call record for this company yet.
         query = query.filter(or_(~has_any_call, has_mutable_latest))
@@ -701,9 +790,9 @@ def bulk_action(db: Session, payload: PhoneNumberBulkAction, current_user: Admin
             {DialerBatchItem.report_call_result_id: None},
             synchronize_session=False,
         )
-        db.query(CallResult).filter(
-            CallResult.phone_number_id.in_(select(target_ids_subq.c.id))
-        ).delete(synchronize_session=False)
+        targets_history = CallResult.phone_number_id.in_(select(target_ids_subq.c.id))
+        call_stats_service.record_matching(db, -1, targets_history)
+        db.query(CallResult).filter(targets_history).delete(synchronize_session=False)
         result.deleted = db.query(PhoneNumber).filter(
             PhoneNumber.id.in_(select(target_ids_subq.c.id))
         ).delete(synchronize_session=False)
@@ -725,16 +814,23 @@ def bulk_action(db: Session, payload: PhoneNumberBulkAction, current_user: Admin
                 {DialerBatchItem.report_call_result_id: None},
                 synchronize_session=False,
             )
-            db.query(CallResult).filter(
-                CallResult.phone_number_id.in_(select(target_ids_subq.c.id)),
-                CallResult.company_id == target_company_id,
-            ).delete(synchronize_session=False)
+            # Re-pool before deleting history: the target subquery may filter on latest status.
+            dialer_pool_service.restore_to_pool(db, target_company_id, target_ids_subq)
         result.reset = db.query(PhoneNumber).filter(
             PhoneNumber.id.in_(select(target_ids_subq.c.id))
         ).update(
             {PhoneNumber.assigned_at: None, PhoneNumber.assigned_batch_id: None},
             synchronize_session=False,
         ) or 0
+        if target_company_id:
+            call_stats_service.record_matching(
+                db,
+                -1,
+                CallResult.company_id == target_company_id,
+                CallResult.phone_number_id.in_(select(target_ids_subq.c.id)),
+            )
+            # Last, and in one statement: this changes what the target subquery matches.
+            number_state_service.clear_with_history(db, target_company_id, target_ids_subq)
         db.commit()
         return result
 
@@ -747,32 +843,34 @@ def bulk_action(db: Session, payload: PhoneNumberBulkAction, current_user: Admin
                 if payload.status == CallStatus.COMPLAINED
                 else GlobalStatus.ACTIVE
             )
+            # Every target ends up with a call result; drop them from the pool while the
+            # target subquery still reflects the pre-update statuses.
+            dialer_pool_service.remove_from_pool(db, target_company_id, select(target_ids_subq.c.id))
             db.query(PhoneNumber).filter(PhoneNumber.id.in_(select(target_ids_subq.c.id))).update(
                 {PhoneNumber.global_status: shared_status},
                 synchronize_session=False,
             )
 
-            latest_call_ids_subq = (
-                db.query(func.max(CallResult.id).label("id"))
-                .join(target_ids_subq, CallResult.phone_number_id == target_ids_subq.c.id)
-                .filter(CallResult.company_id == target_company_id)
-                .group_by(CallResult.phone_number_id)
-                .subquery()
+            latest_call_keys = (
+                number_state_service.latest_call_key()
+                .join(target_ids_subq, CompanyNumberState.phone_number_id == target_ids_subq.c.id)
+                .where(CompanyNumberState.company_id == target_company_id)
             )
 
-            updated_existing = db.query(CallResult).filter(
-                CallResult.id.in_(select(latest_call_ids_subq.c.id))
-            ).update(
+            latest_calls = tuple_(CallResult.id, CallResult.attempted_at).in_(latest_call_keys)
+            call_stats_service.record_matching(db, -1, latest_calls)
+            updated_existing = db.query(CallResult).filter(latest_calls).update(
                 {CallResult.status: payload.status},
                 synchronize_session=False,
             )
+            call_stats_service.record_matching(db, 1, latest_calls)
 
             missing_ids_subq = (
                 select(target_ids_subq.c.id)
                 .where(
-                    ~select(CallResult.id).where(
-                        CallResult.phone_number_id == target_ids_subq.c.id,
-                        CallResult.company_id == target_company_id,
+                    ~select(CompanyNumberState.phone_number_id).where(
+                        CompanyNumberState.phone_number_id == target_ids_subq.c.id,
+                        CompanyNumberState.company_id == target_company_id,
                     ).exists()
                 )
                 .subquery()
@@ -788,6 +886,16 @@ def bulk_action(db: Session, payload: PhoneNumberBulkAction, current_user: Admin
                     ),
                 )
             )
+            call_stats_service.record_matching(
+                db,
+                1,
+                CallResult.company_id == target_company_id,
+                CallResult.phone_number_id.in_(select(missing_ids_subq.c.id)),
+            )
+            # Numbers called for the first time get state rows; the rest change status in place.
+            # In this order the target subquery still matches the same numbers at each step.
+            number_state_service.record_inserted_calls(db, target_company_id, target_ids_subq)
+            number_state_service.set_status(db, target_company_id, select(target_ids_subq.c.id), payload.status)
             db.commit()
             result.updated = (updated_existing or 0) + (insert_result.rowcount or 0)
         return result
@@ -795,7 +903,21 @@ def bulk_action(db: Session, payload: PhoneNumberBulkAction, current_user: Admin
     raise HTTPException(status_code=400, detail="Unsupported action")
 
 
-def export_numbers(db: Session, payload: PhoneNumberExportRequest, current_user: AdminUser) -> io.BytesIO:
+EXPORT_HEADER = ["شماره", "وضعیت", "تعداد تلاش", "آخرین تلاش", "پیام تماس"]
+EXPORT_MEDIA_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv; charset=utf-8",
+}
+_EXPORT_READ_CHUNK = 64 * 1024
+
+
+def _export_query(db: Session, payload: PhoneNumberExportRequest, current_user: AdminUser):
+    """Validate the export request and build a column-only query over the selected rows.
+
+    Latest status, attempts and user message come from company_number_state (and its
+    latest call result) in the same query, so rows can be streamed without a separate
+    enrichment pass.
+    """
     _require_admin(current_user)
     if not payload.select_all and not payload.ids:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No numbers selected")
@@ -819,73 +941,121 @@ def export_numbers(db: Session, payload: PhoneNumberExportRequest, current_user:
         end_date=end,
     )
 
-    # Sort
-    if payload.sort_by == "last_attempt_at" and target_company_id:
-        sort_col = (
-            select(func.max(CallResult.attempted_at))
-            .where(CallResult.phone_number_id == PhoneNumber.id, CallResult.company_id == target_company_id)
-            .correlate(PhoneNumber)
-            .scalar_subquery()
-        )
-    elif payload.sort_by == "total_attempts" and target_company_id:
-        sort_col = (
-            select(func.count(CallResult.id))
-            .where(CallResult.phone_number_id == PhoneNumber.id, CallResult.company_id == target_company_id)
-            .correlate(PhoneNumber)
-            .scalar_subquery()
-        )
-    elif payload.sort_by == "status" and target_company_id:
-        sort_col = (
-            select(CallResult.status)
-            .where(
-                CallResult.phone_number_id == PhoneNumber.id,
-                CallResult.company_id == target_company_id,
-                CallResult.id == (
-                    select(func.max(CallResult.id))
-                    .where(
-                        CallResult.phone_number_id == PhoneNumber.id,
-                        CallResult.company_id == target_company_id,
-                    )
-                    .correlate(PhoneNumber)
-                    .scalar_subquery()
-                ),
+    if target_company_id:
+        latest_call = aliased(CallResult)
+        query = (
+            query.outerjoin(CompanyNumberState, number_state_service.for_company(target_company_id))
+            .outerjoin(latest_call, number_state_service.is_latest_call(latest_call))
+            .with_entities(
+                PhoneNumber.phone_number,
+                CompanyNumberState.status,
+                CompanyNumberState.attempt_count,
+                CompanyNumberState.attempted_at,
+                latest_call.user_message,
             )
-            .correlate(PhoneNumber)
-            .scalar_subquery()
         )
     else:
-        sort_map = {"created_at": PhoneNumber.id, "id": PhoneNumber.id, "last_called_at": PhoneNumber.last_called_at}
-        sort_col = sort_map.get(payload.sort_by, PhoneNumber.id)
+        query = query.with_entities(
+            PhoneNumber.phone_number,
+            literal(None),
+            literal(None),
+            literal(None),
+            literal(None),
+        )
+
+    # Sort
+    query, sort_col = _apply_sort_column(query, payload.sort_by, target_company_id, state_joined=True)
 
     if payload.sort_order == "asc":
-        query = query.order_by(sort_col.asc().nulls_last())
+        query = query.order_by(sort_col.asc().nulls_last(), PhoneNumber.id.asc())
     else:
-        query = query.order_by(sort_col.desc().nulls_last())
+        query = query.order_by(sort_col.desc().nulls_last(), PhoneNumber.id.desc())
+    return query
+
 
-    numbers = query.all()
+def _iter_export_rows(query) -> Iterator[list]:
+    # yield_per streams through a server-side cursor instead of fetching every row at once
+    for phone_number, status_value, attempts, last_attempt_at, user_message in query.yield_per(
+        settings.export_chunk_size
+    ):
+        yield [
+            phone_number,
+            status_value or "IN_QUEUE",
+            attempts or 0,
+            last_attempt_at.isoformat() if last_attempt_at else None,
+            user_message,
+        ]
 
-    # Enrich with call data for export
-    if target_company_id and numbers:
-        _enrich_with_call_data(db, numbers, target_company_id)
 
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "numbers"
-    ws.append(["شماره", "وضعیت", "تعداد تلاش", "آخرین تلاش", "پیام تماس"])
+def count_export_rows(db: Session, payload: PhoneNumberExportRequest, current_user: AdminUser) -> int:
+    return _export_query(db, payload, current_user).order_by(None).count()
 
-    for num in numbers:
-        ws.append([
-            num.phone_number,
-            getattr(num, "status", None) or "IN_QUEUE",
-            getattr(num, "total_attempts", 0),
-            getattr(num, "last_attempt_at", None).isoformat() if getattr(num, "last_attempt_at", None) else None,
-            getattr(num, "last_user_message", None),
-        ])
-
-    stream = io.BytesIO()
-    wb.save(stream)
-    stream.seek(0)
-    return stream
+
+def write_export(
+    db: Session,
+    payload: PhoneNumberExportRequest,
+    current_user: AdminUser,
+    out: BinaryIO,
+    on_progress: Callable[[int], None] | None = None,
+) -> int:
+    """Write the selected numbers to `out` in `payload.format`; returns the row count.
+
+    Memory stays flat: rows are streamed from the database and written one at a time
+    (openpyxl write-only mode keeps finished rows on disk, not in the workbook).
+    `on_progress` is called with the running row count after every chunk.
+    """
+    query = _export_query(db, payload, current_user)
+    chunk = settings.export_chunk_size
+    written = 0
+    if payload.format == "csv":
+        text = io.TextIOWrapper(out, encoding="utf-8-sig", newline="")
+        writer = csv.writer(text)
+        writer.writerow(EXPORT_HEADER)
+        append = writer.writerow
+    else:
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(title="numbers")
+        ws.append(EXPORT_HEADER)
+        append = ws.append
+
+    for row in _iter_export_rows(query):
+        append(row)
+        written += 1
+        if on_progress and written % chunk == 0:
+            on_progress(written)
+
+    if payload.format == "csv":
+        text.flush()
+        text.detach()
+    else:
+        wb.save(out)
+    if on_progress:
+        on_progress(written)
+    return written
+
+
+def _iter_file(fileobj: BinaryIO) -> Iterator[bytes]:
+    try:
+        while chunk := fileobj.read(_EXPORT_READ_CHUNK):
+            yield chunk
+    finally:
+        fileobj.close()
+
+
+def export_numbers(db: Session, payload: PhoneNumberExportRequest, current_user: AdminUser) -> Iterator[bytes]:
+    """Build the export into a temporary file and return an iterator over its bytes.
+
+    The file is written with the request's session before the response starts (the
+    session is closed once the endpoint returns), then streamed in fixed-size chunks.
+    """
+    spool = tempfile.TemporaryFile()
+    try:
+        write_export(db, payload, current_user, spool)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return _iter_file(spool)
 
 
 def _parse_iso_date(date_str: str | None) -> date | None:
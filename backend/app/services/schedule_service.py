@@ -1,29 +1,32 @@
+from dataclasses import dataclass
 from datetime import datetime, time, timedelta
 from zoneinfo import ZoneInfo
-from typing import Iterable
+from typing import Iterable, NamedTuple
+import threading
 import jdatetime
 
 from fastapi import HTTPException
-from sqlalchemy import delete, text, inspect
+from sqlalchemy import delete
 from sqlalchemy.orm import Session
 
 from ..core.config import get_settings
+from ..core import metrics
 from ..models.scenario import Scenario
 from ..models.schedule import ScheduleConfig, ScheduleWindow
+from ..models.wallet import WalletPendingCharge
 from ..schemas.schedule import ScheduleConfigUpdate
 
 settings = get_settings()
 TEHRAN_TZ = ZoneInfo(settings.timezone)
+DEFAULT_COST_PER_CONNECTED = 150
 
 
 def ensure_config(db: Session, company_id: int | None = None) -> ScheduleConfig:
-    """Get or create schedule config for a company"""
-    _ensure_enabled_column(db)
-    _ensure_disabled_by_dialer_column(db)
-    _ensure_billing_columns(db)
-    _ensure_scenario_billing_column(db)
+    """Get or create schedule config for a company.
 
-    # Find config by company_id
+    Legacy column backfills run once per process in core/db.py (and in migration
+    0013), so this is a single indexed SELECT on the hot dialer path.
+    """
     config = db.query(ScheduleConfig).filter_by(company_id=company_id).first()
 
     if not config:
@@ -33,65 +36,31 @@ def ensure_config(db: Session, company_id: int | None = None) -> ScheduleConfig:
             enabled=True,
             disabled_by_dialer=False,
             wallet_balance=0,
-            cost_per_connected=150,
+            cost_per_connected=DEFAULT_COST_PER_CONNECTED,
             version=1,
         )
         db.add(config)
         db.commit()
         db.refresh(config)
-    if config.enabled is None:
-        config.enabled = True
-        db.commit()
-        db.refresh(config)
-    if config.cost_per_connected is None:
-        config.cost_per_connected = 150
-        db.commit()
-        db.refresh(config)
-    if config.wallet_balance is None:
-        config.wallet_balance = 0
+        return config
+
+    # Rows written before these columns had defaults
+    if config.enabled is None or config.cost_per_connected is None or config.wallet_balance is None:
+        if config.enabled is None:
+            config.enabled = True
+        if config.cost_per_connected is None:
+            config.cost_per_connected = DEFAULT_COST_PER_CONNECTED
+        if config.wallet_balance is None:
+            config.wallet_balance = 0
         db.commit()
         db.refresh(config)
     return config
 
 
-def _ensure_enabled_column(db: Session) -> None:
-    # Backward-compat: add enabled column if missing (for existing deployments)
-    conn = db.connection()
-    inspector = inspect(conn)
-    cols = [c["name"] for c in inspector.get_columns("schedule_configs")]
-    if "enabled" not in cols:
-        conn.execute(text("ALTER TABLE schedule_configs ADD COLUMN IF NOT EXISTS enabled BOOLEAN DEFAULT TRUE"))
-        db.commit()
-
-
-def _ensure_disabled_by_dialer_column(db: Session) -> None:
-    conn = db.connection()
-    inspector = inspect(conn)
-    cols = [c["name"] for c in inspector.get_columns("schedule_configs")]
-    if "disabled_by_dialer" not in cols:
-        conn.execute(text("ALTER TABLE schedule_configs ADD COLUMN IF NOT EXISTS disabled_by_dialer BOOLEAN DEFAULT FALSE"))
-        db.commit()
-
-
-def _ensure_billing_columns(db: Session) -> None:
-    conn = db.connection()
-    inspector = inspect(conn)
-    cols = [c["name"] for c in inspector.get_columns("schedule_configs")]
-    if "wallet_balance" not in cols:
-        conn.execute(text("ALTER TABLE schedule_configs ADD COLUMN IF NOT EXISTS wallet_balance INTEGER DEFAULT 0"))
-        db.commit()
-    if "cost_per_connected" not in cols:
-        conn.execute(text("ALTER TABLE schedule_configs ADD COLUMN IF NOT EXISTS cost_per_connected INTEGER DEFAULT 150"))
-        db.commit()
-
-
-def _ensure_scenario_billing_column(db: Session) -> None:
-    conn = db.connection()
-    inspector = inspect(conn)
-    cols = [c["name"] for c in inspector.get_columns("scenarios")]
-    if "cost_per_connected" not in cols:
-        conn.execute(text("ALTER TABLE scenarios ADD COLUMN IF NOT EXISTS cost_per_connected INTEGER"))
-        db.commit()
+def cost_per_connected(db: Session, company_id: int | None = None) -> int:
+    """Company's default rate without creating its config (safe on read-only sessions)."""
+    rate = db.query(ScheduleConfig.cost_per_connected).filter_by(company_id=company_id).scalar()
+    return DEFAULT_COST_PER_CONNECTED if rate is None else rate
 
 
 def get_config(db: Session, company_id: int | None = None) -> ScheduleConfig:
@@ -142,19 +111,89 @@ def charge_for_connected_call(db: Session, company_id: int | None = None, scenar
     Deducts cost per connected call from wallet. Returns remaining balance.
     Automatically disables dialing if balance hits zero.
     """
-    cfg = ensure_config(db, company_id=company_id)
+    new_balance = apply_connected_charges(db, company_id=company_id, scenario_ids=[scenario_id])
+    db.commit()
+    return new_balance
+
+
+def apply_connected_charges(db: Session, company_id: int | None, scenario_ids: list[int | None]) -> int:
+    """
+    Charges several connected calls at once. Does not commit, so callers can fold
+    the charge into their own transaction. Returns the (last known) wallet balance.
+
+    WALLET_BILLING_MODE=immediate deducts under a single config row lock.
+    WALLET_BILLING_MODE=deferred only appends a pending-charge ledger row; the
+    periodic settle_pending_charges job folds it into wallet_balance.
+    """
+    if settings.wallet_billing_mode == "deferred":
+        cfg = ensure_config(db, company_id=company_id)
+        cost = _connected_calls_cost(db, cfg, company_id, scenario_ids)
+        if cost > 0:
+            db.add(WalletPendingCharge(company_id=company_id, amount_toman=cost, call_count=len(scenario_ids)))
+        _count_charges(company_id, "deferred", len(scenario_ids), cost)
+        return cfg.wallet_balance or 0
+
+    ensure_config(db, company_id=company_id)
     # Lock the config row for update
     cfg = db.query(ScheduleConfig).filter_by(company_id=company_id).with_for_update().first()
     if not cfg:
         raise HTTPException(status_code=500, detail="Billing config missing")
-    cost = cfg.cost_per_connected or 0
-    if company_id is not None and scenario_id is not None:
-        scenario = db.query(Scenario).filter(
-            Scenario.id == scenario_id,
+    cost = _connected_calls_cost(db, cfg, company_id, scenario_ids)
+    _count_charges(company_id, "immediate", len(scenario_ids), cost)
+    return _debit_wallet(cfg, cost)
+
+
+def _count_charges(company_id: int | None, mode: str, calls: int, cost: int) -> None:
+    if calls:
+        metrics.WALLET_CHARGES.labels(str(company_id), mode).inc(calls)
+    if cost > 0:
+        metrics.WALLET_CHARGED_TOMAN.labels(str(company_id), mode).inc(cost)
+
+
+def settle_pending_charges(db: Session) -> int:
+    """
+    Folds deferred connected-call charges into each company's wallet_balance.
+    Takes the config row lock once per company per run. Returns the number of
+    ledger rows settled.
+    """
+    company_ids = [row[0] for row in db.query(WalletPendingCharge.company_id).distinct().all()]
+    settled = 0
+    for company_id in company_ids:
+        cfg = db.query(ScheduleConfig).filter_by(company_id=company_id).with_for_update().first()
+        if not cfg:
+            continue
+        # DELETE ... RETURNING claims exactly the rows folded here, even with several workers settling.
+        amounts = db.execute(
+            delete(WalletPendingCharge)
+            .where(WalletPendingCharge.company_id == company_id)
+            .returning(WalletPendingCharge.amount_toman)
+        ).scalars().all()
+        _debit_wallet(cfg, sum(amounts))
+        db.commit()
+        settled += len(amounts)
+    return settled
+
+
+def _connected_calls_cost(
+    db: Session,
+    cfg: ScheduleConfig,
+    company_id: int | None,
+    scenario_ids: list[int | None],
+) -> int:
+    default_cost = cfg.cost_per_connected or 0
+    scenario_costs: dict[int, int] = {}
+    wanted = {sid for sid in scenario_ids if sid is not None}
+    if company_id is not None and wanted:
+        rows = db.query(Scenario).filter(
+            Scenario.id.in_(wanted),
             Scenario.company_id == company_id,
-        ).first()
-        if scenario and scenario.cost_per_connected is not None:
-            cost = scenario.cost_per_connected
+        ).all()
+        scenario_costs = {row.id: row.cost_per_connected for row in rows if row.cost_per_connected is not None}
+    return sum(scenario_costs.get(sid, default_cost) for sid in scenario_ids)
+
+
+def _debit_wallet(cfg: ScheduleConfig, cost: int) -> int:
+    """Deducts cost from a locked config. Automatically disables dialing if balance hits zero."""
     if cost <= 0:
         return cfg.wallet_balance or 0
 
@@ -163,7 +202,6 @@ def charge_for_connected_call(db: Session, company_id: int | None = None, scenar
         cfg.enabled = False
         cfg.disabled_by_dialer = True
         cfg.version += 1
-        db.commit()
         return 0
 
     new_balance = current_balance - cost
@@ -174,8 +212,6 @@ def charge_for_connected_call(db: Session, company_id: int | None = None, scenar
         cfg.enabled = False
         cfg.disabled_by_dialer = True
         cfg.version += 1
-    db.commit()
-    db.refresh(cfg)
     return new_balance
 
 
@@ -225,32 +261,101 @@ def is_holiday(date_value: datetime) -> bool:
     return mm_dd in fixed_jalali_holidays
 
 
-def is_call_allowed(now: datetime | None, db: Session, company_id: int | None = None) -> tuple[bool, str | None, int]:
+class ScheduleWindowSnapshot(NamedTuple):
+    day_of_week: int
+    start_time: time
+    end_time: time
+
+
+@dataclass(frozen=True)
+class ScheduleSnapshot:
+    """Immutable copy of a company's schedule config + windows at one `version`."""
+    version: int
+    enabled: bool
+    skip_holidays: bool
+    wallet_balance: int | None
+    intervals: tuple[ScheduleWindowSnapshot, ...]
+
+
+# Per-process cache keyed by company; an entry is valid while schedule_configs.version matches.
+_schedule_cache: dict[int | None, ScheduleSnapshot] = {}
+_schedule_cache_lock = threading.Lock()
+
+
+def get_schedule_snapshot(db: Session, company_id: int | None = None) -> ScheduleSnapshot:
+    """
+    Returns the company's schedule from memory, paying only a one-column version probe
+    when nothing changed. Every writer of enabled/skip_holidays/windows bumps `version`,
+    and so does any wallet change that can flip the zero-balance check.
+    """
+    version = db.query(ScheduleConfig.version).filter_by(company_id=company_id).scalar()
+    if version is not None:
+        cached = _schedule_cache.get(company_id)
+        if cached is not None and cached.version == version:
+            return cached
+
     config = ensure_config(db, company_id=company_id)
+    snapshot = ScheduleSnapshot(
+        version=config.version,
+        enabled=bool(config.enabled),
+        skip_holidays=bool(config.skip_holidays),
+        wallet_balance=config.wallet_balance,
+        intervals=tuple(
+            ScheduleWindowSnapshot(i.day_of_week, i.start_time, i.end_time)
+            for i in list_intervals(db, company_id=company_id)
+        ),
+    )
+    with _schedule_cache_lock:
+        _schedule_cache[company_id] = snapshot
+    return snapshot
+
+
+def invalidate_schedule_cache(company_id: int | None = None) -> None:
+    with _schedule_cache_lock:
+        if company_id is None:
+            _schedule_cache.clear()
+        else:
+            _schedule_cache.pop(company_id, None)
+
+
+def is_call_allowed(now: datetime | None, db: Session, company_id: int | None = None) -> tuple[bool, str | None, int]:
+    allowed, reason, retry_after, _version = check_call_window(now, db, company_id=company_id)
+    return allowed, reason, retry_after
+
+
+def check_call_window(
+    now: datetime | None,
+    db: Session,
+    company_id: int | None = None,
+) -> tuple[bool, str | None, int, int]:
+    """is_call_allowed plus the schedule_version the decision was made against."""
+    snapshot = get_schedule_snapshot(db, company_id=company_id)
     now = (now or datetime.now(TEHRAN_TZ)).astimezone(TEHRAN_TZ)
-    if config.wallet_balance is not None and config.wallet_balance <= 0:
-        if config.enabled:
+    if snapshot.wallet_balance is not None and snapshot.wallet_balance <= 0:
+        version = snapshot.version
+        if snapshot.enabled:
+            config = ensure_config(db, company_id=company_id)
             config.enabled = False
             config.disabled_by_dialer = True
             config.version += 1
             db.commit()
             db.refresh(config)
-        return False, "insufficient_funds", settings.short_retry_seconds
-    if not config.enabled:
-        return False, "disabled", settings.short_retry_seconds
-    if config.skip_holidays and is_holiday(now):
-        return False, "holiday", settings.long_retry_seconds
-
-    intervals = list_intervals(db, company_id=company_id)
-    todays_intervals = [i for i in intervals if i.day_of_week == _iran_weekday(now)]
+            version = config.version
+        return False, "insufficient_funds", settings.short_retry_seconds, version
+    if not snapshot.enabled:
+        return False, "disabled", settings.short_retry_seconds, snapshot.version
+    if snapshot.skip_holidays and is_holiday(now):
+        return False, "holiday", settings.long_retry_seconds, snapshot.version
+
+    todays_intervals = [i for i in snapshot.intervals if i.day_of_week == _iran_weekday(now)]
     if not todays_intervals:
-        return False, "no_window", settings.long_retry_seconds
+        return False, "no_window", settings.long_retry_seconds, snapshot.version
     current_time = now.time()
     for interval in todays_intervals:
         if interval.start_time <= current_time <= interval.end_time:
-            return True, None, 0
+            return True, None, 0, snapshot.version
     # outside windows: fixed polling interval
-    return False, "outside_allowed_time_window", settings.long_retry_seconds
+    return False, "outside_allowed_time_window", settings.long_retry_seconds, snapshot.version
 
 
 def _next_start(now: datetime, intervals: Iterable[ScheduleWindow]) -> datetime | None:
@@ -269,6 +374,13 @@ def _next_start(now: datetime, intervals: Iterable[ScheduleWindow]) -> datetime
     return None
 
 
+def next_window_start(db: Session, company_id: int | None = None, now: datetime | None = None) -> datetime | None:
+    """Start of the company's next calling window after `now` (None without windows)."""
+    snapshot = get_schedule_snapshot(db, company_id=company_id)
+    now = (now or datetime.now(TEHRAN_TZ)).astimezone(TEHRAN_TZ)
+    return _next_start(now, snapshot.intervals)
+
+
 def _iran_weekday(current: datetime) -> int:
     # Convert Python weekday (Mon=0) to Iran convention (Sat=0)
     return (current.weekday() + 2) % 7
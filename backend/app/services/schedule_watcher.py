@@ -0,0 +1,83 @@
+import asyncio
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ..core.config import get_settings
+from ..models.schedule import ScheduleConfig
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Long-polling next-batch requests wait here for a company's schedule_configs.version to
+# change. One probe loop per company per process serves every waiter of that company
+# (one version SELECT per NEXT_BATCH_WAIT_POLL_SECONDS, however many dialers are held),
+# and it stops as soon as nobody is waiting.
+
+
+class _Watch:
+    def __init__(self, version: int | None):
+        self.version = version
+        self.changed = asyncio.Event()
+        self.waiters = 0
+
+
+_watches: dict[int, _Watch] = {}
+
+
+async def wait_for_change(engine: AsyncEngine, company_id: int, version: int | None, timeout: float) -> bool:
+    """Wait up to `timeout` seconds for the company's schedule version to move past
+    `version`. Returns True on a change, False on timeout."""
+    watch = _watches.get(company_id)
+    if watch is None:
+        watch = _watches[company_id] = _Watch(version)
+        asyncio.create_task(_probe(engine, company_id, watch))
+    elif _newer(watch.version, version):
+        return True
+    elif _newer(version, watch.version):
+        # The caller read a bump the probe hasn't seen yet: adopt it, and wake the
+        # waiters still parked on the older version (the probe would now miss it).
+        _advance(watch, version)
+    changed = watch.changed
+    watch.waiters += 1
+    try:
+        await asyncio.wait_for(changed.wait(), timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+    finally:
+        watch.waiters -= 1
+
+
+async def _probe(engine: AsyncEngine, company_id: int, watch: _Watch) -> None:
+    try:
+        while True:
+            await asyncio.sleep(settings.next_batch_wait_poll_seconds)
+            if not watch.waiters:
+                return
+            try:
+                async with engine.connect() as conn:
+                    current = await conn.scalar(
+                        select(ScheduleConfig.version).where(ScheduleConfig.company_id == company_id)
+                    )
+            except Exception:
+                logger.warning("schedule_watch_probe_failed company_id=%s", company_id, exc_info=True)
+                continue
+            if current != watch.version:
+                _advance(watch, current)
+    finally:
+        if _watches.get(company_id) is watch:
+            del _watches[company_id]
+
+
+def _advance(watch: _Watch, version: int | None) -> None:
+    watch.version = version
+    # Wake everyone waiting on the old version; later waiters get a fresh event.
+    changed, watch.changed = watch.changed, asyncio.Event()
+    changed.set()
+
+
+def _newer(a: int | None, b: int | None) -> bool:
+    # Versions only grow; a missing config row (None) is older than any version.
+    return (a if a is not None else -1) > (b if b is not None else -1)
@@ -1,17 +1,17 @@
 from collections import defaultdict
-from datetime import datetime, time, timedelta, date, timezone
+from datetime import datetime, time, timedelta, timezone
 
-from sqlalchemy import func, text, case
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from ..core.config import get_settings
 from ..models.phone_number import PhoneNumber, CallStatus
-from ..models.call_result import CallResult
 from ..models.scenario import Scenario
 from ..models.outbound_line import OutboundLine
-from ..models.company import Company
+from ..models.company_number_state import CompanyNumberState
 from ..schemas.stats import NumbersSummary, StatusShare, AttemptTrendResponse, TimeBucketBreakdown, AttemptSummary
-from .schedule_service import TEHRAN_TZ, ensure_config
+from . import call_stats_service
+from .schedule_service import TEHRAN_TZ, cost_per_connected
 
 settings = get_settings()
 
@@ -42,24 +42,11 @@ def numbers_summary(db: Session, company_id: int | None = None) -> NumbersSummar
     status_counts: dict[str, int] = {status.value: 0 for status in CallStatus}
 
     if company_id is not None:
-        # Latest call result per number for this company using window function
-        from sqlalchemy import over
-        inner = (
-            db.query(
-                CallResult.phone_number_id,
-                CallResult.status,
-                func.row_number().over(
-                    partition_by=CallResult.phone_number_id,
-                    order_by=CallResult.attempted_at.desc(),
-                ).label("rn"),
-            )
-            .filter(CallResult.company_id == company_id)
-            .subquery()
-        )
+        # Latest call status per number for this company, maintained in company_number_state
         rows = (
-            db.query(inner.c.status, func.count(inner.c.phone_number_id))
-            .filter(inner.c.rn == 1)
-            .group_by(inner.c.status)
+            db.query(CompanyNumberState.status, func.count(CompanyNumberState.phone_number_id))
+            .filter(CompanyNumberState.company_id == company_id)
+            .group_by(CompanyNumberState.status)
             .all()
         )
         called_total = 0
@@ -92,10 +79,8 @@ def attempt_summary(db: Session, days: int | None = None, hours: int | None = No
         start_tehran = _tehran_start_of_day(days - 1)
         start_utc = start_tehran.astimezone(timezone.utc)
 
-    query = db.query(CallResult.status, func.count(CallResult.id))
-    if start_utc:
-        query = query.filter(CallResult.attempted_at >= start_utc)
-    rows = query.group_by(CallResult.status).all()
+    counts = call_stats_service.call_counts(db, ["status"], start_utc)
+    rows = [(status, count) for (status,), count in counts.items()]
     total = sum(count for _, count in rows)
     status_shares: list[StatusShare] = []
     for status, count in rows:
@@ -133,7 +118,6 @@ def _tehran_start_of_day(days_back: int) -> datetime:
 
 def attempt_trend(db: Session, span: int = 14, granularity: str = "day", company_id: int | None = None) -> AttemptTrendResponse:
     granularity = granularity if granularity in {"day", "hour"} else "day"
-    tz_name = str(TEHRAN_TZ)
     now_tehran = datetime.now(TEHRAN_TZ)
     if granularity == "hour":
         start_tehran = now_tehran.replace(minute=0, second=0, microsecond=0) - timedelta(hours=span - 1)
@@ -142,35 +126,15 @@ def attempt_trend(db: Session, span: int = 14, granularity: str = "day", company
 
     start_utc = start_tehran.astimezone(timezone.utc)
 
-    # Use SQL-level date_trunc with timezone for fast aggregation
-    bucket_expr = func.date_trunc(
-        granularity,
-        func.timezone(tz_name, CallResult.attempted_at),
-    ).label("bucket")
-
-    query = (
-        db.query(
-            bucket_expr,
-            CallResult.status,
-            func.count(CallResult.id).label("cnt"),
-        )
-        .filter(CallResult.attempted_at >= start_utc)
-    )
-
-    if company_id is not None:
-        query = query.filter(CallResult.company_id == company_id)
+    counts = call_stats_service.call_counts(db, [granularity, "status"], start_utc, company_id=company_id)
 
-    rows = query.group_by(bucket_expr, CallResult.status).all()
-
-    # Build bucket dict from SQL results
     buckets: dict[datetime, dict[CallStatus, int]] = defaultdict(lambda: defaultdict(int))
-    for bucket_dt, status_val, cnt in rows:
+    for (bucket_dt, status_val), cnt in counts.items():
         try:
             status = CallStatus(status_val)
         except ValueError:
             continue
-        bucket_key = bucket_dt.replace(tzinfo=TEHRAN_TZ)
-        buckets[bucket_key][status] = cnt
+        buckets[bucket_dt.astimezone(TEHRAN_TZ)][status] = cnt
 
     # Fill missing buckets with zeros to keep chart continuous
     bucket_list: list[TimeBucketBreakdown] = []
@@ -204,57 +168,43 @@ def attempt_trend(db: Session, span: int = 14, granularity: str = "day", company
 
 
 def cost_summary(db: Session, company_id: int) -> dict:
-    cfg = ensure_config(db, company_id=company_id)
-    default_rate = cfg.cost_per_connected or 0
-
-    effective_rate = case(
-        (
-            Scenario.cost_per_connected.is_not(None),
-            Scenario.cost_per_connected,
-        ),
-        else_=default_rate,
-    )
+    # Read-only: runs on the reports session, so a missing config is not created here.
+    default_rate = cost_per_connected(db, company_id=company_id)
 
     now_tehran = datetime.now(TEHRAN_TZ)
     start_of_day = datetime.combine(now_tehran.date(), time(0, 0), tzinfo=TEHRAN_TZ).astimezone(timezone.utc)
     start_of_month = datetime.combine(now_tehran.date().replace(day=1), time(0, 0), tzinfo=TEHRAN_TZ).astimezone(timezone.utc)
 
-    daily_count = (
-        db.query(func.count(CallResult.id))
-        .filter(CallResult.company_id == company_id)
-        .filter(CallResult.status.in_([status.value for status in CONNECTED_STATUSES]))
-        .filter(CallResult.attempted_at >= start_of_day)
-        .scalar()
-        or 0
-    )
-    daily_cost = (
-        db.query(func.coalesce(func.sum(effective_rate), 0))
-        .select_from(CallResult)
-        .outerjoin(Scenario, Scenario.id == CallResult.scenario_id)
-        .filter(CallResult.company_id == company_id)
-        .filter(CallResult.status.in_([status.value for status in CONNECTED_STATUSES]))
-        .filter(CallResult.attempted_at >= start_of_day)
-        .scalar()
-        or 0
-    )
-    monthly_count = (
-        db.query(func.count(CallResult.id))
-        .filter(CallResult.company_id == company_id)
-        .filter(CallResult.status.in_([status.value for status in CONNECTED_STATUSES]))
-        .filter(CallResult.attempted_at >= start_of_month)
-        .scalar()
-        or 0
-    )
-    monthly_cost = (
-        db.query(func.coalesce(func.sum(effective_rate), 0))
-        .select_from(CallResult)
-        .outerjoin(Scenario, Scenario.id == CallResult.scenario_id)
-        .filter(CallResult.company_id == company_id)
-        .filter(CallResult.status.in_([status.value for status in CONNECTED_STATUSES]))
-        .filter(CallResult.attempted_at >= start_of_month)
-        .scalar()
-        or 0
-    )
+    # One rollup read for the month, split into today/month and priced per scenario.
+    connected = {status.value for status in CONNECTED_STATUSES}
+    counts = {
+        key: count
+        for key, count in call_stats_service.call_counts(
+            db,
+            ["day", "scenario_id", "status"],
+            start_of_month,
+            company_id=company_id,
+        ).items()
+        if key[2] in connected
+    }
+    scenario_ids = {scenario_id for _, scenario_id, _ in counts if scenario_id}
+    rates = {}
+    if scenario_ids:
+        rates = {
+            scenario_id: rate
+            for scenario_id, rate in db.query(Scenario.id, Scenario.cost_per_connected)
+            .filter(Scenario.id.in_(scenario_ids), Scenario.cost_per_connected.is_not(None))
+            .all()
+        }
+
+    daily_count = daily_cost = monthly_count = monthly_cost = 0
+    for (day, scenario_id, _status), count in counts.items():
+        cost = count * rates.get(scenario_id, default_rate)
+        monthly_count += count
+        monthly_cost += cost
+        if day >= start_of_day:
+            daily_count += count
+            daily_cost += cost
     return {
         "currency": "Toman",
         "cost_per_connected": default_rate,
@@ -266,7 +216,7 @@ def cost_summary(db: Session, company_id: int) -> dict:
 
 
 def _resolve_time_filter(time_filter: str) -> tuple[datetime | None, datetime | None]:
-    """Resolve time filter string to UTC datetime range (start, end)"""
+    """Resolve time filter string to UTC datetime range [start, end)"""
     now_tehran = datetime.now(TEHRAN_TZ)
 
     if time_filter == "1h":
@@ -278,7 +228,7 @@ def _resolve_time_filter(time_filter: str) -> tuple[datetime | None, datetime |
     elif time_filter == "yesterday":
         yesterday = now_tehran.date() - timedelta(days=1)
         start_tehran = datetime.combine(yesterday, time(0, 0), tzinfo=TEHRAN_TZ)
-        end_tehran = datetime.combine(yesterday, time(23, 59, 59, 999999), tzinfo=TEHRAN_TZ)
+        end_tehran = datetime.combine(now_tehran.date(), time(0, 0), tzinfo=TEHRAN_TZ)
         return start_tehran.astimezone(timezone.utc), end_tehran.astimezone(timezone.utc)
     elif time_filter == "7d":
         start_tehran = _tehran_start_of_day(6)
@@ -330,35 +280,13 @@ def dashboard_stats(
     """
     start_utc, end_utc = _resolve_time_filter(time_filter)
 
-    # Determine grouping column and label model
-    if group_by == "scenario":
-        group_col = CallResult.scenario_id
-        label_model = Scenario
-    else:
-        group_col = CallResult.outbound_line_id
-        label_model = OutboundLine
-
-    # Query call results grouped by scenario/line and status
-    query = (
-        db.query(
-            group_col.label("group_id"),
-            CallResult.status,
-            func.count(CallResult.id).label("count")
-        )
-        .filter(CallResult.company_id == company_id)
-    )
-
-    if start_utc:
-        query = query.filter(CallResult.attempted_at >= start_utc)
-    if end_utc:
-        query = query.filter(CallResult.attempted_at <= end_utc)
-
-    rows = query.group_by(group_col, CallResult.status).all()
+    group_key = "scenario_id" if group_by == "scenario" else "outbound_line_id"
+    counts = call_stats_service.call_counts(db, [group_key, "status"], start_utc, end_utc, company_id=company_id)
 
-    # Build matrix
+    # Build matrix (0 = call without scenario/line)
     groups_dict = defaultdict(lambda: defaultdict(int))
-    for group_id, status, count in rows:
-        if group_id is not None:
+    for (group_id, status), count in counts.items():
+        if group_id:
             groups_dict[group_id][status] = count
 
     # Fetch group names
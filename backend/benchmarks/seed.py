@@ -0,0 +1,185 @@
+"""Synthetic dataset for the benchmark suite (PostgreSQL only, destroys the target schema)."""
+
+import logging
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.config import get_settings
+from app.core.db import Base
+import app.models  # noqa: F401  (register every table on Base.metadata)
+from app.services.call_partition_service import _add_months, month_start, partition_name
+from app.services.schedule_service import TEHRAN_TZ
+
+logger = logging.getLogger(__name__)
+
+CALL_STATUSES = [
+    "MISSED",
+    "CONNECTED",
+    "FAILED",
+    "NOT_INTERESTED",
+    "HANGUP",
+    "DISCONNECTED",
+    "BUSY",
+    "POWER_OFF",
+    "BANNED",
+    "UNKNOWN",
+]
+
+
+def _partition_call_results(conn: Connection, days: int) -> None:
+    """Rebuild the empty call_results as the monthly range-partitioned table that
+    migration 0018 produces (same PK, FKs and indexes), so benchmarks see pruning."""
+    foreign_keys = conn.execute(text(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = 'call_results'::regclass AND contype = 'f'"
+    )).all()
+    indexes = conn.execute(text(
+        "SELECT i.relname, pg_get_indexdef(i.oid) FROM pg_index x JOIN pg_class i ON i.oid = x.indexrelid "
+        "WHERE x.indrelid = 'call_results'::regclass AND NOT x.indisunique"
+    )).all()
+    sequence = conn.execute(text("SELECT pg_get_serial_sequence('call_results', 'id')")).scalar()
+
+    conn.execute(text("ALTER TABLE call_results RENAME TO call_results_template"))
+    for name, _ in indexes:
+        conn.execute(text(f'DROP INDEX "{name}"'))
+    conn.execute(text(
+        "CREATE TABLE call_results (LIKE call_results_template INCLUDING DEFAULTS INCLUDING STORAGE) "
+        "PARTITION BY RANGE (attempted_at)"
+    ))
+    conn.execute(text("ALTER TABLE call_results ADD CONSTRAINT call_results_pkey PRIMARY KEY (id, attempted_at)"))
+    for name, definition in foreign_keys:
+        conn.execute(text(f'ALTER TABLE call_results ADD CONSTRAINT "{name}" {definition}'))
+    for _, definition in indexes:
+        conn.execute(text(definition))
+    if sequence:
+        conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY call_results.id"))
+    conn.execute(text("DROP TABLE call_results_template"))
+
+    conn.execute(text("CREATE TABLE call_results_default PARTITION OF call_results DEFAULT"))
+    now = datetime.now(TEHRAN_TZ)
+    month = (now - timedelta(days=days)).date().replace(day=1)
+    last = _add_months(now.date().replace(day=1), get_settings().call_results_partitions_ahead)
+    while month <= last:
+        conn.execute(text(
+            f"CREATE TABLE {partition_name(month)} PARTITION OF call_results "
+            f"FOR VALUES FROM ('{month_start(month).isoformat()}') "
+            f"TO ('{month_start(_add_months(month, 1)).isoformat()}')"
+        ))
+        month = _add_months(month, 1)
+
+
+def seed(engine: Engine, *, numbers: int, call_results: int, companies: int, days: int = 60, rng_seed: float = 0.42) -> None:
+    """Drop and recreate every table, then bulk-generate rows with generate_series.
+
+    Derived tables (company_number_state, call_stats_hourly, dialer_pool) are rebuilt with the same SQL
+    the migrations use for their backfills, so the data is consistent with what the
+    services maintain incrementally. call_results gets the partitioned layout of
+    migration 0018 before any row is inserted.
+    """
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        _partition_call_results(conn, days)
+    steps = [
+        ("companies", """
+            INSERT INTO companies (name, display_name, is_active, settings)
+            SELECT 'bench_' || g, 'Bench ' || g, true, '{}'::jsonb
+            FROM generate_series(1, :companies) AS g
+        """),
+        ("schedule_configs", """
+            INSERT INTO schedule_configs (company_id, skip_holidays, enabled, disabled_by_dialer,
+                                          wallet_balance, cost_per_connected, version)
+            SELECT id, false, true, false, 1000000000, 100, 1 FROM companies
+        """),
+        ("schedule_windows", """
+            INSERT INTO schedule_windows (company_id, day_of_week, start_time, end_time)
+            SELECT c.id, d, time '00:00', time '23:59:59'
+            FROM companies AS c CROSS JOIN generate_series(0, 6) AS d
+        """),
+        ("scenarios", """
+            INSERT INTO scenarios (company_id, name, display_name, cost_per_connected, is_active)
+            SELECT c.id, 'scenario_' || s, 'Scenario ' || s, 100 * s, true
+            FROM companies AS c CROSS JOIN generate_series(1, 3) AS s
+        """),
+        ("outbound_lines", """
+            INSERT INTO outbound_lines (company_id, phone_number, display_name, is_active)
+            SELECT c.id, '0210000' || lpad((c.id * 10 + l)::text, 4, '0'), 'Line ' || l, true
+            FROM companies AS c CROSS JOIN generate_series(1, 2) AS l
+        """),
+        ("numbers", """
+            INSERT INTO numbers (phone_number, global_status)
+            SELECT '09' || lpad(g::text, 9, '0'), 'ACTIVE'::globalstatus
+            FROM generate_series(1, :numbers) AS g
+        """),
+        ("call_results", """
+            INSERT INTO call_results (phone_number_id, company_id, scenario_id, call_direction, status, attempted_at)
+            SELECT
+                1 + floor(random() * :numbers)::int,
+                c.company_id,
+                (SELECT min(id) FROM scenarios WHERE company_id = c.company_id) + (g % 3),
+                'OUTBOUND',
+                (:statuses)[1 + floor(random() * cardinality(:statuses))::int],
+                now() - random() * make_interval(days => :days)
+            FROM generate_series(1, :call_results) AS g
+            CROSS JOIN LATERAL (SELECT 1 + (g % :companies) AS company_id) AS c
+        """),
+        ("numbers.last_called_at", """
+            UPDATE numbers AS n SET last_called_at = cr.last_at, last_called_company_id = cr.company_id
+            FROM (
+                SELECT DISTINCT ON (phone_number_id) phone_number_id, company_id, attempted_at AS last_at
+                FROM call_results ORDER BY phone_number_id, attempted_at DESC
+            ) AS cr
+            WHERE n.id = cr.phone_number_id
+        """),
+        ("company_number_state", """
+            INSERT INTO company_number_state (
+                company_id, phone_number_id, latest_call_result_id, status, attempted_at,
+                agent_id, scenario_id, outbound_line_id, attempt_count
+            )
+            SELECT DISTINCT ON (cr.company_id, cr.phone_number_id)
+                cr.company_id, cr.phone_number_id, cr.id, cr.status, cr.attempted_at,
+                cr.agent_id, cr.scenario_id, cr.outbound_line_id,
+                COUNT(*) OVER (PARTITION BY cr.company_id, cr.phone_number_id)
+            FROM call_results AS cr
+            ORDER BY cr.company_id, cr.phone_number_id, cr.id DESC
+        """),
+        ("call_stats_hourly", """
+            INSERT INTO call_stats_hourly (company_id, bucket, scenario_id, outbound_line_id, status, call_count)
+            SELECT
+                COALESCE(company_id, 0),
+                timezone('Asia/Tehran', date_trunc('hour', timezone('Asia/Tehran', attempted_at))),
+                COALESCE(scenario_id, 0),
+                COALESCE(outbound_line_id, 0),
+                status,
+                count(*)
+            FROM call_results
+            GROUP BY 1, 2, 3, 4, 5
+        """),
+        ("dialer_pool", """
+            INSERT INTO dialer_pool (company_id, phone_number_id)
+            SELECT c.id, n.id
+            FROM companies AS c CROSS JOIN numbers AS n
+            WHERE NOT EXISTS (
+                SELECT 1 FROM company_number_state AS s
+                WHERE s.company_id = c.id AND s.phone_number_id = n.id
+            )
+        """),
+    ]
+    params = {
+        "companies": companies,
+        "numbers": numbers,
+        "call_results": call_results,
+        "days": days,
+        "statuses": CALL_STATUSES,
+    }
+    with engine.begin() as conn:
+        conn.execute(text("SELECT setseed(:s)"), {"s": rng_seed})
+        for name, sql in steps:
+            started = time.perf_counter()
+            conn.execute(text(sql), params)
+            logger.info("seeded %s in %.1fs", name, time.perf_counter() - started)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ANALYZE"))
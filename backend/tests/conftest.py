@@ -7,3 +7,26 @@ os.environ.setdefault("DIALER_TOKEN", "test-token")
 os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "1440")
 os.environ.setdefault("DEFAULT_BATCH_SIZE", "100")
 os.environ.setdefault("TIMEZONE", "Asia/Tehran")
+
+from sqlalchemy.dialects.postgresql import JSONB  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_as_json_on_sqlite(_type, _compiler, **_kw):
+    # SQLite-backed service tests create the full schema; companies.settings is JSONB.
+    return "JSON"
+
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _reset_process_caches():
+    # Per-process caches would otherwise leak companies/users between test databases.
+    from app.core.security import invalidate_principals
+    from app.services import company_registry
+
+    invalidate_principals()
+    company_registry.invalidate()
+    yield
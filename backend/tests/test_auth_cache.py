@@ -0,0 +1,61 @@
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core import security
+from app.core.db import Base
+from app.models import AdminUser, UserRole
+from app.schemas.user import AdminSelfUpdate
+from app.services import auth_service
+
+
+def _sqlite_session_factory():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False), statements
+
+
+def test_principal_is_cached_per_subject_and_dropped_on_user_writes(monkeypatch):
+    monkeypatch.setattr(security.settings, "auth_cache_ttl_seconds", 30)
+    security.invalidate_principals()
+    Session, statements = _sqlite_session_factory()
+    with Session() as db:
+        db.add(AdminUser(username="admin", password_hash="x", role=UserRole.ADMIN, is_active=True, first_name="A"))
+        db.commit()
+    token = security.create_access_token({"sub": "admin"})
+
+    with Session() as db:
+        security.get_current_user(db, token)
+    statements.clear()
+    with Session() as db:
+        user = security.get_current_user(db, token)
+        assert statements == []
+        # The cached principal is attached to the request session like a loaded row.
+        user.first_name = "B"
+        user_id = user.id
+        db.commit()
+    with Session() as db:
+        assert db.query(AdminUser).one().first_name == "B"
+
+    with Session() as db:
+        auth_service.update_self(db, user_id, AdminSelfUpdate(last_name="Changed"))
+    statements.clear()
+    with Session() as db:
+        assert security.get_current_user(db, token).last_name == "Changed"
+        assert len(statements) == 1
+
+
+def test_zero_ttl_loads_the_user_every_time(monkeypatch):
+    monkeypatch.setattr(security.settings, "auth_cache_ttl_seconds", 0)
+    security.invalidate_principals()
+    Session, statements = _sqlite_session_factory()
+    with Session() as db:
+        db.add(AdminUser(username="agent", password_hash="x", role=UserRole.AGENT, is_active=True))
+        db.commit()
+    token = security.create_access_token({"sub": "agent"})
+    statements.clear()
+    for _ in range(2):
+        with Session() as db:
+            security.get_current_user(db, token)
+    assert len(statements) == 2
@@ -0,0 +1,85 @@
+from contextlib import nullcontext
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+from app.models import CallResult, DialerBatchItem
+from app.models.phone_number import CallStatus
+from app.services import call_partition_service
+
+
+def _sqlite_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+
+
+def test_partition_bounds_follow_tehran_months():
+    assert call_partition_service.partition_name(date(2026, 12, 1)) == "call_results_p2026_12"
+    assert call_partition_service._add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    start = call_partition_service.month_start(date(2026, 4, 1))
+    assert start.astimezone(timezone.utc) == datetime(2026, 3, 31, 20, 30, tzinfo=timezone.utc)
+    assert start.isoformat() == "2026-04-01T00:00:00+03:30"
+
+
+def test_ensure_partitions_is_a_noop_off_postgres():
+    assert call_partition_service.ensure_partitions(_sqlite_session()) == 0
+
+
+class _PostgresStub:
+    """Just enough Session for ensure_partitions to run its PostgreSQL branch."""
+
+    def __init__(self):
+        self.statements = []
+        self.dialect = type("Dialect", (), {"name": "postgresql"})()
+
+    def get_bind(self):
+        return self
+
+    def execute(self, stmt):
+        self.statements.append(str(stmt))
+        return self
+
+    def scalar(self):
+        return True
+
+    def begin_nested(self):
+        return nullcontext()
+
+    def commit(self):
+        pass
+
+
+def test_partition_creation_is_guarded_by_a_lock_timeout(monkeypatch):
+    monkeypatch.setattr(call_partition_service, "_is_partitioned", lambda db: True)
+    monkeypatch.setattr(call_partition_service, "_existing_partitions", lambda db: set())
+    monkeypatch.setattr(call_partition_service, "_legacy_end", lambda db: None)
+    monkeypatch.setattr(call_partition_service.settings, "call_results_partitions_ahead", 0)
+    db = _PostgresStub()
+
+    assert call_partition_service.ensure_partitions(db, today=date(2026, 5, 10)) == 1
+
+    create = next(i for i, sql in enumerate(db.statements) if sql.startswith("CREATE TABLE"))
+    assert db.statements[create - 1].startswith("SET LOCAL lock_timeout")
+
+
+def test_batch_item_still_resolves_its_call_result_without_a_foreign_key():
+    db = _sqlite_session()
+    now = datetime.now(timezone.utc)
+    call = CallResult(phone_number_id=1, company_id=1, status=CallStatus.MISSED, attempted_at=now)
+    db.add(call)
+    db.flush()
+    item = DialerBatchItem(
+        batch_id="b1",
+        company_id=1,
+        phone_number_id=1,
+        assigned_at=now - timedelta(minutes=1),
+        report_call_result_id=call.id,
+    )
+    db.add(item)
+    db.commit()
+    db.expire_all()
+    assert db.get(DialerBatchItem, item.id).call_result.status == CallStatus.MISSED.value
+    assert not DialerBatchItem.__table__.c.report_call_result_id.foreign_keys
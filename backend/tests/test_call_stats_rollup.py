@@ -0,0 +1,102 @@
+import random
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+from app.models import CallResult, CallStatsDelta, CallStatsHourly, Company, PhoneNumber, UserRole
+from app.models.phone_number import CallStatus, GlobalStatus
+from app.schemas.phone_number import PhoneNumberStatusUpdate
+from app.services import call_stats_service, phone_service
+
+
+def _sqlite_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+
+
+def _raw_counts(rows, start, end, company_id):
+    return Counter(
+        (scenario_id or 0, status.value)
+        for row_company, scenario_id, status, attempted_at in rows
+        if row_company == company_id and start <= attempted_at < end
+    )
+
+
+def test_rollup_matches_raw_call_results_for_unaligned_windows():
+    db = _sqlite_session()
+    rng = random.Random(7)
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    statuses = [CallStatus.CONNECTED, CallStatus.MISSED, CallStatus.BUSY]
+    rows = [
+        (
+            rng.choice([1, 2]),
+            rng.choice([None, 1, 2]),
+            rng.choice(statuses),
+            now - timedelta(minutes=rng.randrange(48 * 60)),
+        )
+        for _ in range(400)
+    ]
+    calls = [
+        CallResult(phone_number_id=i, company_id=company_id, scenario_id=scenario_id, status=status, attempted_at=at)
+        for i, (company_id, scenario_id, status, at) in enumerate(rows)
+    ]
+    db.add_all(calls[:300])
+    call_stats_service.record_calls(db, calls[:300])
+    db.commit()
+    assert call_stats_service.fold_deltas(db) > 0
+    # The rest stays pending in call_stats_deltas.
+    db.add_all(calls[300:])
+    call_stats_service.record_calls(db, calls[300:])
+    db.commit()
+
+    for start, end in [
+        (now - timedelta(hours=30, minutes=17), now),
+        (now - timedelta(hours=5, minutes=3), now - timedelta(hours=1, minutes=41)),
+        (now - timedelta(minutes=50), now - timedelta(minutes=10)),
+    ]:
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.get_bind(), "before_cursor_execute", listener)
+        counts = call_stats_service.call_counts(db, ["scenario_id", "status"], start, end, company_id=1)
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+        assert counts == dict(_raw_counts(rows, start, end, 1))
+        # Rollup, pending deltas and raw edges are read in one statement (one snapshot).
+        assert len(statements) == 1
+
+    by_hour = call_stats_service.call_counts(db, ["hour"], None, company_id=2)
+    assert sum(by_hour.values()) == sum(1 for row in rows if row[0] == 2)
+    assert all(call_stats_service.hour_bucket(bucket) == bucket for (bucket,) in by_hour)
+
+
+def test_status_edit_and_delete_move_counts():
+    db = _sqlite_session()
+    db.add(Company(id=1, name="salehi", display_name="Salehi", settings={}))
+    number = PhoneNumber(phone_number="09120000001", global_status=GlobalStatus.ACTIVE)
+    db.add(number)
+    db.flush()
+    attempted_at = datetime.now(timezone.utc) - timedelta(hours=3)
+    call = CallResult(phone_number_id=number.id, company_id=1, status=CallStatus.MISSED, attempted_at=attempted_at)
+    db.add(call)
+    db.flush()
+    call_stats_service.record_calls(db, [call])
+    db.commit()
+    call_stats_service.fold_deltas(db)
+    user = SimpleNamespace(id=1, company_id=1, is_superuser=True, role=UserRole.ADMIN)
+    window = (attempted_at - timedelta(hours=2), datetime.now(timezone.utc))
+
+    phone_service.update_number_status(
+        db, number.id, PhoneNumberStatusUpdate(status=CallStatus.CONNECTED), user, company_name="salehi"
+    )
+    assert call_stats_service.call_counts(db, ["status"], *window, company_id=1) == {("CONNECTED",): 1}
+
+    phone_service.delete_number(db, number.id, user, company_name="salehi")
+    assert call_stats_service.call_counts(db, ["status"], *window, company_id=1) == {}
+
+    call_stats_service.fold_deltas(db)
+    assert db.query(CallStatsDelta).count() == 0
+    assert sum(row.call_count for row in db.query(CallStatsHourly)) == 0
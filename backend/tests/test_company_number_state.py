@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+from app.models import CallResult, Company, CompanyNumberState, PhoneNumber
+from app.models.phone_number import CallStatus, GlobalStatus
+from app.models.user import UserRole
+from app.schemas.phone_number import PhoneNumberStatusUpdate
+from app.services import number_state_service
+from app.services.phone_service import count_numbers, update_number_status
+from app.services.stats_service import numbers_summary
+
+
+def _sqlite_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+
+
+def _seed(db):
+    company = Company(name="salehi", display_name="Salehi", settings={})
+    db.add(company)
+    db.flush()
+    numbers = [PhoneNumber(phone_number=f"0912000000{i}", global_status=GlobalStatus.ACTIVE) for i in range(3)]
+    db.add_all(numbers)
+    db.commit()
+    user = SimpleNamespace(id=1, company_id=company.id, is_superuser=True, role=UserRole.ADMIN)
+    return company, numbers, user
+
+
+def _call(company, number, status, at):
+    return CallResult(phone_number_id=number.id, company_id=company.id, status=status.value, attempted_at=at)
+
+
+def test_record_calls_keeps_latest_and_accumulates_attempts():
+    db = _sqlite_session()
+    company, numbers, _ = _seed(db)
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    first = [_call(company, numbers[0], CallStatus.MISSED, base)]
+    db.add_all(first)
+    db.flush()
+    number_state_service.record_calls(db, first)
+
+    # A batch can carry several reports for the same number; the newest one wins.
+    batch = [
+        _call(company, numbers[0], CallStatus.BUSY, base + timedelta(minutes=5)),
+        _call(company, numbers[0], CallStatus.CONNECTED, base + timedelta(minutes=10)),
+        _call(company, numbers[1], CallStatus.POWER_OFF, base),
+    ]
+    db.add_all(batch)
+    db.flush()
+    number_state_service.record_calls(db, batch)
+    db.commit()
+
+    state = {row.phone_number_id: row for row in db.query(CompanyNumberState).all()}
+    assert set(state) == {numbers[0].id, numbers[1].id}
+    assert state[numbers[0].id].status == CallStatus.CONNECTED.value
+    assert state[numbers[0].id].attempt_count == 3
+    assert state[numbers[0].id].latest_call_result_id == batch[1].id
+    assert state[numbers[1].id].attempt_count == 1
+
+
+def test_filters_and_summary_read_the_state_table():
+    db = _sqlite_session()
+    company, numbers, user = _seed(db)
+
+    update_number_status(db, numbers[0].id, PhoneNumberStatusUpdate(status=CallStatus.BUSY), user, company_name="salehi")
+    update_number_status(db, numbers[1].id, PhoneNumberStatusUpdate(status=CallStatus.BUSY), user, company_name="salehi")
+    update_number_status(db, numbers[1].id, PhoneNumberStatusUpdate(status=CallStatus.MISSED), user, company_name="salehi")
+
+    assert count_numbers(db, user, company_name="salehi", status=CallStatus.BUSY) == 1
+    assert count_numbers(db, user, company_name="salehi", status=CallStatus.MISSED) == 1
+    assert count_numbers(db, user, company_name="salehi", status=CallStatus.IN_QUEUE) == 1
+
+    summary = {share.status: share.count for share in numbers_summary(db, company_id=company.id).status_counts}
+    assert summary[CallStatus.BUSY] == 1
+    assert summary[CallStatus.MISSED] == 1
+    assert summary[CallStatus.IN_QUEUE] == 1
@@ -0,0 +1,69 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+from app.models import Company
+from app.services import company_registry
+
+
+def _sqlite_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False)(), statements
+
+
+def test_slugs_resolve_from_memory_until_invalidated(monkeypatch):
+    monkeypatch.setattr(company_registry.settings, "company_cache_ttl_seconds", 30)
+    db, statements = _sqlite_session()
+    db.add_all([
+        Company(name="salehi", display_name="Salehi", settings={}, is_active=True),
+        Company(name="old", display_name="Old", settings={}, is_active=False),
+    ])
+    db.commit()
+
+    statements.clear()
+    salehi_id = company_registry.active_id(db, "salehi")
+    assert company_registry.active_id(db, "salehi") == salehi_id
+    assert company_registry.lookup(db, "old").is_active is False
+    assert len(statements) == 1
+
+    with pytest.raises(HTTPException) as exc:
+        company_registry.get_active_company(db, "old")
+    assert exc.value.status_code == 404
+
+    # Unknown slugs reload (the company may have been created on another worker), but
+    # at most once per MISS_RELOAD_SECONDS.
+    db.add(Company(name="new", display_name="New", settings={}, is_active=True))
+    db.commit()
+    statements.clear()
+    assert company_registry.lookup(db, "new") is None
+    assert company_registry.lookup(db, "typo") is None
+    assert statements == []
+    company_registry._state["loaded_at"] -= company_registry.MISS_RELOAD_SECONDS
+    assert company_registry.lookup(db, "new") is not None
+    assert len(statements) == 1
+
+    db.query(Company).filter(Company.name == "salehi").update({Company.is_active: False})
+    db.commit()
+    assert company_registry.lookup(db, "salehi").is_active is True
+    company_registry.invalidate()
+    assert company_registry.lookup(db, "salehi").is_active is False
+
+
+def test_active_company_is_bound_to_the_session_without_a_select():
+    db, statements = _sqlite_session()
+    db.add(Company(name="salehi", display_name="Salehi", settings={"a": 1}, is_active=True))
+    db.commit()
+    company_registry.lookup(db, "salehi")
+    db.expunge_all()
+
+    statements.clear()
+    company = company_registry.get_active_company(db, "salehi")
+    assert (company.name, company.is_active) == ("salehi", True)
+    assert statements == []
+    assert company.display_name == "Salehi"  # other columns load lazily
+    assert len(statements) == 1
@@ -0,0 +1,29 @@
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core import db
+
+
+def test_engine_options_apply_pool_settings(monkeypatch):
+    monkeypatch.setattr(db.settings, "db_pool_timeout_seconds", 7)
+    monkeypatch.setattr(db.settings, "db_pool_recycle_seconds", 300)
+    options = db._engine_options("postgresql+psycopg2://u:p@h/app", "primary", 4, 2, 5000)
+    assert issubclass(options["poolclass"], QueuePool)
+    assert options["poolclass"].metrics_pool == "primary"
+    assert (options["pool_size"], options["max_overflow"]) == (4, 2)
+    assert (options["pool_timeout"], options["pool_recycle"]) == (7, 300)
+    assert options["connect_args"] == {"options": "-c statement_timeout=5000"}
+
+
+def test_async_engine_options_use_asyncpg_server_settings():
+    options = db._engine_options("postgresql://u:p@h/app", "dialer", 10, 10, 2000, is_async=True)
+    assert issubclass(options["poolclass"], AsyncAdaptedQueuePool)
+    assert options["poolclass"].metrics_pool == "dialer"
+    assert options["connect_args"] == {"server_settings": {"statement_timeout": "2000"}}
+
+
+def test_statement_timeout_zero_keeps_server_default():
+    assert "connect_args" not in db._engine_options("postgresql://u:p@h/app", "reports", 3, 2, 0)
+
+
+def test_sqlite_keeps_sqlalchemy_defaults():
+    assert db._engine_options("sqlite:///:memory:", "primary", 4, 2, 5000) == {"pool_pre_ping": True}
@@ -0,0 +1,57 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+from app.models import Company, Scenario, ScheduleConfig, WalletPendingCharge
+from app.services import schedule_service
+
+
+def _sqlite_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+
+
+def _seed(db, balance: int):
+    company = Company(name="salehi", display_name="Salehi", settings={})
+    db.add(company)
+    db.flush()
+    db.add(ScheduleConfig(company_id=company.id, enabled=True, wallet_balance=balance, cost_per_connected=100, version=1))
+    scenario = Scenario(company_id=company.id, name="s1", display_name="S1", cost_per_connected=300)
+    db.add(scenario)
+    db.commit()
+    return company, scenario
+
+
+def test_deferred_mode_appends_ledger_and_settle_folds_it(monkeypatch):
+    monkeypatch.setattr(schedule_service.settings, "wallet_billing_mode", "deferred")
+    db = _sqlite_session()
+    company, scenario = _seed(db, balance=1000)
+
+    schedule_service.charge_for_connected_call(db, company_id=company.id, scenario_id=scenario.id)
+    schedule_service.charge_for_connected_call(db, company_id=company.id, scenario_id=None)
+
+    cfg = db.query(ScheduleConfig).filter_by(company_id=company.id).one()
+    assert cfg.wallet_balance == 1000
+    assert [row.amount_toman for row in db.query(WalletPendingCharge).order_by(WalletPendingCharge.id)] == [300, 100]
+
+    assert schedule_service.settle_pending_charges(db) == 2
+    db.refresh(cfg)
+    assert cfg.wallet_balance == 600
+    assert cfg.enabled is True
+    assert db.query(WalletPendingCharge).count() == 0
+
+
+def test_settle_disables_dialing_when_balance_runs_out(monkeypatch):
+    monkeypatch.setattr(schedule_service.settings, "wallet_billing_mode", "deferred")
+    db = _sqlite_session()
+    company, scenario = _seed(db, balance=500)
+
+    schedule_service.apply_connected_charges(db, company_id=company.id, scenario_ids=[scenario.id, scenario.id])
+    db.commit()
+    schedule_service.settle_pending_charges(db)
+
+    cfg = db.query(ScheduleConfig).filter_by(company_id=company.id).one()
+    assert cfg.wallet_balance == 0
+    assert cfg.enabled is False
+    assert cfg.disabled_by_dialer is True
@@ -0,0 +1,145 @@
+import asyncio
+import time as clock
+from datetime import time
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.db import Base, _async_url
+from app.models import Company, Scenario
+from app.models.schedule import ScheduleConfig, ScheduleWindow
+from app.schemas.scenario import RegisterScenariosRequest
+from app.services import dialer_service, schedule_watcher
+from app.services.schedule_service import check_call_window
+
+
+def test_async_url_swaps_driver():
+    assert _async_url("postgresql+psycopg2://u:p@db:5432/app").drivername == "postgresql+asyncpg"
+    assert _async_url("postgresql://u:p@db/app").drivername == "postgresql+asyncpg"
+    assert _async_url("sqlite:///:memory:").drivername == "sqlite+aiosqlite"
+
+
+def test_async_entry_points_share_the_sync_service_logic(tmp_path):
+    path = tmp_path / "dialer.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(sync_engine)
+    with sync_engine.begin() as conn:
+        conn.execute(Company.__table__.insert().values(name="salehi", display_name="Salehi", settings={}, is_active=True))
+
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        session_factory = async_sessionmaker(engine, autoflush=False)
+        try:
+            async with session_factory() as db:
+                with pytest.raises(HTTPException) as missing:
+                    await dialer_service.get_active_company(db, "nope")
+                assert missing.value.status_code == 404
+
+                company = await dialer_service.get_active_company(db, "salehi")
+                payload = RegisterScenariosRequest(
+                    company="salehi",
+                    scenarios=[{"name": "s1", "display_name": "One"}, {"name": "s2", "display_name": "Two"}],
+                )
+                result = await dialer_service.register_scenarios_async(db, company, payload)
+                assert result["created"] == 2
+
+            async with session_factory() as db:
+                names = (await db.scalars(select(Scenario.name).order_by(Scenario.name))).all()
+                assert names == ["s1", "s2"]
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_next_batch_long_poll_wakes_when_company_becomes_callable(tmp_path, monkeypatch):
+    path = tmp_path / "dialer.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(sync_engine)
+    with sync_engine.begin() as conn:
+        conn.execute(Company.__table__.insert().values(id=1, name="salehi", display_name="Salehi", settings={}, is_active=True))
+        conn.execute(
+            ScheduleConfig.__table__.insert().values(
+                company_id=1, enabled=False, skip_holidays=False, wallet_balance=1000, cost_per_connected=150, version=1
+            )
+        )
+        conn.execute(
+            ScheduleWindow.__table__.insert(),
+            [{"company_id": 1, "day_of_week": d, "start_time": time(0, 0), "end_time": time(23, 59, 59)} for d in range(7)],
+        )
+
+    # Only the waiting logic is under test; the batch itself is covered elsewhere.
+    def fake_fetch(db, company, size=None, active_lines_count=None):
+        allowed, reason, retry_after, version = check_call_window(None, db, company_id=company.id)
+        return {"call_allowed": allowed, "reason": reason, "retry_after_seconds": retry_after, "schedule_version": version}
+
+    monkeypatch.setattr(dialer_service, "fetch_next_batch", fake_fetch)
+    monkeypatch.setattr(schedule_watcher.settings, "next_batch_wait_poll_seconds", 0.05)
+
+    def enable():
+        with sync_engine.begin() as conn:
+            conn.execute(update(ScheduleConfig.__table__).values(enabled=True, version=2))
+
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        session_factory = async_sessionmaker(engine, autoflush=False)
+        try:
+            async with session_factory() as db:
+                started = clock.monotonic()
+                timed_out = await dialer_service.wait_for_next_batch(db, "salehi", wait_seconds=0.3)
+                assert timed_out["call_allowed"] is False
+                assert timed_out["reason"] == "disabled"
+                assert timed_out["retry_after_seconds"] == 0
+                assert clock.monotonic() - started >= 0.3
+
+                # Concurrent waiters of one company share a single version probe.
+                probes = []
+                event.listen(
+                    engine.sync_engine,
+                    "before_cursor_execute",
+                    lambda *args: probes.append(args[2]) if args[2].startswith("SELECT schedule_configs.version \n") else None,
+                )
+                sessions = [session_factory() for _ in range(5)]
+                await asyncio.gather(
+                    *(dialer_service.wait_for_next_batch(s, "salehi", wait_seconds=0.3) for s in sessions)
+                )
+                for s in sessions:
+                    await s.close()
+                # One shared poll every 0.05s (~6 in 0.3s), not one per waiter (~30).
+                assert 0 < len(probes) <= 8
+
+                asyncio.get_running_loop().call_later(0.2, enable)
+                started = clock.monotonic()
+                woken = await dialer_service.wait_for_next_batch(db, "salehi", wait_seconds=10)
+                assert woken["call_allowed"] is True
+                assert woken["schedule_version"] == 2
+                assert clock.monotonic() - started < 5
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_watcher_parks_a_waiter_whose_version_is_ahead_of_the_probe(monkeypatch):
+    # The version was bumped (still not callable) and a new long-poll read it before the
+    # probe did: that waiter must park, not spin, and older waiters must be woken.
+    monkeypatch.setattr(schedule_watcher.settings, "next_batch_wait_poll_seconds", 60)
+
+    async def scenario():
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        try:
+            old = asyncio.create_task(schedule_watcher.wait_for_change(engine, 1, 1, 5))
+            await asyncio.sleep(0)
+            started = clock.monotonic()
+            assert await schedule_watcher.wait_for_change(engine, 1, 2, 0.2) is False
+            assert clock.monotonic() - started >= 0.2
+            assert old.done() and old.result() is True
+            assert schedule_watcher._watches[1].version == 2
+            # A waiter still holding the older version returns at once.
+            assert await schedule_watcher.wait_for_change(engine, 1, 1, 5) is True
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
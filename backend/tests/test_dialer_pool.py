@@ -0,0 +1,54 @@
+from datetime import datetime, timezone
+
+from sqlalchemy.dialects import postgresql
+
+from app.services.dialer_service import _candidate_numbers_stmt
+from app.services import dialer_pool_service, dialer_service
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_candidate_selection_scans_pool_without_call_results_anti_join():
+    sql = _sql(_candidate_numbers_stmt(1, 40, datetime.now(timezone.utc)))
+    assert "dialer_pool" in sql
+    assert "call_results" not in sql
+    assert "ORDER BY dialer_pool.phone_number_id DESC" in sql
+    assert "FOR UPDATE OF numbers SKIP LOCKED" in sql
+
+
+def test_reserve_candidates_locks_through_a_materialized_cte():
+    db = RecordingDB()
+    now = datetime.now(timezone.utc)
+    dialer_service._reserve_candidates(db, 1, 40, now, now, batch_id="b")
+    sql = _sql(db.statements[0])
+    assert sql.startswith("WITH candidates AS MATERIALIZED")
+    assert "FOR UPDATE OF numbers SKIP LOCKED)" in sql
+    assert "WHERE numbers.id IN (SELECT candidates.id" in sql
+
+
+class RecordingDB:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, stmt):
+        self.statements.append(stmt)
+        return self
+
+    def all(self):
+        return []
+
+
+def test_add_numbers_to_pool_skips_empty_input():
+    db = RecordingDB()
+    dialer_pool_service.add_numbers_to_pool(db, [])
+    assert db.statements == []
+
+
+def test_add_numbers_to_pool_fans_out_to_every_company():
+    db = RecordingDB()
+    dialer_pool_service.add_numbers_to_pool(db, [5, 6])
+    sql = _sql(db.statements[0])
+    assert sql.startswith("INSERT INTO dialer_pool (company_id, phone_number_id) SELECT companies.id, numbers.id")
+    assert "ON CONFLICT DO NOTHING" in sql
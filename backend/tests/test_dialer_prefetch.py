@@ -0,0 +1,134 @@
+from datetime import datetime, time, timedelta, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+from app.models import Company, DialerBatchItem, DialerPoolEntry, DialerPrefetchEntry, PhoneNumber
+from app.models.phone_number import GlobalStatus
+from app.models.schedule import ScheduleConfig, ScheduleWindow
+from app.services import dialer_service
+
+
+def _sqlite_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+
+
+def _seed(db, numbers=5):
+    db.add(Company(id=1, name="salehi", display_name="Salehi", settings={}, is_active=True))
+    db.add(ScheduleConfig(company_id=1, enabled=True, skip_holidays=False, wallet_balance=1000, version=1))
+    db.add_all(
+        ScheduleWindow(company_id=1, day_of_week=day, start_time=time(0, 0), end_time=time(23, 59, 59))
+        for day in range(7)
+    )
+    db.add_all(
+        PhoneNumber(id=i, phone_number=f"0912000000{i}", global_status=GlobalStatus.ACTIVE)
+        for i in range(1, numbers + 1)
+    )
+    db.flush()
+    db.add_all(DialerPoolEntry(company_id=1, phone_number_id=i) for i in range(1, numbers + 1))
+    db.commit()
+
+
+def test_direct_assignment_is_one_update_and_one_insert(monkeypatch):
+    monkeypatch.setattr(dialer_service.settings, "dialer_prefetch_watermark", 0)
+    db = _sqlite_session()
+    _seed(db)
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    batch = dialer_service.fetch_next_batch(db, SimpleNamespace(id=1, name="salehi"), size=4)["batch"]
+
+    assert [n["id"] for n in batch["numbers"]] == [5, 4, 3, 2]
+    assert batch["numbers"][0]["phone_number"] == "09120000005"
+    assert sum("UPDATE numbers" in sql for sql in statements) == 1
+    assert sum(sql.startswith("INSERT INTO dialer_batch_items") for sql in statements) == 1
+    db.expire_all()
+    assert {n.assigned_batch_id for n in db.query(PhoneNumber).filter(PhoneNumber.id >= 2)} == {batch["batch_id"]}
+    assert db.get(PhoneNumber, 1).assigned_at is None
+
+
+def _buffer(db):
+    return sorted(db.execute(select(DialerPrefetchEntry.phone_number_id)).scalars())
+
+
+def test_next_batch_is_served_from_the_prefetch_buffer(monkeypatch):
+    monkeypatch.setattr(dialer_service.settings, "dialer_prefetch_watermark", 3)
+    db = _sqlite_session()
+    _seed(db)
+
+    assert dialer_service.refill_prefetch(db) == 3
+    assert _buffer(db) == [3, 4, 5]
+    assert dialer_service.refill_prefetch(db) == 0  # already at the watermark
+
+    # A buffered number that stops being a candidate is dropped, not handed out.
+    db.get(PhoneNumber, 4).global_status = GlobalStatus.COMPLAINED
+    db.commit()
+
+    company = SimpleNamespace(id=1, name="salehi")
+    batch = dialer_service.fetch_next_batch(db, company, size=3)["batch"]
+
+    assert [n["id"] for n in batch["numbers"]] == [5, 3, 2]
+    assert _buffer(db) == []
+    db.expire_all()
+    assert db.get(PhoneNumber, 4).assigned_at is None
+    assigned = {n.id: n.assigned_batch_id for n in db.query(PhoneNumber).filter(PhoneNumber.assigned_at.is_not(None))}
+    assert assigned == {2: batch["batch_id"], 3: batch["batch_id"], 5: batch["batch_id"]}
+    items = db.execute(select(DialerBatchItem.phone_number_id).where(DialerBatchItem.batch_id == batch["batch_id"]))
+    assert sorted(items.scalars()) == [2, 3, 5]
+
+
+def test_prefetch_is_released_when_company_stops_being_callable(monkeypatch):
+    monkeypatch.setattr(dialer_service.settings, "dialer_prefetch_watermark", 2)
+    db = _sqlite_session()
+    _seed(db)
+    dialer_service.refill_prefetch(db)
+
+    config = db.query(ScheduleConfig).filter_by(company_id=1).one()
+    config.enabled = False
+    config.version += 1
+    db.commit()
+
+    assert dialer_service.refill_prefetch(db) == 0
+    assert _buffer(db) == []
+    assert db.query(PhoneNumber).filter(PhoneNumber.assigned_at.is_not(None)).count() == 0
+
+
+def test_prefetch_reservations_expire_with_stale_assignments(monkeypatch):
+    monkeypatch.setattr(dialer_service.settings, "dialer_prefetch_watermark", 2)
+    monkeypatch.setattr(dialer_service.settings, "assignment_timeout_minutes", 60)
+    db = _sqlite_session()
+    _seed(db)
+    dialer_service.refill_prefetch(db)
+    old = datetime.now(timezone.utc) - timedelta(hours=2)
+    db.query(PhoneNumber).filter(PhoneNumber.id == 5).update({PhoneNumber.assigned_at: old})
+    db.query(DialerPrefetchEntry).filter(DialerPrefetchEntry.phone_number_id == 5).update(
+        {DialerPrefetchEntry.reserved_at: old}
+    )
+    db.commit()
+
+    assert dialer_service.unlock_stale_assignments(db) == 1
+    assert _buffer(db) == [4]
+
+
+def test_prefetch_refill_does_not_commit_after_it_starts_reserving(monkeypatch):
+    # The refill's advisory lock is transaction-scoped, so a commit from a window check
+    # (insufficient funds disables the company) must not land between the reservations.
+    monkeypatch.setattr(dialer_service.settings, "dialer_prefetch_watermark", 2)
+    db = _sqlite_session()
+    _seed(db)
+    db.add(Company(id=2, name="broke", display_name="Broke", settings={}, is_active=True))
+    db.add(ScheduleConfig(company_id=2, enabled=True, skip_holidays=False, wallet_balance=0, version=1))
+    db.commit()
+    log = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: log.append(args[2]))
+    event.listen(db, "after_commit", lambda session: log.append("COMMIT"))
+
+    assert dialer_service.refill_prefetch(db) == 2
+
+    first_reservation = next(i for i, sql in enumerate(log) if "UPDATE numbers" in sql)
+    assert log[first_reservation:].count("COMMIT") == 1
+    assert db.query(ScheduleConfig).filter_by(company_id=2).one().enabled is False
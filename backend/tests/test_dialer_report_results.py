@@ -0,0 +1,107 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+from app.models import (
+    CallResult,
+    Company,
+    DialerBatchItem,
+    DialerPoolEntry,
+    PhoneNumber,
+    Scenario,
+    ScheduleConfig,
+)
+from app.models.phone_number import CallStatus, GlobalStatus
+from app.schemas.dialer import DialerReport
+from app.services.dialer_service import report_results
+
+
+def _sqlite_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+
+
+def _report(**overrides) -> DialerReport:
+    data = {
+        "phone_number": "09120000001",
+        "company": "salehi",
+        "status": CallStatus.CONNECTED,
+        "attempted_at": datetime.now(timezone.utc),
+    }
+    data.update(overrides)
+    return DialerReport(**data)
+
+
+def _seed(db):
+    company = Company(name="salehi", display_name="Salehi", settings={})
+    db.add(company)
+    db.flush()
+    db.add(ScheduleConfig(company_id=company.id, enabled=True, wallet_balance=1000, cost_per_connected=100, version=1))
+    scenario = Scenario(company_id=company.id, name="s1", display_name="S1", cost_per_connected=250)
+    number = PhoneNumber(phone_number="09120000001", global_status=GlobalStatus.ACTIVE, assigned_batch_id="b-1")
+    db.add_all([scenario, number])
+    db.flush()
+    db.add(DialerPoolEntry(company_id=company.id, phone_number_id=number.id))
+    db.add(
+        DialerBatchItem(
+            batch_id="b-1",
+            company_id=company.id,
+            phone_number_id=number.id,
+            assigned_at=datetime.now(timezone.utc),
+            report_scenario_id=scenario.id,
+        )
+    )
+    db.commit()
+    return company, scenario, number
+
+
+def test_report_results_applies_valid_items_and_rejects_invalid_ones():
+    db = _sqlite_session()
+    company, scenario, number = _seed(db)
+
+    result = report_results(
+        db,
+        [
+            _report(number_id=number.id, batch_id="b-1"),
+            _report(company="unknown"),
+            _report(phone_number="12345"),
+            _report(phone_number="09120000002", status=CallStatus.MISSED),
+        ],
+    )
+
+    assert result["accepted"] == 2
+    assert result["rejected"] == 2
+    assert [r["ok"] for r in result["results"]] == [True, False, False, True]
+    assert result["results"][1]["error"] == "Company not found"
+
+    # Batch scenario is reused for the call result and its trace.
+    call = db.query(CallResult).filter(CallResult.phone_number_id == number.id).one()
+    assert call.scenario_id == scenario.id
+    item = db.query(DialerBatchItem).filter(DialerBatchItem.batch_id == "b-1").one()
+    assert item.report_call_result_id == call.id
+    assert item.report_status == CallStatus.CONNECTED.value
+
+    # Unknown phone is auto-created; reported numbers leave the pool.
+    assert db.query(PhoneNumber).filter(PhoneNumber.phone_number == "09120000002").count() == 1
+    assert db.query(DialerPoolEntry).filter(DialerPoolEntry.company_id == company.id).count() == 0
+
+    # Only the CONNECTED report is billed, at the scenario rate.
+    cfg = db.query(ScheduleConfig).filter_by(company_id=company.id).one()
+    assert cfg.wallet_balance == 750
+
+
+def test_report_results_sums_charges_and_disables_at_zero_balance():
+    db = _sqlite_session()
+    company, scenario, number = _seed(db)
+
+    reports = [_report(phone_number=f"0912000000{i}", scenario_id=scenario.id) for i in range(1, 6)]
+    result = report_results(db, reports)
+
+    assert result["accepted"] == 5
+    cfg = db.query(ScheduleConfig).filter_by(company_id=company.id).one()
+    assert cfg.wallet_balance == 0
+    assert cfg.enabled is False
+    assert cfg.disabled_by_dialer is True
@@ -20,6 +20,9 @@ class FakeQuery:
     def first(self):
         return self._first_result
 
+    def delete(self, *args, **kwargs):
+        return 0
+
 
 class FakeDB:
     def __init__(self, *, number, batch_item, previous_call_result=None):
@@ -27,6 +30,7 @@ class FakeDB:
         self.batch_item = batch_item
         self.previous_call_result = previous_call_result
         self.added = []
+        self.executed = []
         self.commits = 0
 
     def get(self, model, ident):
@@ -40,6 +44,9 @@ class FakeDB:
     def flush(self):
         pass
 
+    def execute(self, stmt):
+        self.executed.append(stmt)
+
     def commit(self):
         self.commits += 1
 
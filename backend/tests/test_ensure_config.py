@@ -0,0 +1,47 @@
+from types import SimpleNamespace
+
+from app.services import schedule_service
+
+
+class FakeQuery:
+    def __init__(self, result):
+        self.result = result
+
+    def filter_by(self, **kwargs):
+        return self
+
+    def first(self):
+        return self.result
+
+
+class NoIntrospectionDB:
+    def __init__(self, config):
+        self.config = config
+        self.commits = 0
+
+    def query(self, _model):
+        return FakeQuery(self.config)
+
+    def connection(self):
+        raise AssertionError("ensure_config must not inspect the schema per call")
+
+    def commit(self):
+        self.commits += 1
+
+    def refresh(self, _obj):
+        return None
+
+
+def test_ensure_config_is_a_single_lookup_for_existing_rows():
+    config = SimpleNamespace(enabled=True, cost_per_connected=150, wallet_balance=10)
+    db = NoIntrospectionDB(config)
+    assert schedule_service.ensure_config(db, company_id=1) is config
+    assert db.commits == 0
+
+
+def test_ensure_config_backfills_legacy_nulls_in_one_commit():
+    config = SimpleNamespace(enabled=None, cost_per_connected=None, wallet_balance=None)
+    db = NoIntrospectionDB(config)
+    schedule_service.ensure_config(db, company_id=1)
+    assert (config.enabled, config.cost_per_connected, config.wallet_balance) == (True, 150, 0)
+    assert db.commits == 1
@@ -0,0 +1,119 @@
+import csv
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+from app.models import AdminUser, Company, ExportJob, ExportJobStatus, PhoneNumber
+from app.models.phone_number import GlobalStatus
+from app.models.user import UserRole
+from app.schemas.phone_number import PhoneNumberExportRequest
+from app.services import export_job_service
+
+
+def _sqlite_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+
+
+def _seed(db):
+    company = Company(name="salehi", display_name="Salehi", settings={})
+    db.add(company)
+    db.flush()
+    user = AdminUser(
+        username="admin",
+        password_hash="x",
+        role=UserRole.ADMIN,
+        company_id=company.id,
+        is_superuser=False,
+        is_active=True,
+    )
+    db.add(user)
+    db.add_all([PhoneNumber(phone_number=f"0912000000{i}", global_status=GlobalStatus.ACTIVE) for i in range(3)])
+    db.commit()
+    return user
+
+
+def test_job_runs_to_a_downloadable_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(export_job_service.settings, "export_jobs_dir", str(tmp_path))
+    db = _sqlite_session()
+    user = _seed(db)
+
+    job = export_job_service.create_job(db, PhoneNumberExportRequest(select_all=True, format="csv"), user)
+    assert job.status == ExportJobStatus.PENDING
+
+    assert export_job_service.run_pending_jobs(db) == 1
+    db.refresh(job)
+    assert job.status == ExportJobStatus.DONE
+    assert job.total_rows == 3
+    assert job.processed_rows == 3
+
+    _, path = export_job_service.get_job_file(db, job.id, user)
+    with open(path, encoding="utf-8-sig") as f:
+        assert len(list(csv.reader(f))) == 4
+
+
+def test_invalid_request_fails_fast_and_foreign_jobs_are_hidden(tmp_path, monkeypatch):
+    monkeypatch.setattr(export_job_service.settings, "export_jobs_dir", str(tmp_path))
+    db = _sqlite_session()
+    user = _seed(db)
+
+    with pytest.raises(HTTPException) as exc:
+        export_job_service.create_job(db, PhoneNumberExportRequest(), user)
+    assert exc.value.status_code == 400
+
+    job = export_job_service.create_job(db, PhoneNumberExportRequest(select_all=True), user)
+    other = AdminUser(username="other", password_hash="x", role=UserRole.ADMIN, is_superuser=False, is_active=True)
+    db.add(other)
+    db.commit()
+    with pytest.raises(HTTPException) as exc:
+        export_job_service.get_job(db, job.id, other)
+    assert exc.value.status_code == 404
+
+
+def test_sweep_removes_expired_jobs_and_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(export_job_service.settings, "export_jobs_dir", str(tmp_path))
+    db = _sqlite_session()
+    user = _seed(db)
+    job = export_job_service.create_job(db, PhoneNumberExportRequest(select_all=True), user)
+    export_job_service.run_pending_jobs(db)
+    db.refresh(job)
+    path = job.file_path
+    assert os.path.exists(path)
+
+    job.created_at = datetime.now(timezone.utc) - timedelta(hours=export_job_service.settings.export_job_retention_hours + 1)
+    db.commit()
+
+    assert export_job_service.sweep_expired_jobs(db) == 1
+    assert not os.path.exists(path)
+    assert db.query(ExportJob).count() == 0
+
+
+def test_sweep_fails_running_jobs_whose_worker_died(tmp_path, monkeypatch):
+    monkeypatch.setattr(export_job_service.settings, "export_jobs_dir", str(tmp_path))
+    monkeypatch.setattr(export_job_service.settings, "export_job_stall_minutes", 15)
+    db = _sqlite_session()
+    user = _seed(db)
+    now = datetime.now(timezone.utc)
+    dead = export_job_service.create_job(db, PhoneNumberExportRequest(select_all=True), user)
+    alive = export_job_service.create_job(db, PhoneNumberExportRequest(select_all=True), user)
+    dead.status = alive.status = ExportJobStatus.RUNNING
+    dead.started_at = dead.heartbeat_at = now - timedelta(hours=1)
+    alive.started_at = now - timedelta(hours=1)
+    alive.heartbeat_at = now - timedelta(minutes=1)
+    db.commit()
+    part = tmp_path / f"numbers_export_{dead.id}.{dead.format}.part"
+    part.write_bytes(b"partial")
+
+    assert export_job_service.sweep_expired_jobs(db) == 1
+
+    db.expire_all()
+    assert dead.status == ExportJobStatus.FAILED and dead.error
+    assert dead.finished_at is not None
+    assert alive.status == ExportJobStatus.RUNNING
+    assert not part.exists()
@@ -0,0 +1,71 @@
+import asyncio
+from types import SimpleNamespace
+
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+from app.core import metrics
+
+
+def _sample(name, labels=None):
+    return REGISTRY.get_sample_value(name, labels or {}) or 0
+
+
+def _call(app, path):
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(_message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": path, "headers": []}
+    asyncio.run(metrics.MetricsMiddleware(app)(scope, receive, send))
+
+
+def test_request_latency_is_labelled_by_route_template():
+    async def app(scope, receive, send):
+        # Starlette's router writes the matched route into the shared scope.
+        scope["route"] = SimpleNamespace(path="/api/numbers/{number_id}")
+        await send({"type": "http.response.start", "status": 204, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    labels = {"method": "GET", "route": "/api/numbers/{number_id}", "status": "204"}
+    before = _sample("http_request_duration_seconds_count", labels)
+    _call(app, "/api/numbers/17")
+    _call(app, "/api/numbers/18")
+    assert _sample("http_request_duration_seconds_count", labels) == before + 2
+
+
+def test_unmatched_routes_share_one_label():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 404, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    labels = {"method": "GET", "route": "unmatched", "status": "404"}
+    before = _sample("http_request_duration_seconds_count", labels)
+    _call(app, "/nope/1")
+    _call(app, "/nope/2")
+    assert _sample("http_request_duration_seconds_count", labels) == before + 2
+
+
+def test_timed_pool_observes_checkout_wait(tmp_path):
+    pool_class = metrics.timed_pool_class(QueuePool, "test")
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=pool_class)
+    before = _sample("db_pool_checkout_wait_seconds_count", {"pool": "test"})
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    engine.dispose()  # recreated pool keeps its label
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert _sample("db_pool_checkout_wait_seconds_count", {"pool": "test"}) == before + 3
+
+
+def test_render_latest_exposes_dialer_counters():
+    metrics.DIALER_REPORTS.labels("acme", "CONNECTED").inc()
+    body, content_type = metrics.render_latest()
+    assert content_type.startswith("text/plain")
+    assert b'dialer_reports_total{company="acme",status="CONNECTED"}' in body
+    assert b"dialer_numbers_returned_total" in body
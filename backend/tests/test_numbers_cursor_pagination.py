@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+from app.models import CallResult, Company, PhoneNumber
+from app.models.phone_number import CallStatus, GlobalStatus
+from app.models.user import UserRole
+from app.services import number_state_service
+from app.services.phone_service import list_numbers
+
+
+def _sqlite_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+
+
+def _seed(db):
+    company = Company(name="salehi", display_name="Salehi", settings={})
+    db.add(company)
+    db.flush()
+    numbers = [PhoneNumber(phone_number=f"0912000000{i}", global_status=GlobalStatus.ACTIVE) for i in range(7)]
+    db.add_all(numbers)
+    db.flush()
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    # numbers 0..3 were called, two of them at the same time; 4..6 never were (NULL sort key)
+    calls = [
+        CallResult(
+            phone_number_id=number.id,
+            company_id=company.id,
+            status=status,
+            attempted_at=base + timedelta(hours=offset),
+        )
+        for offset, status, number in zip(
+            [0, 1, 1, 2],
+            [CallStatus.MISSED, CallStatus.BUSY, CallStatus.MISSED, CallStatus.CONNECTED],
+            numbers[:4],
+        )
+    ]
+    db.add_all(calls)
+    db.flush()
+    number_state_service.record_calls(db, calls)
+    db.commit()
+    user = SimpleNamespace(id=1, company_id=company.id, is_superuser=False, role=UserRole.ADMIN)
+    return user
+
+
+def _walk(db, user, **kwargs):
+    seen, cursor = [], None
+    while True:
+        page, cursor = list_numbers(db, user, limit=2, cursor=cursor, **kwargs)
+        seen.extend(n.id for n in page)
+        if cursor is None:
+            return seen
+
+
+@pytest.mark.parametrize("sort_by", ["created_at", "last_attempt_at", "total_attempts", "status"])
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+def test_cursor_pages_match_offset_listing(sort_by, sort_order):
+    db = _sqlite_session()
+    user = _seed(db)
+
+    expected, _ = list_numbers(db, user, limit=100, sort_by=sort_by, sort_order=sort_order)
+    walked = _walk(db, user, sort_by=sort_by, sort_order=sort_order)
+
+    assert walked == [n.id for n in expected]
+    assert len(set(walked)) == 7
+
+
+def test_cursor_from_other_ordering_is_rejected():
+    db = _sqlite_session()
+    user = _seed(db)
+    _, cursor = list_numbers(db, user, limit=2, sort_by="last_attempt_at", sort_order="desc")
+
+    with pytest.raises(HTTPException) as exc:
+        list_numbers(db, user, limit=2, sort_by="last_attempt_at", sort_order="asc", cursor=cursor)
+    assert exc.value.status_code == 400
+
+    with pytest.raises(HTTPException):
+        list_numbers(db, user, limit=2, cursor="not-a-cursor")
@@ -0,0 +1,84 @@
+import csv
+import io
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from openpyxl import load_workbook
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+from app.models import CallResult, Company, PhoneNumber
+from app.models.phone_number import CallStatus, GlobalStatus
+from app.models.user import UserRole
+from app.schemas.phone_number import PhoneNumberExportRequest
+from app.services import number_state_service
+from app.services.phone_service import EXPORT_HEADER, export_numbers, write_export
+
+
+def _sqlite_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+
+
+def _seed(db):
+    company = Company(name="salehi", display_name="Salehi", settings={})
+    db.add(company)
+    db.flush()
+    numbers = [PhoneNumber(phone_number=f"0912000000{i}", global_status=GlobalStatus.ACTIVE) for i in range(3)]
+    db.add_all(numbers)
+    db.flush()
+    calls = [
+        CallResult(
+            phone_number_id=numbers[0].id,
+            company_id=company.id,
+            status=CallStatus.MISSED.value,
+            attempted_at=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        ),
+        CallResult(
+            phone_number_id=numbers[0].id,
+            company_id=company.id,
+            status=CallStatus.CONNECTED.value,
+            attempted_at=datetime(2025, 1, 2, tzinfo=timezone.utc),
+            user_message="call me later",
+        ),
+    ]
+    db.add_all(calls)
+    db.flush()
+    number_state_service.record_calls(db, calls)
+    db.commit()
+    return SimpleNamespace(id=1, company_id=company.id, is_superuser=True, role=UserRole.ADMIN)
+
+
+def _payload(**overrides):
+    data = {"select_all": True, "company_name": "salehi", "sort_by": "total_attempts", "sort_order": "desc"}
+    data.update(overrides)
+    return PhoneNumberExportRequest(**data)
+
+
+def test_csv_export_streams_latest_state():
+    db = _sqlite_session()
+    user = _seed(db)
+    out = io.BytesIO()
+
+    assert write_export(db, _payload(format="csv"), user, out) == 3
+
+    rows = list(csv.reader(io.StringIO(out.getvalue().decode("utf-8-sig"))))
+    assert rows[0] == EXPORT_HEADER
+    assert rows[1][:3] == ["09120000000", "CONNECTED", "2"]
+    assert rows[1][4] == "call me later"
+    assert [r[1] for r in rows[2:]] == ["IN_QUEUE", "IN_QUEUE"]
+
+
+def test_xlsx_export_is_chunked_from_a_spooled_file():
+    db = _sqlite_session()
+    user = _seed(db)
+
+    body = b"".join(export_numbers(db, _payload(), user))
+
+    ws = load_workbook(io.BytesIO(body)).active
+    values = list(ws.values)
+    assert list(values[0]) == EXPORT_HEADER
+    assert values[1][:3] == ("09120000000", "CONNECTED", 2)
+    assert len(values) == 4
@@ -0,0 +1,54 @@
+import io
+from types import SimpleNamespace
+
+from fastapi import UploadFile
+from openpyxl import Workbook
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.numbers import _iter_uploaded_numbers
+from app.core.db import Base
+from app.models import PhoneNumber
+from app.models.user import UserRole
+from app.services import phone_service
+
+
+def _sqlite_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+
+
+ADMIN = SimpleNamespace(id=1, company_id=None, is_superuser=True, role=UserRole.ADMIN)
+
+
+def test_import_inserts_in_bounded_chunks(monkeypatch):
+    monkeypatch.setattr(phone_service.settings, "import_chunk_size", 2)
+    db = _sqlite_session()
+    db.add(PhoneNumber(phone_number="09120000009"))
+    db.commit()
+    commits = []
+    original_commit = db.commit
+    monkeypatch.setattr(db, "commit", lambda: (commits.append(1), original_commit()))
+
+    raw = iter(["09120000001", "9120000002", "bad", "09120000009", "+989120000003", "09120000001"])
+    result = phone_service.import_numbers(db, raw, ADMIN)
+
+    assert result == {"inserted": 3, "duplicates": 2, "invalid": 1, "invalid_samples": ["bad"]}
+    assert len(commits) == 3
+    assert db.query(PhoneNumber).count() == 4
+
+
+def test_uploaded_rows_are_read_lazily_from_csv_and_xlsx():
+    csv_upload = UploadFile(file=io.BytesIO(b"09120000001\n\n09120000002,extra\n"), filename="numbers.csv")
+    assert list(_iter_uploaded_numbers(csv_upload)) == ["09120000001", "09120000002"]
+
+    wb = Workbook()
+    wb.active.append(["09120000003"])
+    wb.active.append([None])
+    wb.active.append([9120000004])
+    data = io.BytesIO()
+    wb.save(data)
+    data.seek(0)
+    xlsx_upload = UploadFile(file=data, filename="numbers.xlsx")
+    assert list(_iter_uploaded_numbers(xlsx_upload)) == ["09120000003", "9120000004"]
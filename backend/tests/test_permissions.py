@@ -5,7 +5,7 @@ from fastapi import HTTPException
 
 from app.api.deps import get_company_user, get_company_admin
 from app.models.phone_number import CallStatus
-from app.services import phone_service
+from app.services import company_registry, phone_service
 
 
 def test_get_company_user_allows_superuser():
@@ -30,23 +30,15 @@ def test_get_company_admin_blocks_agent():
 
 
 def test_resolve_company_id_blocks_non_superuser_cross_company(monkeypatch):
-    class FakeQuery:
-        def __init__(self, company):
-            self.company = company
-
-        def filter(self, *args, **kwargs):
-            return self
-
-        def first(self):
-            return self.company
-
-    class FakeDB:
-        def query(self, _model):
-            return FakeQuery(SimpleNamespace(id=2, name="saeid"))
+    monkeypatch.setattr(
+        company_registry,
+        "lookup",
+        lambda db, name: company_registry.CompanyRef(id=2, name=name, is_active=True),
+    )
 
     user = SimpleNamespace(is_superuser=False, company_id=1)
     with pytest.raises(HTTPException) as exc:
-        phone_service._resolve_company_id(FakeDB(), user, "saeid")
+        phone_service._resolve_company_id(SimpleNamespace(), user, "saeid")
     assert exc.value.status_code == 403
 
 
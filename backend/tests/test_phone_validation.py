@@ -1,7 +1,9 @@
+import random
+import time as clock
 from datetime import time, datetime
 from zoneinfo import ZoneInfo
 
-from app.services.phone_service import normalize_phone
+from app.services.phone_service import normalize_phone, normalize_phones
 from app.services.schedule_service import _next_start, TEHRAN_TZ
 from app.models.schedule import ScheduleWindow
 
@@ -18,6 +20,56 @@ def test_normalize_phone_rejects_invalid_numbers():
     assert normalize_phone("071234567890") is None
 
 
+def _sample_inputs(count: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    prefixes = ["", "0", "+98", "0098", "98", "9", "09", "۰۹", "0 9", "(+98) ", "98 98"]
+    noise = ["", " ", "-", " - ", "\t", "x", "\n", "٫"]
+    values = []
+    for _ in range(count):
+        body = "".join(rng.choice("0123456789") for _ in range(rng.randint(6, 12)))
+        value = rng.choice(prefixes) + body
+        if rng.random() < 0.3:
+            cut = rng.randint(0, len(value))
+            value = value[:cut] + rng.choice(noise) + value[cut:]
+        values.append(value)
+    return values
+
+
+def test_normalize_phones_matches_single_value_function():
+    raws = _sample_inputs(20000) + ["", "\x1f09123456789", "۰۹۱۲۳۴۵۶۷۸۹", "09۱۲۳۴۵۶۷۸۹", "9812345678"]
+    expected = [normalize_phone(raw) for raw in raws]
+
+    valid, invalid = normalize_phones(raws)
+
+    assert valid == list(dict.fromkeys(n for n in expected if n is not None))
+    assert invalid == [raw for raw, n in zip(raws, expected) if n is None]
+
+
+def test_normalize_phones_is_faster_than_per_value_calls():
+    # Small input and a loose bound: this guards against a regression to per-value
+    # normalization, it is not a benchmark.
+    raws = _sample_inputs(20000, seed=11)
+
+    def best_of(fn, runs=3):
+        timings = []
+        for _ in range(runs):
+            started = clock.perf_counter()
+            fn()
+            timings.append(clock.perf_counter() - started)
+        return min(timings)
+
+    def per_value():
+        seen = {}
+        for raw in raws:
+            norm = normalize_phone(raw)
+            if norm is not None:
+                seen[norm] = None
+
+    single = best_of(per_value)
+    batch = best_of(lambda: normalize_phones(raws))
+    assert batch < single * 0.8
+
+
 def test_next_start_rolls_over_week():
     now = datetime(2024, 1, 1, 23, 0, tzinfo=TEHRAN_TZ)
     intervals = [ScheduleWindow(day_of_week=1, start_time=time(9, 0), end_time=time(10, 0))]
@@ -0,0 +1,71 @@
+from sqlalchemy.orm import Session
+
+from app.core import db
+
+
+class _FakeConn:
+    def __init__(self, lag):
+        self.lag = lag
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, _stmt):
+        if isinstance(self.lag, Exception):
+            raise self.lag
+        return type("R", (), {"scalar": lambda _self: self.lag})()
+
+
+class _FakeEngine:
+    def __init__(self, lag):
+        self.lag = lag
+        self.probes = 0
+
+    def connect(self):
+        self.probes += 1
+        return _FakeConn(self.lag)
+
+
+def _configure(monkeypatch, lag, max_lag=5.0):
+    fake = _FakeEngine(lag)
+    monkeypatch.setattr(db, "reports_engine", fake)
+    monkeypatch.setattr(db.settings, "database_replica_url", "postgresql://replica/app")
+    monkeypatch.setattr(db.settings, "replica_max_lag_seconds", max_lag)
+    monkeypatch.setattr(db.settings, "replica_lag_check_seconds", 60)
+    monkeypatch.setattr(db, "_replica_state", {"checked_at": float("-inf"), "lagging": False})
+    return fake
+
+
+def test_no_replica_never_probes(monkeypatch):
+    monkeypatch.setattr(db.settings, "database_replica_url", "")
+    assert db.replica_is_lagging() is False
+    session = db.read_session()
+    assert isinstance(session, Session)
+    session.close()
+
+
+def test_fresh_replica_is_used_and_probe_is_cached(monkeypatch):
+    fake = _configure(monkeypatch, lag=1.0)
+    assert db.replica_is_lagging() is False
+    assert db.replica_is_lagging() is False
+    assert fake.probes == 1
+
+
+def test_lagging_or_unreachable_replica_falls_back_to_primary(monkeypatch):
+    _configure(monkeypatch, lag=30.0)
+    assert db.replica_is_lagging() is True
+    session = db.read_session()
+    assert session.get_bind().url == db.engine.url
+    session.close()
+
+    _configure(monkeypatch, lag=RuntimeError("connection refused"))
+    assert db.replica_is_lagging() is True
+
+
+def test_lag_check_disabled_when_threshold_is_zero(monkeypatch):
+    fake = _configure(monkeypatch, lag=3600.0, max_lag=0)
+    assert db.replica_is_lagging() is False
+    assert fake.probes == 0
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+
+from sqlalchemy import create_engine, text
+
+from app.core import instrumentation
+from app.core.instrumentation import RequestInstrumentationMiddleware, current_stats, install_sql_hooks
+
+
+def _engine():
+    engine = create_engine("sqlite:///:memory:")
+    install_sql_hooks(engine)
+    install_sql_hooks(engine)  # idempotent
+    return engine
+
+
+def _call(app, path="/api/numbers"):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "headers": []}
+    asyncio.run(RequestInstrumentationMiddleware(app)(scope, receive, send))
+    return sent
+
+
+def test_counts_queries_per_request_and_sets_server_timing(caplog):
+    engine = _engine()
+    seen = {}
+
+    async def app(scope, receive, send):
+        with engine.connect() as conn:
+            for _ in range(3):
+                conn.execute(text("SELECT 1"))
+        seen["stats"] = current_stats()
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    with caplog.at_level(logging.INFO, logger="app.core.instrumentation"):
+        sent = _call(app)
+
+    assert seen["stats"].query_count == 3
+    assert current_stats() is None  # reset after the request
+    headers = dict(sent[0]["headers"])
+    assert headers[b"content-type"] == b"text/plain"
+    assert b'desc="3 queries"' in headers[b"server-timing"]
+    assert b"total;dur=" in headers[b"server-timing"]
+    line = next(r.getMessage() for r in caplog.records if r.getMessage().startswith("request "))
+    assert "path=/api/numbers" in line
+    assert "status=200" in line
+    assert "db_queries=3" in line
+    assert "slowest_sql=SELECT 1" in line
+
+
+def test_queries_outside_requests_are_not_attributed():
+    engine = _engine()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert current_stats() is None
+
+
+def test_slow_query_log_respects_threshold_and_sampling(monkeypatch, caplog):
+    engine = _engine()
+    monkeypatch.setattr(instrumentation.settings, "slow_query_ms", 0)
+    monkeypatch.setattr(instrumentation.settings, "slow_query_sample_rate", 1.0)
+    with caplog.at_level(logging.WARNING, logger="app.core.instrumentation.slow_query"):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT :phone"), {"phone": "09120000000"})
+    slow = [r.getMessage() for r in caplog.records if r.getMessage().startswith("slow_query")]
+    assert len(slow) == 1
+    assert "09120000000" not in slow[0]
+
+    caplog.clear()
+    monkeypatch.setattr(instrumentation.settings, "slow_query_sample_rate", 0.0)
+    with caplog.at_level(logging.WARNING, logger="app.core.instrumentation.slow_query"):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    assert not [r for r in caplog.records if r.getMessage().startswith("slow_query")]
+
+
+def test_failed_request_is_logged_as_500(caplog):
+    async def app(scope, receive, send):
+        raise RuntimeError("boom")
+
+    with caplog.at_level(logging.INFO, logger="app.core.instrumentation"):
+        try:
+            _call(app, path="/api/dialer/next-batch")
+        except RuntimeError:
+            pass
+    line = next(r.getMessage() for r in caplog.records if r.getMessage().startswith("request "))
+    assert "status=500" in line
+    assert "path=/api/dialer/next-batch" in line
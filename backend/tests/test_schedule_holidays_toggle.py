@@ -4,7 +4,24 @@ from types import SimpleNamespace
 from app.services import schedule_service
 
 
+class VersionQuery:
+    def __init__(self, config):
+        self.config = config
+
+    def filter_by(self, **kwargs):
+        return self
+
+    def scalar(self):
+        return self.config.version
+
+
 class DummyDB:
+    def __init__(self, config=None):
+        self.config = config
+
+    def query(self, *_args):
+        return VersionQuery(self.config)
+
     def commit(self):
         return None
 
@@ -13,7 +30,6 @@ class DummyDB:
 
 
 def test_skip_holidays_toggle_controls_holiday_block(monkeypatch):
-    db = DummyDB()
     now = datetime.now(schedule_service.TEHRAN_TZ)
     day = schedule_service._iran_weekday(now)
     interval = SimpleNamespace(day_of_week=day, start_time=time(0, 0), end_time=time(23, 59))
@@ -25,6 +41,8 @@ def test_skip_holidays_toggle_controls_holiday_block(monkeypatch):
         disabled_by_dialer=False,
         version=1,
     )
+    db = DummyDB(config)
+    schedule_service.invalidate_schedule_cache()
     monkeypatch.setattr(schedule_service, "ensure_config", lambda _db, company_id=None: config)
     monkeypatch.setattr(schedule_service, "list_intervals", lambda _db, company_id=None: [interval])
     monkeypatch.setattr(schedule_service, "is_holiday", lambda _now: True)
@@ -34,8 +52,27 @@ def test_skip_holidays_toggle_controls_holiday_block(monkeypatch):
     assert reason == "holiday"
     assert retry == 900
 
+    # update_schedule bumps the version on every change, which invalidates the cache
     config.skip_holidays = False
+    config.version += 1
     allowed, reason, retry = schedule_service.is_call_allowed(now, db, company_id=None)
     assert allowed is True
     assert reason is None
     assert retry == 0
+
+
+def test_schedule_snapshot_is_reused_until_version_changes(monkeypatch):
+    config = SimpleNamespace(wallet_balance=1000, enabled=True, skip_holidays=False, disabled_by_dialer=False, version=1)
+    db = DummyDB(config)
+    loads = []
+    monkeypatch.setattr(schedule_service, "ensure_config", lambda _db, company_id=None: config)
+    monkeypatch.setattr(schedule_service, "list_intervals", lambda _db, company_id=None: loads.append(1) or [])
+    schedule_service.invalidate_schedule_cache()
+
+    first = schedule_service.get_schedule_snapshot(db, company_id=7)
+    assert schedule_service.get_schedule_snapshot(db, company_id=7) is first
+    assert len(loads) == 1
+
+    config.version += 1
+    assert schedule_service.get_schedule_snapshot(db, company_id=7).version == 2
+    assert len(loads) == 2
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta, timezone
+
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+from app.models import PhoneNumber
+from app.models.phone_number import GlobalStatus
+from app.services import dialer_service
+
+
+def _sqlite_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+
+
+def test_unlock_stale_assignments_frees_only_expired_rows(monkeypatch):
+    monkeypatch.setattr(dialer_service.settings, "assignment_timeout_minutes", 60)
+    db = _sqlite_session()
+    now = datetime.now(timezone.utc)
+    stale = PhoneNumber(phone_number="09120000001", global_status=GlobalStatus.ACTIVE,
+                        assigned_at=now - timedelta(hours=2), assigned_batch_id="old")
+    fresh = PhoneNumber(phone_number="09120000002", global_status=GlobalStatus.ACTIVE,
+                        assigned_at=now - timedelta(minutes=5), assigned_batch_id="new")
+    idle = PhoneNumber(phone_number="09120000003", global_status=GlobalStatus.ACTIVE)
+    db.add_all([stale, fresh, idle])
+    db.commit()
+    before = REGISTRY.get_sample_value("dialer_stale_assignments_unlocked_total") or 0
+
+    assert dialer_service.unlock_stale_assignments(db) == 1
+
+    db.expire_all()
+    assert stale.assigned_at is None and stale.assigned_batch_id is None
+    assert fresh.assigned_batch_id == "new"
+    assert REGISTRY.get_sample_value("dialer_stale_assignments_unlocked_total") == before + 1
+    assert dialer_service.unlock_stale_assignments(db) == 0
+
+
+def test_assigned_at_index_is_partial_on_postgres():
+    index = next(i for i in PhoneNumber.__table__.indexes if i.name == "ix_numbers_assigned_at_not_null")
+    assert str(index.dialect_options["postgresql"]["where"]) == "assigned_at IS NOT NULL"
@@ -1,45 +1,68 @@
-from datetime import datetime, timedelta, timezone
-from types import SimpleNamespace
-
-from app.models.phone_number import CallStatus
-from app.services import stats_service
+from datetime import datetime, time, timedelta, timezone
 
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
 
-class ScalarQuery:
-    def __init__(self, value):
-        self.value = value
-
-    def filter(self, *args, **kwargs):
-        return self
+from app.core.db import Base
+from app.models import CallResult, Scenario, ScheduleConfig
+from app.models.phone_number import CallStatus
+from app.services import call_stats_service, stats_service
+from app.services.schedule_service import DEFAULT_COST_PER_CONNECTED, TEHRAN_TZ
 
-    def outerjoin(self, *args, **kwargs):
-        return self
 
-    def scalar(self):
-        return self.value
+def _sqlite_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False)()
 
 
-class FakeDB:
-    def __init__(self):
-        self.values = iter([2, 640, 3, 1140])
+def test_cost_summary_uses_summed_scenario_rates():
+    db = _sqlite_session()
+    db.add_all([
+        Scenario(id=1, company_id=1, name="priced", display_name="Priced", cost_per_connected=320),
+        Scenario(id=2, company_id=1, name="default", display_name="Default"),
+    ])
+    today = datetime.combine(datetime.now(TEHRAN_TZ).date(), time(0, 0), tzinfo=TEHRAN_TZ)
+    start_of_day = today.astimezone(timezone.utc)
+    last_month = (today.replace(day=1) - timedelta(days=1)).astimezone(timezone.utc)
+    calls = [
+        CallResult(phone_number_id=1, company_id=1, scenario_id=1, status=CallStatus.CONNECTED, attempted_at=start_of_day),
+        CallResult(phone_number_id=2, company_id=1, scenario_id=1, status=CallStatus.HANGUP, attempted_at=start_of_day),
+        CallResult(phone_number_id=3, company_id=1, scenario_id=2, status=CallStatus.FAILED, attempted_at=start_of_day),
+        CallResult(phone_number_id=4, company_id=1, scenario_id=1, status=CallStatus.MISSED, attempted_at=start_of_day),
+        CallResult(phone_number_id=5, company_id=1, scenario_id=1, status=CallStatus.CONNECTED, attempted_at=last_month),
+        CallResult(phone_number_id=6, company_id=2, scenario_id=1, status=CallStatus.CONNECTED, attempted_at=start_of_day),
+    ]
+    db.add_all(calls)
+    call_stats_service.record_calls(db, calls)
+    db.commit()
+    db.add(ScheduleConfig(company_id=1, cost_per_connected=500))
+    db.commit()
 
-    def query(self, *args, **kwargs):
-        return ScalarQuery(next(self.values))
+    expected = {
+        'cost_per_connected': 500,
+        'daily_count': 3,
+        'daily_cost': 320 + 320 + 500,
+        'monthly_count': 3,
+        'monthly_cost': 320 + 320 + 500,
+    }
+    result = stats_service.cost_summary(db, company_id=1)
+    assert {key: result[key] for key in expected} == expected
 
+    # Same numbers once the pending deltas are folded into the rollup.
+    call_stats_service.fold_deltas(db)
+    result = stats_service.cost_summary(db, company_id=1)
+    assert {key: result[key] for key in expected} == expected
 
-def test_cost_summary_uses_summed_scenario_rates(monkeypatch):
-    fake_db = FakeDB()
 
-    monkeypatch.setattr(
-        stats_service,
-        'ensure_config',
-        lambda db, company_id=None: SimpleNamespace(cost_per_connected=500),
-    )
+def test_cost_summary_does_not_create_a_missing_config():
+    db = _sqlite_session()
+    writes = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: writes.append(args[2]) if not args[2].startswith("SELECT") else None)
 
-    result = stats_service.cost_summary(fake_db, company_id=1)
+    result = stats_service.cost_summary(db, company_id=7)
 
-    assert result['cost_per_connected'] == 500
-    assert result['daily_count'] == 2
-    assert result['daily_cost'] == 640
-    assert result['monthly_count'] == 3
-    assert result['monthly_cost'] == 1140
+    assert result["cost_per_connected"] == DEFAULT_COST_PER_CONNECTED
+    assert result["monthly_count"] == 0
+    assert writes == []
+    assert db.query(ScheduleConfig).count() == 0
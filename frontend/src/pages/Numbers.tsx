@@ -52,6 +52,15 @@ interface PhoneNumberHistoryItem {
   call_direction?: 'INBOUND' | 'OUTBOUND' | null
 }
 
+interface ExportJob {
+  id: number
+  status: 'PENDING' | 'RUNNING' | 'DONE' | 'FAILED'
+  format: 'xlsx' | 'csv'
+  total_rows?: number | null
+  processed_rows: number
+  error?: string | null
+}
+
 const statusLabels: Record<string, string> = {
   IN_QUEUE: 'در صف تماس',
   MISSED: 'از دست رفته',
@@ -102,6 +111,9 @@ const directionLabels: Record<string, string> = {
 }
 
 const modifiableStatuses = ['IN_QUEUE', 'MISSED', 'BUSY', 'POWER_OFF', 'BANNED']
+// Export-job polling limits (the backend marks jobs of dead workers FAILED well before this)
+const EXPORT_POLL_TIMEOUT_MS = 60 * 60 * 1000
+const EXPORT_POLL_MAX_ERRORS = 5
 
 const NumbersPage = () => {
   const { user } = useAuth()
@@ -123,6 +135,8 @@ const NumbersPage = () => {
   const [page, setPage] = useState(0)
   const pageSize = 50
   const [hasMore, setHasMore] = useState(false)
+  // pageCursors[i] is the keyset cursor that loads page i (page 0 needs none)
+  const [pageCursors, setPageCursors] = useState<(string | undefined)[]>([])
   const [totalCount, setTotalCount] = useState(0)
 
   const [selectedIds, setSelectedIds] = useState<Set<number>>(new Set())
@@ -144,6 +158,7 @@ const NumbersPage = () => {
   const [sortBy, setSortBy] = useState<'created_at' | 'last_attempt_at' | 'status' | 'total_attempts'>('created_at')
   const [sortOrder, setSortOrder] = useState<'asc' | 'desc'>('desc')
   const [exporting, setExporting] = useState(false)
+  const [exportProgress, setExportProgress] = useState<number | null>(null)
   const [selectingAll, setSelectingAll] = useState(false)
   const [historyOpen, setHistoryOpen] = useState(false)
   const [historyLoading, setHistoryLoading] = useState(false)
@@ -186,8 +201,9 @@ const NumbersPage = () => {
 
   const fetchNumbers = async () => {
     setLoading(true)
+    const cursor = page > 0 ? pageCursors[page] : undefined
     try {
-      const { data } = await client.get<PhoneNumber[]>('/api/numbers', {
+      const { data, headers } = await client.get<PhoneNumber[]>('/api/numbers', {
         params: {
           company: company?.name || undefined,
           status: statusFilter || undefined,
@@ -195,14 +211,21 @@ const NumbersPage = () => {
           search: search || undefined,
           start_date: startDateIso,
           end_date: endDateIso,
-          skip: page * pageSize,
+          cursor,
+          skip: cursor ? undefined : page * pageSize,
           limit: pageSize,
           sort_by: sortBy,
           sort_order: sortOrder,
         },
       })
+      const nextCursor: string | undefined = headers['x-next-cursor'] || undefined
       setNumbers(data)
-      setHasMore(data.length === pageSize)
+      setPageCursors((prev) => {
+        const next = prev.slice(0, page + 1)
+        next[page + 1] = nextCursor
+        return next
+      })
+      setHasMore(!!nextCursor)
     } catch (err: any) {
       console.error('fetchNumbers error:', err)
     } finally {
@@ -475,7 +498,7 @@ const NumbersPage = () => {
     }
   }
 
-  const handleExport = async () => {
+  const handleExport = async (format: 'xlsx' | 'csv' = 'xlsx') => {
     if (!isAdmin) return
     const ids = selectAll ? [] : Array.from(selectedIds)
     const excluded_ids = selectAll ? Array.from(excludedIds) : []
@@ -504,12 +527,34 @@ const NumbersPage = () => {
         sort_by: sortBy,
         sort_order: sortOrder,
         company_name: company?.name || undefined,
+        format,
+      }
+      // Large exports run as a background job; poll until the file is ready, then download it.
+      // Give up after EXPORT_POLL_TIMEOUT_MS or a few failed polls in a row.
+      const { data: created } = await client.post<ExportJob>('/api/numbers/export-jobs', payload)
+      let job = created
+      const deadline = Date.now() + EXPORT_POLL_TIMEOUT_MS
+      let pollErrors = 0
+      while (job.status === 'PENDING' || job.status === 'RUNNING') {
+        if (Date.now() > deadline) throw new Error('export timed out')
+        await new Promise((resolve) => setTimeout(resolve, 2000))
+        try {
+          const { data } = await client.get<ExportJob>(`/api/numbers/export-jobs/${created.id}`)
+          job = data
+          pollErrors = 0
+        } catch (pollErr) {
+          pollErrors += 1
+          if (pollErrors >= EXPORT_POLL_MAX_ERRORS) throw pollErr
+          continue
+        }
+        setExportProgress(job.total_rows ? Math.floor((job.processed_rows * 100) / job.total_rows) : null)
       }
-      const response = await client.post('/api/numbers/export', payload, { responseType: 'blob' })
+      if (job.status !== 'DONE') throw new Error(job.error || 'export failed')
+      const response = await client.get(`/api/numbers/export-jobs/${job.id}/download`, { responseType: 'blob' })
       const url = window.URL.createObjectURL(new Blob([response.data]))
       const link = document.createElement('a')
       link.href = url
-      link.setAttribute('download', 'numbers.xlsx')
+      link.setAttribute('download', `numbers.${format}`)
       document.body.appendChild(link)
       link.click()
       link.remove()
@@ -518,6 +563,7 @@ const NumbersPage = () => {
       alert('خطا در دریافت خروجی اکسل')
     } finally {
       setExporting(false)
+      setExportProgress(null)
     }
   }
 
@@ -530,6 +576,8 @@ const NumbersPage = () => {
   const canExport = canBulk || selectAll
 
   const handleSort = (field: 'last_attempt_at' | 'status' | 'total_attempts') => {
+    // cursors are tied to the ordering they were issued for
+    setPage(0)
     if (sortBy === field) {
       setSortOrder((prev) => (prev === 'asc' ? 'desc' : 'asc'))
     } else {
@@ -720,9 +768,18 @@ const NumbersPage = () => {
               <button
                 className="rounded border border-slate-200 px-3 py-1 text-sm disabled:opacity-50 w-full sm:w-auto"
                 disabled={!canExport || exporting}
-                onClick={handleExport}
+                onClick={() => handleExport('xlsx')}
+              >
+                {exporting
+                  ? `در حال آماده‌سازی...${exportProgress !== null ? ` ${exportProgress}%` : ''}`
+                  : 'خروجی اکسل'}
+              </button>
+              <button
+                className="rounded border border-slate-200 px-3 py-1 text-sm disabled:opacity-50 w-full sm:w-auto"
+                disabled={!canExport || exporting}
+                onClick={() => handleExport('csv')}
               >
-                {exporting ? 'در حال آماده‌سازی...' : 'خروجی اکسل'}
+                خروجی CSV
               </button>
               <div className="text-[11px] text-slate-500 w-full">
                 عملیات فقط روی وضعیت‌های در صف، از دست رفته، مشغول، خاموش و بن‌شده انجام می‌شود.